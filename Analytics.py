@@ -1,23 +1,119 @@
 import customtkinter as ctk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import mysql.connector
 from datetime import datetime
 
+import analytics_engine
+import analytics_filters
+import database
+from analytics_filters import Filters, ResultCache
+from figure_cache import FigureCache
+from tasks import BackgroundExecutor
+from utils import error
+
+
+def largest(rows, n):
+    """Folds (label, value) rows, from any iterable, into the n largest label totals plus one for the rest."""
+    totals = {}
+    for label, value in rows:
+        if label is not None and value is not None:
+            totals[label] = totals.get(label, 0) + value
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    rest = sum(value for _, value in ranked[n:])
+    return ranked[:n] + ([("Others", rest)] if rest else [])
+
+
 class Analytics:
-    def __init__(self, con):
+    # The charts read the rollups maintained by checkout (see rollups.py), not order_items. The product
+    # leaderboards walk the units/revenue indexes of product_sales, so they read a few rows however long the history
+    TOP_PRODUCTS_QUERY = """
+        SELECT p.product_name, p.category, ps.units AS total_sold
+        FROM product_sales ps JOIN products p ON ps.product_id = p.product_id
+        ORDER BY ps.units DESC LIMIT 5;
+    """
+    REVENUE_PER_PRODUCT_QUERY = """
+        SELECT p.product_name, ps.revenue
+        FROM product_sales ps JOIN products p ON ps.product_id = p.product_id
+        ORDER BY ps.revenue DESC LIMIT 10;
+    """
+    CATEGORY_REVENUE_QUERY = """
+        SELECT category, SUM(revenue) AS revenue
+        FROM sales_daily_category
+        GROUP BY category;
+    """
+    PRODUCTS_PER_CATEGORY_QUERY = "SELECT category, COUNT(*) AS count FROM products GROUP BY category;"
+    LOCATION_SALES_QUERY = """
+        SELECT SUBSTRING(address, 1, 10) AS location, SUM(total_amount) AS revenue
+        FROM orders GROUP BY address;
+    """
+    INVENTORY_DISTRIBUTION_QUERY = """
+        SELECT SUBSTRING(o.address, 1, 10), SUM(p.quantity) 
+        FROM products p 
+        JOIN order_items oi ON p.product_id = oi.product_id 
+        JOIN orders o ON oi.order_id = o.order_id 
+        WHERE o.address IS NOT NULL
+        GROUP BY o.address;
+    """
+    MONTHLY_TRENDS_QUERY = """
+        SELECT MONTH(sale_date), SUM(revenue)
+        FROM sales_daily
+        WHERE sale_date >= MAKEDATE(YEAR(CURDATE()), 1) AND sale_date < MAKEDATE(YEAR(CURDATE()) + 1, 1)
+        GROUP BY MONTH(sale_date) ORDER BY MONTH(sale_date);
+    """
+    # Products never sold (no product_sales row, NULL total) sort first, then the lowest running totals
+    LEAST_SELLING_QUERY = """
+        SELECT product_name, category, total_sold FROM (
+            (SELECT p.product_name, p.category, NULL AS total_sold FROM products p
+             WHERE NOT EXISTS (SELECT 1 FROM product_sales ps WHERE ps.product_id = p.product_id) LIMIT 5)
+            UNION ALL
+            (SELECT p.product_name, p.category, ps.units FROM product_sales ps
+             JOIN products p ON ps.product_id = p.product_id ORDER BY ps.units ASC LIMIT 5)
+        ) least ORDER BY total_sold ASC LIMIT 5;
+    """
+
+    TOTAL_SALES_QUERY = "SELECT SUM(revenue) FROM sales_daily"
+    TOTAL_PRODUCTS_QUERY = "SELECT COUNT(*) FROM products"
+
+    # Every chart's query by drawing method, for benchmarks.suite
+    CHART_QUERIES = {
+        'top_products': TOP_PRODUCTS_QUERY,
+        'revenue_per_product': REVENUE_PER_PRODUCT_QUERY,
+        'category_revenue': CATEGORY_REVENUE_QUERY,
+        'products_per_category': PRODUCTS_PER_CATEGORY_QUERY,
+        'location_sales': LOCATION_SALES_QUERY,
+        'inventory_distribution': INVENTORY_DISTRIBUTION_QUERY,
+        'monthly_trends': MONTHLY_TRENDS_QUERY,
+        'least_selling': LEAST_SELLING_QUERY,
+    }
+    TOTAL_QUERIES = {'total_sales': TOTAL_SALES_QUERY, 'total_products': TOTAL_PRODUCTS_QUERY}
+    # Charts with a row per address: streamed and folded into the largest locations plus "Others"
+    LOCATION_CHARTS = ('location_sales', 'inventory_distribution')
+    LOCATION_SLICES = 10
+    STATUSES = ('paid', 'pending')
+
+    def __init__(self, db, executor=None, run=True, engine=None):
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("dark-blue")
 
-        self.con = con
-        self.cur = con.cursor()
+        self.db = db
+        self.executor = executor or BackgroundExecutor()
+        # With IMS_ANALYTICS_ENGINE=numpy the charts are computed from in-memory columns instead of MySQL
+        self.engine = engine or analytics_engine.shared(db)
+        self.figures = FigureCache()
+        # The filters apply to every view; results are cached per chart and filter set
+        self.filters = Filters()
+        self.results = ResultCache()
+        self.view = None
 
         self.window = ctk.CTk()
         self.window.title("Inventory Analytics Dashboard")
         self.window.geometry("1200x800")
+        # Close the cached figures with the window so pyplot does not keep them alive
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
 
         self.setup_ui()
-        self.window.mainloop()
+        if run:
+            self.window.mainloop()
 
     def setup_ui(self):
         # Sidebar
@@ -33,15 +129,109 @@ class Analytics:
             ("Trends", self.show_trends)
         ]
         for text, command in buttons:
-            btn = ctk.CTkButton(sidebar, text=text, command=command, font=("Arial", 14))
+            btn = ctk.CTkButton(sidebar, text=text, command=lambda view=command: self.show(view), font=("Arial", 14))
             btn.pack(pady=10, padx=10, fill="x")
 
+        main = ctk.CTkFrame(self.window, fg_color="transparent")
+        main.pack(side="right", fill="both", expand=True)
+        self.setup_filter_bar(main)
+
         # Main content area
-        self.content_frame = ctk.CTkFrame(self.window)
-        self.content_frame.pack(side="right", fill="both", expand=True, padx=20, pady=20)
+        self.content_frame = ctk.CTkFrame(main)
+        self.content_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
         # Start with dashboard
-        self.show_dashboard()
+        self.show(self.show_dashboard)
+
+    def setup_filter_bar(self, parent):
+        bar = ctk.CTkFrame(parent)
+        bar.pack(fill="x", padx=20, pady=(20, 0))
+        ctk.CTkLabel(bar, text="From").pack(side="left", padx=(10, 5), pady=10)
+        self.start_entry = ctk.CTkEntry(bar, width=110, placeholder_text="YYYY-MM-DD")
+        self.start_entry.pack(side="left")
+        ctk.CTkLabel(bar, text="To").pack(side="left", padx=5)
+        self.end_entry = ctk.CTkEntry(bar, width=110, placeholder_text="YYYY-MM-DD")
+        self.end_entry.pack(side="left")
+        self.category_menu = ctk.CTkOptionMenu(bar, values=["All categories"], width=150)
+        self.category_menu.pack(side="left", padx=10)
+        self.user_entry = ctk.CTkEntry(bar, width=110, placeholder_text="User")
+        self.user_entry.pack(side="left")
+        self.status_menu = ctk.CTkOptionMenu(bar, values=["Any status", *self.STATUSES], width=120)
+        self.status_menu.pack(side="left", padx=10)
+        ctk.CTkButton(bar, text="Apply", width=70, command=self.apply_filters).pack(side="left")
+        ctk.CTkButton(bar, text="Clear", width=70, command=self.clear_filters).pack(side="left", padx=10)
+        self.executor.submit(self.category_menu, self.categories,
+                             callback=lambda names: self.category_menu.configure(values=["All categories", *names]))
+
+    def categories(self):
+        if self.engine:
+            self.engine.refresh(self.db)
+            return sorted(name for name in self.engine.categories.values if name is not None)
+        return [name for name, in self.db.fetchall("SELECT category_name FROM categories ORDER BY category_name")]
+
+    def apply_filters(self):
+        try:
+            start, end = (datetime.strptime(entry.get().strip(), "%Y-%m-%d").date() if entry.get().strip() else None
+                          for entry in (self.start_entry, self.end_entry))
+            category = self.category_menu.get()
+            status = self.status_menu.get()
+            filters = Filters(start, end, category if category != "All categories" else None,
+                              self.user_entry.get().strip() or None, status if status != "Any status" else None)
+        except ValueError as e:
+            error(f"Invalid filter: {e}")
+            return
+        self.filters = filters
+        self.show(self.view)
+
+    def clear_filters(self):
+        for entry in (self.start_entry, self.end_entry, self.user_entry):
+            entry.delete(0, "end")
+        self.category_menu.set("All categories")
+        self.status_menu.set("Any status")
+        self.filters = Filters()
+        self.show(self.view)
+
+    def show(self, view):
+        """Shows view (one of the show_* methods), remembered so that applying filters redraws it."""
+        self.view = view
+        view()
+
+    def chart(self, parent, name, draw, key=None):
+        """Fetches chart name under the current filters in the background and shows the figure draw(data) builds.
+
+        The figure is taken from the cache when this chart was last drawn from the same data, so switching back
+        to a screen only re-renders the existing figure onto a new canvas.
+        """
+        def show(data):
+            figure = self.figures.get(key or name, data, draw)
+            canvas = FigureCanvasTkAgg(figure, master=parent)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        self.executor.load(parent, self.fetch, name, self.filters, render=show)
+
+    def fetch(self, name, filters):
+        """The rows of chart name (a CHART_QUERIES or TOTAL_QUERIES key) under filters, cached per filter set."""
+        return self.results.get((name, filters), lambda: self.compute(name, filters))
+
+    def compute(self, name, filters):
+        if self.engine:
+            self.engine.refresh(self.db)
+            rows = getattr(self.engine, name)(filters=filters or None)
+        else:
+            if filters:
+                query, params = analytics_filters.query(name, filters)
+            else:
+                query, params = self.CHART_QUERIES.get(name) or self.TOTAL_QUERIES[name], None
+            if name in self.TOTAL_QUERIES:
+                return self.db.scalar(query, params)
+            rows = self.db.rows(query, params) if name in self.LOCATION_CHARTS else self.db.fetchall(query, params)
+        return largest(rows, self.LOCATION_SLICES) if name in self.LOCATION_CHARTS else rows
+
+    def close(self):
+        self.figures.clear()
+        self.results.clear()
+        self.window.destroy()
 
     def clear_content(self):
         for widget in self.content_frame.winfo_children():
@@ -60,15 +250,19 @@ class Analytics:
         sales_card = ctk.CTkFrame(metrics_frame, fg_color="#2a2d2e", corner_radius=10)
         sales_card.pack(side="left", padx=10, fill="x", expand=True)
         ctk.CTkLabel(sales_card, text="Total Sales", font=("Arial", 14)).pack(pady=5)
-        total_sales = self.get_total_sales()
-        ctk.CTkLabel(sales_card, text=f"Rs {total_sales:,.2f}", font=("Arial", 20, "bold")).pack()
+        sales_label = ctk.CTkLabel(sales_card, text="...", font=("Arial", 20, "bold"))
+        sales_label.pack()
+        self.executor.submit(sales_label, self.get_total_sales,
+                             callback=lambda total_sales: sales_label.configure(text=f"Rs {total_sales:,.2f}"))
 
         # Total products
         products_card = ctk.CTkFrame(metrics_frame, fg_color="#2a2d2e", corner_radius=10)
         products_card.pack(side="left", padx=10, fill="x", expand=True)
         ctk.CTkLabel(products_card, text="Total Products", font=("Arial", 14)).pack(pady=5)
-        total_products = self.get_total_products()
-        ctk.CTkLabel(products_card, text=total_products, font=("Arial", 20, "bold")).pack()
+        products_label = ctk.CTkLabel(products_card, text="...", font=("Arial", 20, "bold"))
+        products_label.pack()
+        self.executor.submit(products_label, self.get_total_products,
+                             callback=lambda total_products: products_label.configure(text=total_products))
 
         # Charts frame
         charts_frame = ctk.CTkFrame(self.content_frame)
@@ -154,269 +348,226 @@ class Analytics:
 
     # Visualization methods
     def create_top_products_chart(self, parent, title="Top Products"):
-        query = """
-            SELECT p.product_name, p.category, SUM(oi.quantity) AS total_sold
-            FROM order_items oi JOIN products p ON oi.product_id = p.product_id
-            GROUP BY oi.product_id ORDER BY total_sold DESC LIMIT 5;
-        """
-        self.cur.execute(query)
-        data = self.cur.fetchall()
-
-        # Increased figure size for better spacing
-        fig, ax = plt.subplots(figsize=(7, 5))
-        fig.subplots_adjust(left=0.15)  # Shift graph to the right
-
-        # Format product names with categories
-        names = [f"{product[0]} ({product[1]})" for product in data] if data else []
-        quantities = [product[2] for product in data] if data else []
-
-        # Adjust bar width and spacing
-        bars = ax.barh(names, quantities, color='skyblue', height=0.6)
-
-        # Adjust font sizes and padding
-        ax.set_title(title, fontsize=12)
-        ax.set_xlabel('Quantity Sold', fontsize=10)
-        ax.tick_params(axis='y', which='major', labelsize=9)
-        ax.tick_params(axis='x', which='major', labelsize=9)
-
-        # Shift the plot slightly to the right
-        ax.set_position([0.2, 0.1, 0.7, 0.8])  # [left, bottom, width, height]
-
-        # Add padding
-        plt.tight_layout(rect=[0, 0, 1, 0.95])
-
-        # Add hover tooltip functionality
-        def on_hover(event):
-            if event.inaxes == ax:
-                for bar in bars:
-                    contains, _ = bar.contains(event)
-                    if contains:
-                        value = bar.get_width()
-                        ax.annotate(
-                            f'{value}',
-                            xy=(bar.get_width(), bar.get_y() + bar.get_height() / 2),
-                            xytext=(10, 0),
-                            textcoords='offset points',
-                            bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8),
-                            fontsize=9
-                        )
-                        fig.canvas.draw_idle()
-                        return
-                # Remove any existing annotations
-                for annot in ax.texts:
-                    annot.remove()
-                fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect('motion_notify_event', on_hover)
-
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        def draw(data):
+            # Increased figure size for better spacing
+            fig, ax = plt.subplots(figsize=(7, 5))
+            fig.subplots_adjust(left=0.15)  # Shift graph to the right
+
+            # Format product names with categories
+            names = [f"{product[0]} ({product[1]})" for product in data] if data else []
+            quantities = [product[2] for product in data] if data else []
+
+            # Adjust bar width and spacing
+            bars = ax.barh(names, quantities, color='skyblue', height=0.6)
+
+            # Adjust font sizes and padding
+            ax.set_title(title, fontsize=12)
+            ax.set_xlabel('Quantity Sold', fontsize=10)
+            ax.tick_params(axis='y', which='major', labelsize=9)
+            ax.tick_params(axis='x', which='major', labelsize=9)
+
+            # Shift the plot slightly to the right
+            ax.set_position([0.2, 0.1, 0.7, 0.8])  # [left, bottom, width, height]
+
+            # Add padding
+            plt.tight_layout(rect=[0, 0, 1, 0.95])
+
+            # Add hover tooltip functionality
+            def on_hover(event):
+                if event.inaxes == ax:
+                    for bar in bars:
+                        contains, _ = bar.contains(event)
+                        if contains:
+                            value = bar.get_width()
+                            ax.annotate(
+                                f'{value}',
+                                xy=(bar.get_width(), bar.get_y() + bar.get_height() / 2),
+                                xytext=(10, 0),
+                                textcoords='offset points',
+                                bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8),
+                                fontsize=9
+                            )
+                            fig.canvas.draw_idle()
+                            return
+                    # Remove any existing annotations
+                    for annot in ax.texts:
+                        annot.remove()
+                    fig.canvas.draw_idle()
+
+            fig.canvas.mpl_connect('motion_notify_event', on_hover)
+
+            return fig
+
+        self.chart(parent, "top_products", draw=draw, key=f"top_products:{title}")
 
     def create_revenue_per_product_chart(self, parent):
-        query = """
-            SELECT p.product_name, SUM(oi.quantity * oi.price) AS revenue
-            FROM order_items oi JOIN products p ON oi.product_id = p.product_id
-            GROUP BY oi.product_id ORDER BY revenue DESC LIMIT 10;
-        """
-        self.cur.execute(query)
-        data = self.cur.fetchall()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        fig.subplots_adjust(left=0.15)  # Shift graph to the right
-        names, revenues = zip(*data) if data else ([], [])
-        ax.barh(names, revenues, color='lightgreen')
-        ax.set_title("Revenue by Product")
-        ax.set_xlabel('Revenue (Rs)')
-        ax.invert_yaxis()
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        def draw(data):
+            fig, ax = plt.subplots(figsize=(6, 4))
+            fig.subplots_adjust(left=0.15)  # Shift graph to the right
+            names, revenues = zip(*data) if data else ([], [])
+            ax.barh(names, revenues, color='lightgreen')
+            ax.set_title("Revenue by Product")
+            ax.set_xlabel('Revenue (Rs)')
+            ax.invert_yaxis()
+            return fig
+
+        self.chart(parent, "revenue_per_product", draw)
 
     def create_category_revenue_chart(self, parent, title="Category Revenue"):
-        query = """
-            SELECT p.category, SUM(oi.quantity * oi.price) AS revenue
-            FROM order_items oi JOIN products p ON oi.product_id = p.product_id
-            GROUP BY p.category;
-        """
-        self.cur.execute(query)
-        data = self.cur.fetchall()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        fig.subplots_adjust(left=0.15)  # Shift graph to the right
-        categories, revenues = zip(*data) if data else ([], [])
-        ax.pie(revenues, labels=categories, autopct='%1.1f%%', startangle=90)
-        ax.set_title(title)
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        def draw(data):
+            fig, ax = plt.subplots(figsize=(6, 4))
+            fig.subplots_adjust(left=0.15)  # Shift graph to the right
+            categories, revenues = zip(*data) if data else ([], [])
+            ax.pie(revenues, labels=categories, autopct='%1.1f%%', startangle=90)
+            ax.set_title(title)
+            return fig
+
+        self.chart(parent, "category_revenue", draw=draw, key=f"category_revenue:{title}")
 
     def create_products_per_category_chart(self, parent):
-        query = "SELECT category, COUNT(*) AS count FROM products GROUP BY category;"
-        self.cur.execute(query)
-        data = self.cur.fetchall()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        fig.subplots_adjust(left=0.15)  # Shift graph to the right
-        categories, counts = zip(*data) if data else ([], [])
-        bars = ax.bar(categories, counts, color='orange')
-        ax.set_title("Products per Category")
-        ax.set_xlabel('Category')
-        ax.set_ylabel('Count')
-        plt.xticks(rotation=45)
-
-        # Add hover tooltip functionality
-        def on_hover(event):
-            if event.inaxes == ax:
-                for bar in bars:
-                    contains, _ = bar.contains(event)
-                    if contains:
-                        value = bar.get_height()
-                        ax.annotate(
-                            f'{value}',
-                            xy=(bar.get_x() + bar.get_width() / 2, bar.get_height()),
-                            xytext=(0, 5),
-                            textcoords='offset points',
-                            ha='center',
-                            bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8),
-                            fontsize=10
-                        )
-                        fig.canvas.draw_idle()
-                        return
-                # Remove any existing annotations
-                for annot in ax.texts:
-                    annot.remove()
-                fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect('motion_notify_event', on_hover)
-
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        def draw(data):
+            fig, ax = plt.subplots(figsize=(6, 4))
+            fig.subplots_adjust(left=0.15)  # Shift graph to the right
+            categories, counts = zip(*data) if data else ([], [])
+            bars = ax.bar(categories, counts, color='orange')
+            ax.set_title("Products per Category")
+            ax.set_xlabel('Category')
+            ax.set_ylabel('Count')
+            plt.xticks(rotation=45)
+
+            # Add hover tooltip functionality
+            def on_hover(event):
+                if event.inaxes == ax:
+                    for bar in bars:
+                        contains, _ = bar.contains(event)
+                        if contains:
+                            value = bar.get_height()
+                            ax.annotate(
+                                f'{value}',
+                                xy=(bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                                xytext=(0, 5),
+                                textcoords='offset points',
+                                ha='center',
+                                bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8),
+                                fontsize=10
+                            )
+                            fig.canvas.draw_idle()
+                            return
+                    # Remove any existing annotations
+                    for annot in ax.texts:
+                        annot.remove()
+                    fig.canvas.draw_idle()
+
+            fig.canvas.mpl_connect('motion_notify_event', on_hover)
+
+            return fig
+
+        self.chart(parent, "products_per_category", draw)
 
     def create_location_sales_chart(self, parent):
-        query = """
-            SELECT SUBSTRING(address, 1, 10) AS location, SUM(total_amount) AS revenue
-            FROM orders GROUP BY address;
-        """
-        self.cur.execute(query)
-        data = self.cur.fetchall()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        fig.subplots_adjust(left=0.15)  # Shift graph to the right
-        locations, revenues = zip(*data) if data else ([], [])
-        ax.pie(revenues, labels=locations, autopct='%1.1f%%', startangle=90)
-        ax.set_title("Sales by Location")
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        def draw(data):
+            fig, ax = plt.subplots(figsize=(6, 4))
+            fig.subplots_adjust(left=0.15)  # Shift graph to the right
+            locations, revenues = zip(*data) if data else ([], [])
+            ax.pie(revenues, labels=locations, autopct='%1.1f%%', startangle=90)
+            ax.set_title("Sales by Location")
+            return fig
+
+        self.chart(parent, "location_sales", draw)
 
     def create_inventory_distribution_chart(self, parent):
-        query = """
-            SELECT SUBSTRING(o.address, 1, 10), SUM(p.quantity) 
-            FROM products p 
-            JOIN order_items oi ON p.product_id = oi.product_id 
-            JOIN orders o ON oi.order_id = o.order_id 
-            WHERE o.address IS NOT NULL
-            GROUP BY o.address;
-        """
-        self.cur.execute(query)
-        data = self.cur.fetchall()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        fig.subplots_adjust(left=0.15)  # Shift graph to the right
-
-        # Filter out any rows where address or quantity is None
-        valid_data = [(loc, qty) for loc, qty in data if loc is not None and qty is not None]
-        locations, quantities = zip(*valid_data) if valid_data else ([], [])
-
-        bars = ax.bar(locations, quantities, color='gold')
-        ax.set_title("Inventory by Location")
-        ax.set_xlabel('Location')
-        ax.set_ylabel('Quantity')
-        plt.xticks(rotation=45)
-
-        # Add hover tooltip functionality
-        def on_hover(event):
-            if event.inaxes == ax:
-                for bar in bars:
-                    contains, _ = bar.contains(event)
-                    if contains:
-                        value = bar.get_height()
-                        ax.annotate(
-                            f'{value}',
-                            xy=(bar.get_x() + bar.get_width() / 2, bar.get_height()),
-                            xytext=(0, 5),
-                            textcoords='offset points',
-                            ha='center',
-                            bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8),
-                            fontsize=10
-                        )
-                        fig.canvas.draw_idle()
-                        return
-                # Remove any existing annotations
-                for annot in ax.texts:
-                    annot.remove()
-                fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect('motion_notify_event', on_hover)
-
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        def draw(data):
+            fig, ax = plt.subplots(figsize=(6, 4))
+            fig.subplots_adjust(left=0.15)  # Shift graph to the right
+
+            # Filter out any rows where address or quantity is None
+            valid_data = [(loc, qty) for loc, qty in data if loc is not None and qty is not None]
+            locations, quantities = zip(*valid_data) if valid_data else ([], [])
+
+            bars = ax.bar(locations, quantities, color='gold')
+            ax.set_title("Inventory by Location")
+            ax.set_xlabel('Location')
+            ax.set_ylabel('Quantity')
+            plt.xticks(rotation=45)
+
+            # Add hover tooltip functionality
+            def on_hover(event):
+                if event.inaxes == ax:
+                    for bar in bars:
+                        contains, _ = bar.contains(event)
+                        if contains:
+                            value = bar.get_height()
+                            ax.annotate(
+                                f'{value}',
+                                xy=(bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                                xytext=(0, 5),
+                                textcoords='offset points',
+                                ha='center',
+                                bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8),
+                                fontsize=10
+                            )
+                            fig.canvas.draw_idle()
+                            return
+                    # Remove any existing annotations
+                    for annot in ax.texts:
+                        annot.remove()
+                    fig.canvas.draw_idle()
+
+            fig.canvas.mpl_connect('motion_notify_event', on_hover)
+
+            return fig
+
+        self.chart(parent, "inventory_distribution", draw)
 
     def create_monthly_trends_chart(self, parent):
-        query = """
-            SELECT MONTH(o.date), SUM(oi.quantity * oi.price) 
-            FROM orders o JOIN order_items oi ON o.order_id = oi.order_id 
-            WHERE YEAR(o.date) = YEAR(CURDATE()) GROUP BY MONTH(o.date) ORDER BY MONTH(o.date);
-        """
-        self.cur.execute(query)
-        data = self.cur.fetchall()
-        fig, ax = plt.subplots(figsize=(10, 5))
-        fig.subplots_adjust(left=0.15)  # Shift graph to the right
-        months, revenues = zip(*data) if data else (range(1, 13), [0]*12)
-        ax.plot(months, revenues, marker='o', color='purple')
-        ax.set_title("Monthly Revenue Trends")
-        ax.set_xlabel('Month')
-        ax.set_ylabel('Revenue (Rs)')
-        ax.set_xticks(range(1, 13))
-        ax.set_xticklabels(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        def draw(data):
+            fig, ax = plt.subplots(figsize=(10, 5))
+            fig.subplots_adjust(left=0.15)  # Shift graph to the right
+            months, revenues = zip(*data) if data else (range(1, 13), [0]*12)
+            ax.set_title("Monthly Revenue Trends")
+            ax.set_xlabel('Month')
+            ax.set_ylabel('Revenue (Rs)')
+            if isinstance(months[0], str):
+                # Filtered by date: one point per 'YYYY-MM' month of the range
+                ax.plot(range(len(months)), revenues, marker='o', color='purple')
+                ax.set_xticks(range(len(months)))
+                ax.set_xticklabels([datetime.strptime(month, "%Y-%m").strftime("%b %y") for month in months],
+                                   rotation=45 if len(months) > 12 else 0)
+                return fig
+            ax.plot(months, revenues, marker='o', color='purple')
+            ax.set_xticks(range(1, 13))
+            ax.set_xticklabels(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+            return fig
+
+        self.chart(parent, "monthly_trends", draw)
 
     def create_least_selling_products(self, parent):
-        query = """
-            SELECT p.product_name, p.category, SUM(oi.quantity) AS total_sold
-            FROM products p LEFT JOIN order_items oi ON p.product_id = oi.product_id
-            GROUP BY p.product_id ORDER BY total_sold ASC LIMIT 5;
-        """
-        self.cur.execute(query)
-        data = self.cur.fetchall()
-        frame = ctk.CTkFrame(parent, fg_color="#2a2d2e")
-        frame.pack(fill="both", expand=True, padx=10, pady=10)
-        ctk.CTkLabel(frame, text="Least Selling Products", font=("Arial", 18, "bold")).pack(pady=10)
-        if data:
-            table = ctk.CTkFrame(frame)
-            table.pack(fill="both", expand=True)
-            ctk.CTkLabel(table, text="Product", font=("Arial", 14, "bold")).grid(row=0, column=0, padx=10, pady=5)
-            ctk.CTkLabel(table, text="Sold", font=("Arial", 14, "bold")).grid(row=0, column=1, padx=10, pady=5)
-
-            for i, (name, category, sold) in enumerate(data):
-                ctk.CTkLabel(table, text=f"{name} ({category})").grid(row=i + 1, column=0, padx=10, pady=5)
-                ctk.CTkLabel(table, text=sold if sold else 0).grid(row=i + 1, column=1, padx=10, pady=5)
-        else:
-            ctk.CTkLabel(frame, text="No data available").pack(pady=20)
+        def draw(data):
+            frame = ctk.CTkFrame(parent, fg_color="#2a2d2e")
+            frame.pack(fill="both", expand=True, padx=10, pady=10)
+            ctk.CTkLabel(frame, text="Least Selling Products", font=("Arial", 18, "bold")).pack(pady=10)
+            if data:
+                table = ctk.CTkFrame(frame)
+                table.pack(fill="both", expand=True)
+                ctk.CTkLabel(table, text="Product", font=("Arial", 14, "bold")).grid(row=0, column=0, padx=10, pady=5)
+                ctk.CTkLabel(table, text="Sold", font=("Arial", 14, "bold")).grid(row=0, column=1, padx=10, pady=5)
+
+                for i, (name, category, sold) in enumerate(data):
+                    ctk.CTkLabel(table, text=f"{name} ({category})").grid(row=i + 1, column=0, padx=10, pady=5)
+                    ctk.CTkLabel(table, text=sold if sold else 0).grid(row=i + 1, column=1, padx=10, pady=5)
+            else:
+                ctk.CTkLabel(frame, text="No data available").pack(pady=20)
+
+        self.executor.load(parent, self.fetch, "least_selling", self.filters, render=draw)
 
     def get_total_sales(self):
-        self.cur.execute("SELECT SUM(total_amount) FROM orders")
-        result = self.cur.fetchone()[0]
+        result = self.fetch('total_sales', self.filters)
         return result if result else 0
 
     def get_total_products(self):
-        self.cur.execute("SELECT COUNT(*) FROM products")
-        return self.cur.fetchone()[0]
+        return self.fetch('total_products', self.filters)
 
 if __name__ == "__main__":
-    con = mysql.connector.connect(host='localhost', user='root', password='manager', database='inventory')
-    if con.is_connected():
-        print("Connected to database")
-        analytics = Analytics(con)
-    else:
-        print("Failed to connect to database")
\ No newline at end of file
+    db = database.connect()
+    print("Connected to database")
+    analytics = Analytics(db)
\ No newline at end of file
@@ -0,0 +1,418 @@
+import datetime
+import os
+import threading
+import time
+
+import numpy as np
+
+EPOCH = datetime.date(1970, 1, 1)
+
+# Days since 1970-01-01 come straight from the server, so no date objects are built per row
+ORDERS_QUERY = """
+    SELECT order_id, user, DATEDIFF(date, '1970-01-01'), payment_status, address, total_amount
+    FROM orders WHERE order_id > %s AND order_id <= %s ORDER BY order_id
+"""
+# The category a line was sold under, as the category rollup (sales_daily_category) counts it
+LINES_QUERY = """
+    SELECT order_id, product_id, quantity, price, COALESCE(category, '')
+    FROM order_items WHERE order_id > %s AND order_id <= %s ORDER BY order_id
+"""
+PRODUCTS_QUERY = "SELECT product_id, product_name, category, quantity FROM products"
+
+
+class Column:
+    """A growable NumPy array; appends amortize by doubling the capacity."""
+
+    def __init__(self, dtype, capacity=1024):
+        self.data = np.empty(capacity, dtype)
+        self.size = 0
+
+    @classmethod
+    def wrap(cls, array):
+        """A column over an existing (e.g. memory-mapped) array; it is only copied if extended."""
+        column = cls(array.dtype, 0)
+        column.data, column.size = array, len(array)
+        return column
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.data.dtype)
+        needed = self.size + len(values)
+        if needed > len(self.data):
+            grown = np.empty(max(needed, 2 * len(self.data)), self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = values
+        self.size = needed
+
+    @property
+    def values(self):
+        return self.data[:self.size]
+
+
+class Dictionary:
+    """Dictionary encoding of a string column: every distinct value gets a dense integer code."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode_all(self, values):
+        return np.fromiter((self.encode(value) for value in values), np.int32, len(values))
+
+    def __len__(self):
+        return len(self.values)
+
+
+def top_n(values, eligible, n, largest=True):
+    """Indexes of the n largest (or smallest) values among the eligible ones, in order, via argpartition."""
+    candidates = np.flatnonzero(eligible)
+    keys = -values[candidates] if largest else values[candidates]
+    if len(candidates) > n:
+        part = np.argpartition(keys, n - 1)[:n]
+        candidates, keys = candidates[part], keys[part]
+    return candidates[np.argsort(keys, kind='stable')]
+
+
+class SalesColumns:
+    """Orders, order lines and products held in memory as columnar NumPy arrays, for the Analytics charts.
+
+    Strings (products, categories, users, addresses, payment statuses) are dictionary-encoded and dates are int
+    days since 1970-01-01. Every line carries the attributes of its order and the category it was sold under
+    (order_items.category, what sales_daily_category counts), so each chart is one vectorized
+    bincount/argpartition pass with no join. The columns are loaded once and then extended with the orders
+    above the order_id watermark; like DashboardStats, a window below the watermark is read again for ids
+    that committed out of order. The methods named after Analytics.CHART_QUERIES return rows shaped like those
+    queries. Thread-safe; set IMS_ANALYTICS_ENGINE=numpy to have Analytics use it instead of SQL.
+    """
+
+    WINDOW = 200
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.products = Dictionary()
+        self.categories = Dictionary()
+        self.users = Dictionary()
+        self.locations = Dictionary()
+        # The charts label a location by the first 10 characters of its address
+        self.location_labels = []
+        self.statuses = Dictionary()
+        self.product_name = []
+        self.product_category = np.empty(0, np.int32)
+        self.product_stock = np.empty(0, np.int64)
+        self.product_exists = np.empty(0, bool)
+
+        self.order_id = Column(np.int64)
+        self.order_day = Column(np.int32)
+        self.order_user = Column(np.int32)
+        self.order_status = Column(np.int16)
+        self.order_location = Column(np.int32)
+        self.order_total = Column(np.float64)
+
+        self.line_product = Column(np.int32)
+        self.line_quantity = Column(np.int64)
+        self.line_revenue = Column(np.float64)
+        self.line_day = Column(np.int32)
+        self.line_user = Column(np.int32)
+        self.line_status = Column(np.int16)
+        self.line_location = Column(np.int32)
+        self.line_category = Column(np.int32)
+
+        self.watermark = None
+        self.recent = set()
+        self.refreshed = 0.0
+
+    # Loading
+    def refresh(self, db, max_age=30):
+        """Loads the columns on first use and brings them up to date when older than max_age seconds."""
+        with self.lock:
+            if self.watermark is None:
+                self.load(db)
+            elif time.monotonic() - self.refreshed > max_age:
+                self.update(db)
+
+    def load(self, db, chunk_size=50000, batch=100000):
+        with self.lock:
+            self.watermark = 0
+            self.update(db, chunk_size, batch)
+
+    def update(self, db, chunk_size=50000, batch=100000):
+        """Appends the orders placed since the last load or update; returns how many were added."""
+        with self.lock:
+            top = db.scalar("SELECT COALESCE(MAX(order_id), 0) FROM orders")
+            self.load_products(db.stream(PRODUCTS_QUERY, size=chunk_size))
+            # A range of order ids at a time, so only one batch of order rows is held as Python tuples
+            added = sum(self.read(db, low, min(low + batch, top), chunk_size)
+                        for low in range(self.watermark - self.WINDOW, top, batch))
+            self.advance(top)
+            return added
+
+    def read(self, db, low, high, chunk_size=50000):
+        """Appends the orders with low < order_id <= high not read yet, and their lines; returns how many."""
+        orders = [row for chunk in db.stream(ORDERS_QUERY, (low, high), chunk_size) for row in chunk
+                  if row[0] not in self.recent]
+        self.append(orders, db.stream(LINES_QUERY, (low, high), chunk_size))
+        self.recent |= {row[0] for row in orders if row[0] > high - self.WINDOW}
+        return len(orders)
+
+    def advance(self, watermark):
+        """Moves the watermark up to watermark; only the ids within WINDOW below it are still remembered."""
+        self.watermark = max(self.watermark, watermark)
+        self.recent = {order_id for order_id in self.recent if order_id > self.watermark - self.WINDOW}
+        self.refreshed = time.monotonic()
+
+    def load_products(self, chunks):
+        """Replaces the product attributes; stock and categories change all the time, so they are not appended."""
+        names, categories, stock, exists = {}, {}, {}, set()
+        for chunk in chunks:
+            for product_id, name, category, quantity in chunk:
+                code = self.products.encode(product_id)
+                names[code], categories[code], stock[code] = name, self.categories.encode(category), quantity
+                exists.add(code)
+        size = len(self.products)
+        self.product_name = [names.get(code) for code in range(size)]
+        self.product_category = np.full(size, -1, np.int32)
+        self.product_stock = np.zeros(size, np.int64)
+        self.product_exists = np.zeros(size, bool)
+        if exists:
+            codes = np.fromiter(exists, np.int64, len(exists))
+            self.product_category[codes] = [categories[code] for code in codes]
+            self.product_stock[codes] = [stock[code] for code in codes]
+            self.product_exists[codes] = True
+
+    def append(self, orders, line_chunks):
+        """Adds orders (sorted by id) and the chunks of their (order_id, product_id, quantity, price, category)
+        lines."""
+        if not orders:
+            return
+        ids = np.fromiter((row[0] for row in orders), np.int64, len(orders))
+        days = np.array([row[2] if row[2] is not None else -1 for row in orders], np.int32)
+        users = self.users.encode_all([row[1] for row in orders])
+        statuses = self.statuses.encode_all([row[3] for row in orders]).astype(np.int16)
+        locations = self.locations.encode_all([row[4] for row in orders])
+        self.location_labels += [address[:10] if address is not None else None
+                                 for address in self.locations.values[len(self.location_labels):]]
+        self.order_id.extend(ids)
+        self.order_day.extend(days)
+        self.order_user.extend(users)
+        self.order_status.extend(statuses)
+        self.order_location.extend(locations)
+        self.order_total.extend([float(row[5] or 0) for row in orders])
+
+        for chunk in line_chunks:
+            if not chunk:
+                continue
+            line_orders = np.fromiter((row[0] for row in chunk), np.int64, len(chunk))
+            position = np.minimum(np.searchsorted(ids, line_orders), len(ids) - 1)
+            # Lines of orders committed after the orders were read are picked up by the next update
+            matched = ids[position] == line_orders
+            position = position[matched]
+            chunk = [row for row, keep in zip(chunk, matched) if keep]
+            quantity = np.fromiter((row[2] for row in chunk), np.int64, len(chunk))
+            price = np.fromiter((float(row[3]) for row in chunk), np.float64, len(chunk))
+            self.line_product.extend(self.products.encode_all([row[1] for row in chunk]))
+            self.line_quantity.extend(quantity)
+            self.line_revenue.extend(quantity * price)
+            self.line_day.extend(days[position])
+            self.line_user.extend(users[position])
+            self.line_status.extend(statuses[position])
+            self.line_location.extend(locations[position])
+            self.line_category.extend(self.categories.encode_all([row[4] for row in chunk]))
+
+        # Products only seen in order lines (deleted since) get codes too
+        missing = len(self.products) - len(self.product_exists)
+        if missing:
+            self.product_name += [None] * missing
+            self.product_category = np.concatenate([self.product_category, np.full(missing, -1, np.int32)])
+            self.product_stock = np.concatenate([self.product_stock, np.zeros(missing, np.int64)])
+            self.product_exists = np.concatenate([self.product_exists, np.zeros(missing, bool)])
+
+    # Aggregations; every chart takes the analytics_filters.Filters of the view, None for all data
+    def mask(self, filters, table='line'):
+        """Boolean mask of the lines (or orders) matching filters, None when there is nothing to filter."""
+        if not filters:
+            return None
+        days = getattr(self, f'{table}_day').values
+        mask = np.ones(len(days), bool)
+        if filters.start:
+            mask &= days >= (filters.start - EPOCH).days
+        if filters.end:
+            mask &= days <= (filters.end - EPOCH).days
+        for value, dictionary, column in ((filters.user, self.users, 'user'),
+                                          (filters.payment_status, self.statuses, 'status')):
+            if value is not None:
+                mask &= getattr(self, f'{table}_{column}').values == dictionary.codes.get(value, -1)
+        if filters.category is not None:
+            # Orders have no category; location_sales reads the lines instead when one is set
+            mask &= self.line_category.values == self.categories.codes.get(filters.category, -2)
+        return mask
+
+    def lines(self, filters, *names):
+        """The named line columns, restricted to the lines matching filters."""
+        mask = self.mask(filters)
+        columns = [getattr(self, f'line_{name}').values for name in names]
+        return columns if mask is None else [column[mask] for column in columns]
+
+    def dated(self, filters, *names):
+        """lines() of the orders with a date, the ones the daily rollups (and so the SQL charts) count."""
+        days, *columns = self.lines(filters, 'day', *names)
+        return [column[days >= 0] for column in columns]
+
+    def in_category(self, filters):
+        """Mask of the existing products, in the filtered category if there is one."""
+        if filters is None or filters.category is None:
+            return self.product_exists
+        return self.product_exists & (self.product_category == self.categories.codes.get(filters.category, -2))
+
+    def sold(self, filters=None):
+        """Units sold and number of lines per product code."""
+        size = len(self.products)
+        products, quantity = self.lines(filters, 'product', 'quantity')
+        return np.bincount(products, weights=quantity, minlength=size), np.bincount(products, minlength=size)
+
+    def top_products(self, n=5, filters=None):
+        with self.lock:
+            units, lines = self.sold(filters)
+            top = top_n(units, self.product_exists & (lines > 0), n)
+            return [(self.product_name[code], self.categories.values[self.product_category[code]], int(units[code]))
+                    for code in top]
+
+    def revenue_per_product(self, n=10, filters=None):
+        with self.lock:
+            size = len(self.products)
+            products, revenue = self.lines(filters, 'product', 'revenue')
+            lines = np.bincount(products, minlength=size)
+            revenue = np.bincount(products, weights=revenue, minlength=size)
+            top = top_n(revenue, self.product_exists & (lines > 0), n)
+            return [(self.product_name[code], float(revenue[code])) for code in top]
+
+    def least_selling(self, n=5, filters=None):
+        with self.lock:
+            units, lines = self.sold(filters)
+            # Products that never sold come first, like the NULL totals of the LEFT JOIN
+            top = top_n(np.where(lines > 0, units, -1), self.in_category(filters), n, largest=False)
+            return [(self.product_name[code], self.categories.values[self.product_category[code]],
+                     int(units[code]) if lines[code] else None) for code in top]
+
+    def category_revenue(self, filters=None):
+        with self.lock:
+            # By the category each line was sold under, '' for lines of products deleted before it was stored
+            categories, revenue = self.dated(filters, 'category', 'revenue')
+            size = len(self.categories)
+            lines = np.bincount(categories, minlength=size)
+            revenue = np.bincount(categories, weights=revenue, minlength=size)
+            return [(self.categories.values[code], float(revenue[code])) for code in np.flatnonzero(lines)]
+
+    def products_per_category(self, filters=None):
+        with self.lock:
+            category = self.product_category[self.in_category(filters)]
+            counts = np.bincount(category, minlength=len(self.categories))
+            return [(self.categories.values[code], int(counts[code])) for code in np.flatnonzero(counts)]
+
+    def location_sales(self, filters=None):
+        with self.lock:
+            size = len(self.locations)
+            if filters and filters.category is not None:
+                locations, amounts = self.lines(filters, 'location', 'revenue')
+            else:
+                mask = self.mask(filters, 'order')
+                locations, amounts = self.order_location.values, self.order_total.values
+                if mask is not None:
+                    locations, amounts = locations[mask], amounts[mask]
+            totals = np.bincount(locations, weights=amounts, minlength=size)
+            orders = np.bincount(locations, minlength=size)
+            codes = np.flatnonzero(orders)
+            return list(zip([self.location_labels[code] for code in codes.tolist()], totals[codes].tolist()))
+
+    def inventory_distribution(self, filters=None):
+        with self.lock:
+            products, locations = self.lines(filters, 'product', 'location')
+            exists = self.product_exists[products]
+            size = len(self.locations)
+            stock = np.bincount(locations, weights=self.product_stock[products] * exists, minlength=size)
+            lines = np.bincount(locations, weights=exists, minlength=size)
+            null = self.locations.codes.get(None)
+            if null is not None:
+                lines[null] = 0
+            codes = np.flatnonzero(lines)
+            return list(zip([self.location_labels[code] for code in codes.tolist()],
+                            stock[codes].astype(np.int64).tolist()))
+
+    def monthly_trends(self, year=None, filters=None):
+        """Revenue per month (1-12) of year, default the current one.
+
+        With filters, revenue per 'YYYY-MM' month of their date range (the current year if none is set), like
+        the filtered SQL.
+        """
+        with self.lock:
+            if not filters:
+                year = year or datetime.date.today().year
+                months, revenue, lines = self.per_month(self.line_day.values, self.line_revenue.values,
+                                                        datetime.date(year, 1, 1), datetime.date(year, 12, 31))
+                return [(index + 1, float(revenue[index])) for index in np.flatnonzero(lines)]
+            days, revenue = self.lines(filters, 'day', 'revenue')
+            dated = days[days >= 0]
+            if not len(dated):
+                return []
+            start, end = filters.span()
+            start = start or EPOCH + datetime.timedelta(days=int(dated.min()))
+            end = end or EPOCH + datetime.timedelta(days=int(dated.max()))
+            months, revenue, lines = self.per_month(days, revenue, start, end)
+            return [(str(months[index]), float(revenue[index])) for index in np.flatnonzero(lines)]
+
+    @staticmethod
+    def per_month(days, revenue, start, end):
+        """The months from start to end (dates, inclusive), and the revenue and line count of the days in each."""
+        first, span = (start - EPOCH).days, (end - start).days + 1
+        # Per day first, with the days outside the range clipped into two discarded bins, then per month
+        offsets = np.clip(days.astype(np.int64) - first + 1, 0, span + 1)
+        revenue = np.bincount(offsets, weights=revenue, minlength=span + 2)[1:span + 1]
+        lines = np.bincount(offsets, minlength=span + 2)[1:span + 1]
+        months = np.arange(first, first + span).astype('datetime64[D]').astype('datetime64[M]')
+        index = (months - months[0]).astype(np.int64)
+        return (np.arange(months[0], months[-1] + 1), np.bincount(index, weights=revenue),
+                np.bincount(index, weights=lines))
+
+    def total_sales(self, filters=None):
+        with self.lock:
+            revenue, = self.dated(filters, 'revenue')
+            return float(revenue.sum())
+
+    def total_products(self, filters=None):
+        with self.lock:
+            return int(self.in_category(filters).sum())
+
+    def stats(self):
+        return {'orders': self.order_id.size, 'lines': self.line_product.size, 'products': len(self.products),
+                'watermark': self.watermark,
+                'megabytes': sum(column.data.nbytes for column in vars(self).values()
+                                 if isinstance(column, Column)) / 2 ** 20}
+
+
+# One set of columns per Database, shared by every Analytics window of the process
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def shared(db):
+    """The columns the Analytics charts of db read, or None to query MySQL, per IMS_ANALYTICS_ENGINE.
+
+    numpy: SalesColumns loaded from db; snapshot: the columns exported by snapshot.py, memory-mapped.
+    """
+    engine = os.environ.get('IMS_ANALYTICS_ENGINE')
+    if engine not in ('numpy', 'snapshot'):
+        return None
+    with _shared_lock:
+        if id(db) not in _shared:
+            if engine == 'snapshot':
+                import snapshot  # snapshot imports this module
+                _shared[id(db)] = snapshot.SnapshotColumns(snapshot.Snapshot())
+            else:
+                _shared[id(db)] = SalesColumns()
+        return _shared[id(db)]
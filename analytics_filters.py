@@ -0,0 +1,207 @@
+import datetime
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class Filters:
+    """The filters shared by every Analytics view: an inclusive date range, a category, a user and a payment
+    status. None means any; the default Filters() filters nothing.
+    """
+
+    FIELDS = ('start', 'end', 'category', 'user', 'payment_status')
+
+    def __init__(self, start=None, end=None, category=None, user=None, payment_status=None):
+        if start and end and start > end:
+            raise ValueError("The start date is after the end date")
+        self.start = start
+        self.end = end
+        self.category = category
+        self.user = user
+        self.payment_status = payment_status
+
+    def key(self):
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __eq__(self, other):
+        return isinstance(other, Filters) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __bool__(self):
+        return any(value is not None for value in self.key())
+
+    def __repr__(self):
+        return f"Filters({', '.join(f'{field}={getattr(self, field)!r}' for field in self.FIELDS)})"
+
+    def set(self):
+        """Names of the filters that are set."""
+        return {field for field in self.FIELDS if getattr(self, field) is not None}
+
+    def span(self):
+        """The date range, with the current year standing in for a range that is not set."""
+        if self.start or self.end:
+            return self.start, self.end
+        today = datetime.date.today()
+        return datetime.date(today.year, 1, 1), datetime.date(today.year, 12, 31)
+
+    def describe(self):
+        parts = []
+        if self.start or self.end:
+            parts.append(f"{self.start or '…'} to {self.end or '…'}")
+        parts += [value for value in (self.category, self.user, self.payment_status) if value is not None]
+        return ", ".join(parts) or "All data"
+
+
+class Source:
+    """A table (or join) a chart can be computed from, and the expression of each filter and measure in it."""
+
+    def __init__(self, tables, **columns):
+        self.tables = tables
+        self.columns = columns
+
+    def covers(self, fields):
+        return all(field in self.columns for field in fields)
+
+    def where(self, filters, fields, conditions=()):
+        """A WHERE clause of sargable predicates for the given filters, and its parameters."""
+        clauses, params = list(conditions), []
+        if 'start' in fields and 'end' in fields:
+            clauses.append(f"{self.columns['date']} BETWEEN %s AND %s")
+            params += [filters.start, filters.end]
+        elif 'start' in fields:
+            clauses.append(f"{self.columns['date']} >= %s")
+            params.append(filters.start)
+        elif 'end' in fields:
+            clauses.append(f"{self.columns['date']} <= %s")
+            params.append(filters.end)
+        for field, column in (('category', 'category'), ('user', 'user'), ('payment_status', 'status')):
+            if field in fields:
+                clauses.append(f"{self.columns[column]} = %s")
+                params.append(getattr(filters, field))
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+# The daily rollups are far smaller than the order tables, so they are preferred whenever they carry every
+# filtered column; a user filter needs orders, which has an index on (user, date)
+DAILY = Source("sales_daily s", date="s.sale_date", status="s.payment_status", revenue="s.revenue")
+DAILY_PRODUCT = Source("sales_daily_product s JOIN products p ON s.product_id = p.product_id",
+                       date="s.sale_date", status="s.payment_status", category="p.category", product="s.product_id",
+                       quantity="s.quantity", revenue="s.revenue")
+DAILY_CATEGORY = Source("sales_daily_category s", date="s.sale_date", status="s.payment_status",
+                        category="s.category", quantity="s.quantity", revenue="s.revenue")
+ORDERS = Source("orders o", date="o.date", status="o.payment_status", user="o.user", revenue="o.total_amount")
+LINES = Source("orders o JOIN order_items oi ON oi.order_id = o.order_id JOIN products p ON p.product_id = oi.product_id",
+               date="o.date", status="o.payment_status", user="o.user", category="COALESCE(oi.category, '')",
+               product="oi.product_id", quantity="oi.quantity", revenue="oi.quantity * oi.price")
+PRODUCTS = Source("products p", category="p.category")
+
+DATE_FIELDS = ('start', 'end')
+ALL_FIELDS = set(Filters.FIELDS)
+
+# Chart name -> (SELECT template, filters that apply, sources in order of preference). Templates name the
+# measures of the source in braces; %% is a literal % once the parameters are bound.
+CHARTS = {
+    'top_products': ("SELECT p.product_name, p.category, SUM({quantity}) AS total_sold FROM {tables} {where} "
+                     "GROUP BY {product} ORDER BY total_sold DESC LIMIT 5", ALL_FIELDS, (DAILY_PRODUCT, LINES)),
+    'revenue_per_product': ("SELECT p.product_name, SUM({revenue}) AS revenue FROM {tables} {where} "
+                            "GROUP BY {product} ORDER BY revenue DESC LIMIT 10", ALL_FIELDS, (DAILY_PRODUCT, LINES)),
+    'category_revenue': ("SELECT {category}, SUM({revenue}) AS revenue FROM {tables} {where} GROUP BY {category}",
+                         ALL_FIELDS, (DAILY_CATEGORY, LINES)),
+    # The catalogue has no dates, customers or payments; only the category applies
+    'products_per_category': ("SELECT p.category, COUNT(*) AS count FROM {tables} {where} GROUP BY p.category",
+                              {'category'}, (PRODUCTS,)),
+    'location_sales': ("SELECT SUBSTRING(o.address, 1, 10) AS location, SUM({revenue}) AS revenue "
+                       "FROM {tables} {where} GROUP BY o.address", ALL_FIELDS, (ORDERS, LINES)),
+    'inventory_distribution': ("SELECT SUBSTRING(o.address, 1, 10), SUM(p.quantity) FROM {tables} {where} "
+                               "GROUP BY o.address", ALL_FIELDS, (LINES,)),
+    'monthly_trends': ("SELECT DATE_FORMAT({date}, '%%Y-%%m') AS month, SUM({revenue}) FROM {tables} {where} "
+                       "GROUP BY month ORDER BY month", ALL_FIELDS, (DAILY, DAILY_CATEGORY, LINES)),
+    'total_sales': ("SELECT SUM({revenue}) FROM {tables} {where}", ALL_FIELDS, (DAILY, DAILY_CATEGORY, LINES)),
+    'total_products': ("SELECT COUNT(*) FROM {tables} {where}", {'category'}, (PRODUCTS,)),
+}
+
+
+def query(name, filters):
+    """The SQL and parameters of chart name under filters, read from the smallest table that can answer it.
+
+    Dates are compared as plain ranges on the date column, so the (date, ...) keys of the rollups and the date
+    indexes of orders are used. Monthly trends cover the current year unless a date range is set.
+    """
+    if name == 'least_selling':
+        return least_selling_query(filters)
+    template, applies, sources = CHARTS[name]
+    fields = filters.set() & applies
+    conditions = []
+    if name == 'monthly_trends' and not fields & set(DATE_FIELDS):
+        filters = Filters(*filters.span(), filters.category, filters.user, filters.payment_status)
+        fields |= set(DATE_FIELDS)
+    if name == 'inventory_distribution':
+        conditions.append("o.address IS NOT NULL")
+    source = next(source for source in sources if source.covers(field_columns(fields)))
+    where, params = source.where(filters, fields, conditions)
+    return template.format(tables=source.tables, where=where, **source.columns), params
+
+
+def least_selling_query(filters):
+    """Products with the fewest units sold under filters; unsold products first, like the unfiltered query."""
+    fields = filters.set() - {'category'}
+    source = next(source for source in (DAILY_PRODUCT, LINES) if source.covers(field_columns(fields)))
+    where, params = source.where(filters, fields)
+    sold = (f"SELECT {source.columns['product']} AS product_id, SUM({source.columns['quantity']}) AS quantity "
+            f"FROM {source.tables} {where} GROUP BY {source.columns['product']}")
+    category, category_params = PRODUCTS.where(filters, filters.set() & {'category'})
+    return (f"SELECT p.product_name, p.category, s.quantity AS total_sold FROM products p "
+            f"LEFT JOIN ({sold}) s ON s.product_id = p.product_id {category} ORDER BY total_sold ASC LIMIT 5",
+            params + category_params)
+
+
+def field_columns(fields):
+    """The source columns needed to filter on fields."""
+    return {'date' if field in DATE_FIELDS else 'status' if field == 'payment_status' else field for field in fields}
+
+
+class ResultCache:
+    """Query results per (chart, filters), so going back to a view or a filter set shown recently is instant.
+
+    Entries expire after max_age seconds (IMS_ANALYTICS_CACHE_SECONDS, default 60; 0 disables the cache) so new
+    orders show up, and at most size are kept, least recently used evicted first. Thread-safe, as the charts
+    are fetched on the background executor.
+    """
+
+    def __init__(self, max_age=None, size=64):
+        if max_age is None:
+            max_age = float(os.environ.get('IMS_ANALYTICS_CACHE_SECONDS', 60))
+        self.max_age = max_age
+        self.size = size
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """The cached result of key if it is fresh, otherwise compute() (cached for next time)."""
+        with self.lock:
+            entry = self.results.get(key)
+            if entry and time.monotonic() - entry[0] < self.max_age:
+                self.hits += 1
+                self.results.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+        result = compute()
+        if self.max_age > 0:
+            with self.lock:
+                self.results[key] = (time.monotonic(), result)
+                self.results.move_to_end(key)
+                while len(self.results) > self.size:
+                    self.results.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+
+    def stats(self):
+        return {'results': len(self.results), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import datetime
+import hmac
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from urllib.parse import parse_qs
+
+import database
+import schema
+from checkout import OutOfStockError
+from products import PRODUCT_COLUMNS, ValidationError
+from services import DuplicateProduct, InventoryService, NotFound, ServiceError
+
+# Maximum accepted request body, to keep a misbehaving client from exhausting memory
+MAX_BODY = 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class InventoryAPI:
+    """A plain ASGI application exposing InventoryService over HTTP/JSON so several tills can share one backend.
+
+    Handlers are coroutines; the blocking service calls run on a thread pool sized to the database connection
+    pool, so requests beyond the pool size queue for a thread instead of for a connection. When IMS_API_TOKEN
+    is set every request must send "Authorization: Bearer <token>".
+
+        GET  /health                 pool statistics
+        GET  /categories
+        GET  /products?category=&after=&limit=
+        GET  /products/<id>
+        POST /products               {"product_id": ..., "product_name": ..., ...}
+        POST /cart/quote             {"items": [{"product_id": ..., "quantity": ...}]}
+        POST /checkout               {"user", "items", "payment_status", "customer_name", "phone_number", "address"}
+    """
+
+    def __init__(self, service, workers=None, token=None):
+        self.service = service
+        self.workers = workers or service.db.pool.size
+        self.threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ims-api')
+        self.token = token if token is not None else os.environ.get('IMS_API_TOKEN')
+        self.routes = [
+            ('GET', re.compile(r'^/health$'), self.health),
+            ('GET', re.compile(r'^/categories$'), self.categories),
+            ('GET', re.compile(r'^/products$'), self.list_products),
+            ('GET', re.compile(r'^/products/(\w+)$'), self.get_product),
+            ('POST', re.compile(r'^/products$'), self.add_product),
+            ('POST', re.compile(r'^/cart/quote$'), self.quote),
+            ('POST', re.compile(r'^/checkout$'), self.checkout),
+        ]
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.threads, fn, *args)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        try:
+            self.authorize(scope)
+            handler, match = self.route(scope['method'], scope['path'])
+            body = await self.read_body(receive) if scope['method'] == 'POST' else None
+            status, payload = await handler(scope, body, *match.groups())
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except (ValidationError, DuplicateProduct) as e:
+            status, payload = (409 if isinstance(e, DuplicateProduct) else 400), {'error': str(e)}
+        except NotFound as e:
+            status, payload = 404, {'error': str(e)}
+        except OutOfStockError as e:
+            status, payload = 409, {'error': str(e)}
+        except ServiceError as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            print(f"[!]   API error on {scope['method']} {scope['path']}: {e}")
+            status, payload = 500, {'error': "Internal server error"}
+        await self.respond(send, status, payload)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.threads.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def authorize(self, scope):
+        if not self.token:
+            return
+        headers = dict(scope.get('headers') or [])
+        sent = headers.get(b'authorization', b'').decode('latin-1')
+        if not hmac.compare_digest(sent, f"Bearer {self.token}"):
+            raise HTTPError(401, "Missing or invalid token")
+
+    def route(self, method, path):
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return handler, match
+                allowed = True
+        if allowed:
+            raise HTTPError(405, "Method not allowed")
+        raise HTTPError(404, "Not found")
+
+    async def read_body(self, receive):
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                break
+        try:
+            body = json.loads(b''.join(chunks) or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    async def respond(self, send, status, payload):
+        body = json.dumps(payload, default=_json_default).encode()
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'),
+                                (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    # Handlers return (status, payload)
+    async def health(self, scope, body):
+        return 200, {'status': 'ok', 'pool': self.service.db.stats()}
+
+    async def categories(self, scope, body):
+        return 200, {'categories': await self.run(self.service.categories)}
+
+    async def list_products(self, scope, body):
+        query = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+        try:
+            limit = min(int(query.get('limit', 100)), 1000)
+        except ValueError:
+            raise HTTPError(400, "limit must be a number")
+        products = await self.run(self.service.products, query.get('category'), query.get('after'), limit)
+        return 200, {'products': products}
+
+    async def get_product(self, scope, body, product_id):
+        return 200, await self.run(self.service.product, product_id)
+
+    async def add_product(self, scope, body):
+        product = await self.run(self.service.add_product, *(body.get(column) for column in PRODUCT_COLUMNS))
+        return 201, product
+
+    async def quote(self, scope, body):
+        lines, total = await self.run(self.service.quote, self.items(body))
+        return 200, {'lines': [{'product_id': product_id, 'quantity': quantity, 'price': price, 'in_stock': in_stock}
+                               for product_id, quantity, price, in_stock in lines],
+                     'total_amount': total}
+
+    async def checkout(self, scope, body):
+        order = await self.run(self.service.checkout, body.get('user'), self.items(body),
+                               body.get('payment_status', 'paid'), body.get('customer_name'),
+                               body.get('phone_number'), body.get('address'))
+        restocked = await self.run(self.service.restock, order['order_id'],
+                                   [product_id for product_id, _, _ in order['lines']])
+        return 201, {'order_id': order['order_id'], 'total_amount': order['total_amount'],
+                     'lines': [{'product_id': product_id, 'quantity': quantity, 'price': price}
+                               for product_id, quantity, price in order['lines']],
+                     'restocked': [product_id for product_id, *_ in restocked]}
+
+    @staticmethod
+    def items(body):
+        items = body.get('items')
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise HTTPError(400, "items must be a list of {product_id, quantity} objects")
+        return [(item.get('product_id'), item.get('quantity')) for item in items]
+
+
+def create_app(pool_size=10):
+    """Connects to MySQL, applies pending migrations and returns the ASGI application."""
+    db = database.connect(size=pool_size)
+    schema.migrate(db)
+    return InventoryAPI(InventoryService(db))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the inventory HTTP/JSON API (needs uvicorn).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pool-size', type=int, default=10, help="MySQL connections (and API worker threads)")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The API server needs uvicorn: pip install uvicorn")
+    uvicorn.run(create_app(args.pool_size), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Analytics chart latency: the SQL queries vs the in-memory NumPy engine.
+
+Generates a synthetic dataset of about N order lines into a scratch database
+for each --lines value, then for every chart reports the median latency of its
+SQL query and of the same rows computed by analytics_engine.SalesColumns, plus
+the engine's one-off load time, memory and the time to pick up new orders.
+Every chart and total computed by the engine is checked against its SQL rows
+first; the benchmark fails if any differ.
+
+    python -m benchmarks.bench_analytics_engine --lines 1000000 --lines 10000000
+
+--offline fills the columns straight from the synthetic generator instead, so
+the vectorized aggregations can be timed without MySQL (SQL latency and load
+time are then not reported).
+"""
+import argparse
+import datetime
+import random
+import statistics
+import time
+from decimal import Decimal
+
+import database
+import schema
+from Analytics import Analytics
+from analytics_engine import EPOCH, SalesColumns
+from benchmarks import synthetic
+
+SCRATCH_DB = 'inventory_bench_engine'
+
+
+def orders_for(lines):
+    """Number of synthetic orders that gives about lines order lines."""
+    weights = synthetic.LINES_PER_ORDER
+    return max(1, round(lines * sum(weights) / sum((i + 1) * w for i, w in enumerate(weights))))
+
+
+def median_ms(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def offline(dataset):
+    """SalesColumns filled from the generator's rows, as load() would fill them from MySQL."""
+    engine = SalesColumns()
+    rng = random.Random(dataset.seed)
+    _, products, users = synthetic.catalogue(dataset, rng)
+    engine.load_products([[(row[0], row[1], row[5], row[4]) for row in products]])
+    category = {row[0]: row[5] for row in products}
+    for order_rows, item_rows in synthetic.order_batches(dataset, products, users, rng):
+        orders = [(row[0], row[1], (row[2] - EPOCH).days, row[5], row[8], row[4]) for row in order_rows]
+        engine.append(orders, [[(*row, category[row[1]]) for row in item_rows]])
+    engine.watermark = int(engine.order_id.values[-1])
+    return engine
+
+
+def normalized(name, rows):
+    """Rows of a chart in a comparable form: sorted, numbers rounded to cents, a total as one row. Leaderboards
+    keep only their values, as ties may be broken differently."""
+    if name in Analytics.TOTAL_QUERIES:
+        rows = [((rows[0][0] if isinstance(rows, list) else rows) or 0,)]
+    rows = [tuple(round(float(value), 2) if isinstance(value, (int, float, Decimal)) else value for value in row)
+            for row in rows]
+    if name in ('top_products', 'revenue_per_product', 'least_selling'):
+        rows = [row[-1:] for row in rows]
+    return sorted(rows, key=repr)
+
+
+def parity(engine, db):
+    """Names of the charts and totals whose engine rows differ from the SQL rows."""
+    return [name for name, query in {**Analytics.CHART_QUERIES, **Analytics.TOTAL_QUERIES}.items()
+            if normalized(name, getattr(engine, name)()) != normalized(name, db.fetchall(query))]
+
+
+def measure(lines, iterations, seed, use_mysql):
+    dataset = synthetic.Dataset.preset('large', orders=orders_for(lines), seed=seed)
+    print(f"\n~{lines:,} lines ({dataset.orders:,} orders)")
+    db = None
+    start = time.perf_counter()
+    if use_mysql:
+        db = database.connect(size=1, name=SCRATCH_DB)
+        db.execute(f"DROP DATABASE {SCRATCH_DB}")
+        db.close()
+        db = database.connect(size=2, name=SCRATCH_DB)
+        schema.migrate(db)
+        synthetic.generate(db, dataset)
+        print(f"Generated in {time.perf_counter() - start:.0f}s")
+        engine = SalesColumns()
+        start = time.perf_counter()
+        engine.load(db)
+        print(f"Engine load {time.perf_counter() - start:.1f}s")
+        differ = parity(engine, db)
+        assert not differ, f"engine rows differ from SQL for: {', '.join(differ)}"
+    else:
+        engine = offline(dataset)
+        print(f"Columns built from the generator in {time.perf_counter() - start:.0f}s")
+    stats = engine.stats()
+    print(f"{stats['orders']:,} orders, {stats['lines']:,} lines, {stats['megabytes']:.0f} MB of columns")
+
+    print(f"{'chart':<24} {'SQL ms':>10} {'engine ms':>10} {'speedup':>8}")
+    for name, query in Analytics.CHART_QUERIES.items():
+        computed = median_ms(getattr(engine, name), iterations)
+        if db:
+            sql = median_ms(lambda: db.fetchall(query), iterations)
+            print(f"{name:<24} {sql:>10.1f} {computed:>10.1f} {sql / computed:>7.0f}x")
+        else:
+            print(f"{name:<24} {'-':>10} {computed:>10.1f}")
+
+    if db:
+        # Pick up a few new orders, as the charts do after a checkout
+        product_id = db.scalar("SELECT product_id FROM products LIMIT 1")
+        with db.transaction() as cur:
+            for _ in range(10):
+                cur.execute("INSERT INTO orders (user, date, total_items, total_amount, payment_status, address) "
+                            "VALUES ('user0000', %s, 1, 100, 'paid', '1 MG Road, Pune')", (datetime.date.today(),))
+                cur.execute("INSERT INTO order_items (order_id, product_id, quantity, price) "
+                            "VALUES (LAST_INSERT_ID(), %s, 1, 100)", (product_id,))
+        start = time.perf_counter()
+        added = engine.update(db)
+        print(f"Engine update with {added} new orders {(time.perf_counter() - start) * 1000:.1f} ms")
+        db.execute(f"DROP DATABASE {SCRATCH_DB}")
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, action='append', help="approximate order lines (repeatable)")
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--offline', action='store_true', help="time the engine only, without MySQL")
+    args = parser.parse_args()
+
+    for lines in args.lines or [1000000, 10000000]:
+        measure(lines, args.iterations, args.seed, not args.offline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Analytics latency for a one-month view vs the unfiltered charts, on five years of sales.
+
+Loads a synthetic dataset spanning --years years into a scratch database, then
+for every chart reports the median latency of:
+
+    all time     the unfiltered query (what every view ran before filters)
+    one month    the last month, read from the daily rollups
+    month+user   the last month of one customer, read from orders by (user, date)
+    cached       the one-month view again, served from the per-filter cache
+
+and the rows MySQL estimates it examines for the unfiltered and one-month
+queries (EXPLAIN).
+
+    python -m benchmarks.bench_analytics_filters --size medium --years 5
+"""
+import argparse
+import datetime
+import statistics
+import time
+
+import database
+import schema
+from Analytics import Analytics
+from analytics_filters import Filters, ResultCache, query
+from benchmarks import synthetic
+
+SCRATCH_DB = 'inventory_bench_filters'
+
+
+def median_ms(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def examined(db, sql, params=None):
+    """Sum of the rows EXPLAIN estimates each table of sql reads."""
+    with db.pool.connection() as con:
+        cur = con.cursor(dictionary=True)
+        cur.execute("EXPLAIN " + sql, params)
+        rows = sum(row['rows'] or 0 for row in cur.fetchall())
+        cur.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=synthetic.SIZES, default='medium', help="synthetic dataset size")
+    parser.add_argument('--years', type=int, default=5, help="years of order history")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db = database.connect(size=1, name=SCRATCH_DB)
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db)
+    dataset = synthetic.Dataset.preset(args.size, days=365 * args.years, seed=args.seed)
+    counts = synthetic.generate(db, dataset)
+    print(f"{counts['orders']:,} orders, {counts['order_items']:,} lines over {args.years} years")
+
+    # The last month of the generated sales, whatever day the benchmark runs on
+    month = Filters(dataset.today - datetime.timedelta(days=30), dataset.today)
+    # The busiest customer, so the user filter is not trivially empty
+    user = db.scalar("SELECT user FROM orders GROUP BY user ORDER BY COUNT(*) DESC LIMIT 1")
+    month_user = Filters(month.start, month.end, user=user)
+    results = ResultCache(max_age=3600)
+
+    print(f"{'chart':<24} {'all time ms':>12} {'one month':>10} {'month+user':>11} {'cached':>8} "
+          f"{'rows (all)':>11} {'rows (month)':>13}")
+    for name, unfiltered in {**Analytics.CHART_QUERIES, **Analytics.TOTAL_QUERIES}.items():
+        sql, params = query(name, month)
+        user_sql, user_params = query(name, month_user)
+        full = median_ms(lambda: db.fetchall(unfiltered), args.iterations)
+        filtered = median_ms(lambda: db.fetchall(sql, params), args.iterations)
+        by_user = median_ms(lambda: db.fetchall(user_sql, user_params), args.iterations)
+        results.get((name, month), lambda: db.fetchall(sql, params))
+        cached = median_ms(lambda: results.get((name, month), lambda: db.fetchall(sql, params)), args.iterations)
+        print(f"{name:<24} {full:>12.1f} {filtered:>10.1f} {by_user:>11.1f} {cached:>8.3f} "
+              f"{examined(db, unfiltered):>11,} {examined(db, sql, params):>13,}")
+
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Analytics view-switch latency, open figures and RSS over repeated switching.
+
+Cycles through the five Analytics screens N times, with and without the figure
+cache:
+
+    uncached   every switch builds new figures and never closes them
+               (the old behaviour)
+    cached     figures drawn from unchanged data are reused; the cache is
+               bounded and closes what it evicts
+
+The chart data comes from an in-memory stub, so only the drawing cost is
+measured. --changing makes every query return new data, which measures the
+cache-miss path. Needs a display.
+
+    python -m benchmarks.bench_analytics_views --switches 200
+"""
+import argparse
+import itertools
+import os
+import resource
+import statistics
+import time
+import tkinter
+
+import matplotlib.pyplot as plt
+
+from Analytics import Analytics
+from analytics_filters import ResultCache
+from figure_cache import FigureCache
+from tasks import BackgroundExecutor
+
+
+class StubDB:
+    """Canned chart data; with changing=True every call returns different numbers."""
+
+    def __init__(self, changing=False):
+        self.changing = changing
+        self.calls = 0
+
+    def fetchall(self, query, params=None):
+        self.calls += 1
+        bump = self.calls if self.changing else 0
+        if 'MONTH(sale_date)' in query:
+            return [(month, 1000.0 * month + bump) for month in range(1, 13)]
+        if 'product_name, p.category' in query:
+            return [(f"Product {i}", f"Category{i % 3}", 100 - i + bump) for i in range(5)]
+        if 'product_name' in query:
+            return [(f"Product {i}", 5000.0 - 100 * i + bump) for i in range(10)]
+        return [(f"Group {i}", 300.0 + 10 * i + bump) for i in range(8)]
+
+    def scalar(self, query, params=None):
+        return 12345
+
+    def rows(self, query, params=None):
+        return iter(self.fetchall(query, params))
+
+
+class LeakyCache:
+    """The behaviour before the cache: a new figure every time, never closed."""
+
+    def get(self, key, data, build):
+        return build(data)
+
+    def clear(self):
+        pass
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def switch(mode, switches, changing):
+    analytics = Analytics(StubDB(changing), BackgroundExecutor(synchronous=True), run=False)
+    analytics.figures = LeakyCache() if mode == 'uncached' else FigureCache()
+    # Fetch the stub data on every switch, so only the figure cache differs between the modes
+    analytics.results = ResultCache(max_age=0)
+    views = [analytics.show_dashboard, analytics.show_product_analytics, analytics.show_category_insights,
+             analytics.show_location_reports, analytics.show_trends]
+    analytics.window.update()
+    start_rss = rss_mb()
+    samples = []
+    try:
+        for view in itertools.islice(itertools.cycle(views), switches):
+            start = time.perf_counter()
+            view()
+            analytics.window.update()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples, rss_mb() - start_rss, len(plt.get_fignums())
+    finally:
+        analytics.close()
+        plt.close('all')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--switches', type=int, default=200)
+    parser.add_argument('--changing', action='store_true', help="new data on every query (cache misses)")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'median ms':>10} {'p95 ms':>8} {'RSS growth MB':>14} {'open figures':>13}")
+    for mode in ('uncached', 'cached'):
+        samples, growth, figures = switch(mode, args.switches, args.changing)
+        ordered = sorted(samples)
+        print(f"{mode:<10} {statistics.median(ordered):>10.1f} {ordered[int(0.95 * (len(ordered) - 1))]:>8.1f} "
+              f"{growth:>14.1f} {figures:>13}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except tkinter.TclError as e:
+        raise SystemExit(f"This benchmark needs a display: {e}")
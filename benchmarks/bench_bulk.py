@@ -0,0 +1,98 @@
+"""Bulk product import/export throughput and peak memory.
+
+Writes a synthetic supplier catalogue (100k rows by default, 1% invalid) as CSV and
+optionally XLSX, imports it into a scratch database (first run inserts, second run
+updates every row), then exports products back out. Peak Python memory is measured
+with tracemalloc on a separate pass so it does not distort the timings.
+
+    python -m benchmarks.bench_bulk --rows 100000 --xlsx
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import bulk
+import database
+import schema
+from products import PRODUCT_COLUMNS
+
+SCRATCH_DB = 'inventory_bench_bulk'
+CATEGORIES = [f"Cat{chr(65 + i)}" for i in range(10)]
+
+
+def catalogue_rows(count):
+    rng = random.Random(7)
+    for i in range(count):
+        category = rng.choice(CATEGORIES) if rng.random() > 0.01 else "Unknown"
+        yield (str(100000 + i), f"Item{chr(65 + i % 26)}", "Supplied",
+               f"{rng.uniform(1, 5000):.2f}", rng.randint(0, 500), category, 10, 50)
+
+
+def write_files(directory, count, xlsx):
+    paths = {'csv': os.path.join(directory, 'catalogue.csv')}
+    with open(paths['csv'], 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(PRODUCT_COLUMNS)
+        writer.writerows(catalogue_rows(count))
+    if xlsx:
+        workbook = bulk._load_openpyxl().Workbook(write_only=True)
+        sheet = workbook.create_sheet('products')
+        sheet.append(PRODUCT_COLUMNS)
+        for row in catalogue_rows(count):
+            sheet.append(row)
+        paths['xlsx'] = os.path.join(directory, 'catalogue.xlsx')
+        workbook.save(paths['xlsx'])
+    return paths
+
+
+def peak_mb(fn, *args):
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--xlsx', action='store_true', help="also benchmark an Excel file (needs openpyxl)")
+    args = parser.parse_args()
+
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db)
+    db.execute("DELETE FROM products")
+    with db.transaction() as cur:
+        cur.executemany("INSERT IGNORE INTO categories VALUES (%s, 18, 9, 9)", [(c,) for c in CATEGORIES])
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, args.rows, args.xlsx)
+        print(f"{'run':<28} {'rows/s':>10} {'added':>8} {'updated':>8} {'rejected':>9} {'peak MB':>8}")
+        for kind, path in paths.items():
+            db.execute("DELETE FROM products")
+            for run in ("insert", "upsert"):
+                report = bulk.import_products(db, path, args.batch_size)
+                print(f"{kind + ' import (' + run + ')':<28} {report.rows_per_second():>10,.0f} "
+                      f"{report.inserted:>8} {report.updated:>8} {len(report.errors):>9}", end="")
+                print(f" {peak_mb(bulk.import_products, db, path, args.batch_size):>8.1f}" if run == "upsert" else "")
+
+        for kind in paths:
+            out = os.path.join(directory, f"export.{kind}")
+            start = time.perf_counter()
+            count = bulk.export(db, 'products', out)
+            seconds = time.perf_counter() - start
+            print(f"{kind + ' export':<28} {count / seconds:>10,.0f} {'':>8} {'':>8} {'':>9} "
+                  f"{peak_mb(bulk.export, db, 'products', out):>8.1f}")
+
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Cost of adding, removing and totalling lines of large shop carts.
+
+Fills a cart of --lines products one add at a time, adds every product again
+(merged into its line), then removes the lines one by one, and reports the
+mean cost per operation including reading the total afterwards, as the shop
+does after every change:
+
+    recompute   the old way: rows of display strings, total re-parsed and
+                summed over every row after each change (O(lines))
+    cart        cart.Cart: Decimal lines with running subtotal and tax (O(1))
+
+With a display, the old Treeview cart (Menu.total walking the tree children)
+is measured against rendering the changed line of a Cart too.
+
+    python -m benchmarks.bench_cart --lines 1000
+"""
+import argparse
+import time
+import tkinter
+from tkinter import ttk
+
+from cart import Cart
+
+HEADINGS = ("Product Id", "Product Name", "Description", "Price", "Quantity", "Total Amount")
+
+
+def products(count):
+    return [(str(100000 + i), f"Product {i}", f"Item {i}", round(10 + i * 0.37, 2), 10 ** 6, f"Category{i % 5}")
+            for i in range(count)]
+
+
+def tax_rate(category):
+    return 9, 9
+
+
+def per_op_us(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def recompute(catalogue):
+    rows = {}
+
+    def add(product):
+        values = rows.get(product[0])
+        quantity = int(values[4]) + 1 if values else 1
+        rows[product[0]] = tuple(map(str, (*product[:4], quantity, product[3] * quantity)))
+        return round(sum(float(values[5]) for values in rows.values()), 2)
+
+    def remove(product):
+        del rows[product[0]]
+        return round(sum(float(values[5]) for values in rows.values()), 2)
+
+    return per_op_us(add, catalogue), per_op_us(add, catalogue), per_op_us(remove, catalogue)
+
+
+def running(catalogue):
+    cart = Cart(tax_rate)
+
+    def add(product):
+        cart.add(product)
+        return cart.subtotal, cart.tax
+
+    def remove(product):
+        cart.remove(product[0])
+        return cart.subtotal, cart.tax
+
+    return per_op_us(add, catalogue), per_op_us(add, catalogue), per_op_us(remove, catalogue)
+
+
+def treeview(catalogue):
+    """The old Treeview cart against a Cart rendered one line at a time; None without a display."""
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        return None
+    tree = ttk.Treeview(root, columns=HEADINGS, show="headings")
+    tree.pack()
+
+    def total():
+        return round(sum(float(tree.item(row, "values")[5]) for row in tree.get_children()), 2)
+
+    def old_add(product):
+        tree.insert('', 'end', values=(*product[:4], 1, product[3]))
+        return total()
+
+    def old_remove(product):
+        tree.delete(tree.get_children()[0])
+        return total()
+
+    old = per_op_us(old_add, catalogue), per_op_us(old_remove, catalogue)
+    cart = Cart(tax_rate)
+
+    def render(line):
+        if line.product_id not in cart:
+            tree.delete(line.product_id)
+        elif tree.exists(line.product_id):
+            tree.item(line.product_id, values=line.values())
+        else:
+            tree.insert('', 'end', iid=line.product_id, values=line.values())
+        return f"{cart.subtotal:.2f}"
+
+    new = (per_op_us(lambda product: render(cart.add(product)), catalogue),
+           per_op_us(lambda product: render(cart.remove(product[0])), catalogue))
+    root.destroy()
+    return old, new
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=1000)
+    args = parser.parse_args()
+    catalogue = products(args.lines)
+
+    print(f"{args.lines} lines, us per operation")
+    print(f"{'':<12} {'add':>10} {'merge':>10} {'remove':>10}")
+    for name, timings in (('recompute', recompute(catalogue)), ('cart', running(catalogue))):
+        print(f"{name:<12} {timings[0]:>10.1f} {timings[1]:>10.1f} {timings[2]:>10.1f}")
+
+    rendered = treeview(catalogue)
+    if rendered is None:
+        print("No display: Treeview comparison skipped")
+        return
+    (old_add, old_remove), (new_add, new_remove) = rendered
+    print(f"{'treeview':<12} {old_add:>10.1f} {'':>10} {old_remove:>10.1f}")
+    print(f"{'cart+render':<12} {new_add:>10.1f} {'':>10} {new_remove:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""SQL round-trips per cart interaction with and without the catalogue cache.
+
+Replays a shop session (pick a category, pick a product, add it to the cart,
+then look up tax rates for the invoice) for many carts, counting the queries
+sent to MySQL, and reports the cache hit rate.
+
+    python -m benchmarks.bench_catalogue --carts 200 --lines 5
+"""
+import argparse
+import random
+
+import database
+import schema
+from catalogue import Catalogue
+
+SCRATCH_DB = 'inventory_bench_catalogue'
+
+
+class CountingDatabase(database.Database):
+    """Database that counts the statements it sends."""
+
+    def __init__(self, pool):
+        super().__init__(pool)
+        self.round_trips = 0
+
+    def _run(self, fetch, query, params=None, retry=True):
+        self.round_trips += 1
+        return super()._run(fetch, query, params, retry)
+
+
+def seed(db, products, categories):
+    db.execute("DELETE FROM products")
+    db.execute("DELETE FROM categories")
+    with db.transaction() as cur:
+        cur.executemany("INSERT INTO categories VALUES (%s, 18, 9, 9)", [(f"Cat{c}",) for c in range(categories)])
+        cur.executemany("INSERT INTO products VALUES (%s, %s, 'bench', 10.00, 1000, %s, 10, 50)",
+                        [(str(i), f"Item{i}", f"Cat{i % categories}") for i in range(products)])
+
+
+def uncached_line(db, category, product_name):
+    """The queries the cart dialog used to send for one line."""
+    db.fetchall("SELECT category_name FROM categories")
+    db.fetchall("SELECT product_name FROM products WHERE category = %s", (category,))
+    db.fetchone("SELECT quantity, price FROM products WHERE product_name = %s", (product_name,))
+    product_id = db.fetchone("SELECT product_id, description, price FROM products WHERE product_name = %s",
+                             (product_name,))[0]
+    category = db.scalar("SELECT category FROM products WHERE product_id = %s", (product_id,))
+    db.fetchone("SELECT CGST, SGST FROM categories WHERE category_name = %s", (category,))
+
+
+def cached_line(catalogue, category, product_name):
+    catalogue.categories()
+    catalogue.products_in(category)
+    catalogue.product_by_name(product_name)
+    product_id = catalogue.product_by_name(product_name)[0]
+    catalogue.tax_rate(catalogue.product(product_id)[5])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--carts', type=int, default=200)
+    parser.add_argument('--lines', type=int, default=5)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--categories', type=int, default=20)
+    args = parser.parse_args()
+
+    setup = database.connect(size=1, name=SCRATCH_DB)
+    schema.migrate(setup)
+    seed(setup, args.products, args.categories)
+    setup.close()
+
+    db = CountingDatabase(database.ConnectionPool(size=1, database=SCRATCH_DB, **database.DB_CONFIG))
+    rng = random.Random(1)
+    picks = [[rng.randrange(args.products) for _ in range(args.lines)] for _ in range(args.carts)]
+    interactions = args.carts * args.lines
+
+    for cart in picks:
+        for i in cart:
+            uncached_line(db, f"Cat{i % args.categories}", f"Item{i}")
+    uncached = db.round_trips
+
+    db.round_trips = 0
+    catalogue = Catalogue(db)
+    for cart in picks:
+        for i in cart:
+            cached_line(catalogue, f"Cat{i % args.categories}", f"Item{i}")
+        catalogue.invalidate()  # checkout changes stock
+    cached = db.round_trips
+
+    print(f"cart lines: {interactions}")
+    print(f"round-trips per line without cache: {uncached / interactions:.2f}")
+    print(f"round-trips per line with cache:    {cached / interactions:.2f}")
+    print(f"cache stats: {catalogue.stats()}")
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
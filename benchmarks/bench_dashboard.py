@@ -0,0 +1,127 @@
+"""Dashboard redraw time and memory growth over repeated navigations.
+
+Navigates between another section and the dashboard N times, the way the side
+panel does, in two modes:
+
+    rebuild      the old behaviour: a new frame, new cards, new figures and
+                 canvases on every visit, the old frame only forgotten
+    incremental  the dashboard built once, shown again and updated in place
+
+Each visit adds a few orders, so every refresh has something to draw. The data
+comes from an in-memory stub by default, so only the UI cost is measured; pass
+--mysql to refresh from the local inventory database instead. Needs a display.
+
+    python -m benchmarks.bench_dashboard --navigations 500
+"""
+import argparse
+import os
+import resource
+import statistics
+import time
+import tkinter
+
+import customtkinter as ctk
+
+import database
+from dashboard import Dashboard, DashboardStats
+from tasks import BackgroundExecutor
+
+
+class StubStats(DashboardStats):
+    """Stats that grow by a few orders per refresh without touching a database."""
+
+    def load(self, db):
+        self.watermark, self.day = 0, None
+        self.sales_today, self.transactions, self.items = 0, 0, 500
+        self.payments = {'Paid': 0, 'Pending': 0}
+        self.earnings = [1000.0 * (month + 1) for month in range(12)]
+        return True
+
+    def update(self, db):
+        if self.watermark is None:
+            return self.load(db)
+        self.watermark += 3
+        self.sales_today += 3
+        self.transactions += 3
+        self.payments['Paid'] += 2
+        self.payments['Pending'] += 1
+        self.earnings[self.watermark % 12] += 250.0
+        return True
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        # Peak rather than current RSS where /proc is not available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def widget_count(widget):
+    return 1 + sum(widget_count(child) for child in widget.winfo_children())
+
+
+def navigate(root, mode, navigations, db, stats_factory):
+    executor = BackgroundExecutor(synchronous=True)
+    frame = ctk.CTkFrame(root)
+    frame.pack(fill="both", expand=True)
+    view = None
+    stats = stats_factory()
+    samples = []
+    root.update()
+    start_rss = rss_mb()
+
+    for _ in range(navigations):
+        # Leave for another section
+        frame.forget()
+        other = ctk.CTkFrame(root)
+        other.pack(fill="both", expand=True)
+        root.update()
+        other.destroy()
+
+        start = time.perf_counter()
+        if mode == 'rebuild' or view is None:
+            frame = ctk.CTkFrame(root)
+            frame.pack(fill="both", expand=True)
+            view = Dashboard(frame, db, executor, stats=stats if mode == 'incremental' else stats_factory())
+        else:
+            frame = view.frame
+            frame.pack(fill="both", expand=True)
+        view.refresh()
+        root.update()  # Deliver the result and draw the canvases
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return samples, rss_mb() - start_rss, widget_count(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--navigations', type=int, default=500)
+    parser.add_argument('--mysql', action='store_true', help="refresh from the local inventory database")
+    args = parser.parse_args()
+
+    db = database.connect(size=2) if args.mysql else None
+    stats_factory = DashboardStats if args.mysql else StubStats
+
+    print(f"{'mode':<12} {'median ms':>10} {'p95 ms':>8} {'RSS growth MB':>14} {'Tk widgets':>11}")
+    for mode in ('rebuild', 'incremental'):
+        root = ctk.CTk()
+        root.geometry("1350x740")
+        try:
+            samples, growth, widgets = navigate(root, mode, args.navigations, db, stats_factory)
+        finally:
+            root.destroy()
+        ordered = sorted(samples)
+        print(f"{mode:<12} {statistics.median(ordered):>10.1f} {ordered[int(0.95 * (len(ordered) - 1))]:>8.1f} "
+              f"{growth:>14.1f} {widgets:>11}")
+
+    if db:
+        db.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except tkinter.TclError as e:
+        raise SystemExit(f"This benchmark needs a display: {e}")
@@ -0,0 +1,92 @@
+"""Hot-query latency before and after the secondary-index migration.
+
+Seeds a scratch database (1M order_items by default) at schema version 2,
+times the queries checked by schema.explain_check, applies the remaining
+migrations and times them again.
+
+    python -m benchmarks.bench_indexes --order-items 1000000
+"""
+import argparse
+import datetime
+import random
+import statistics
+import time
+
+import database
+import schema
+
+SCRATCH_DB = 'inventory_bench_indexes'
+BATCH = 10000
+
+
+def seed(db, order_items, products=5000, users=50, items_per_order=4):
+    rng = random.Random(42)
+    categories = [f"Cat{i}" for i in range(10)]
+    with db.transaction() as cur:
+        cur.executemany("INSERT INTO categories VALUES (%s, 18, 9, 9)", [(c,) for c in categories])
+        cur.executemany("INSERT INTO users VALUES (%s, 'x', 'USER', 'x@example.com')",
+                        [("ADMIN",)] + [(f"user{i}",) for i in range(users)])
+        cur.executemany("INSERT INTO products VALUES (%s, %s, 'bench', %s, 100, %s, 10, 50)",
+                        [(str(i), f"Item{i}", rng.randint(10, 5000), rng.choice(categories)) for i in range(products)])
+
+    today = datetime.date.today()
+    orders = order_items // items_per_order
+    for start in range(0, orders, BATCH):
+        count = min(BATCH, orders - start)
+        order_rows = [
+            (1001 + start + i, rng.choice(["ADMIN"] + [f"user{u}" for u in range(users)]),
+             today - datetime.timedelta(days=rng.randrange(3 * 365)), items_per_order, 0,
+             rng.choice(['paid', 'paid', 'pending']))
+            for i in range(count)
+        ]
+        item_rows = [
+            (order_id, str(int(rng.paretovariate(1.2)) % products), rng.randint(1, 5), rng.randint(10, 5000))
+            for order_id, *_ in order_rows for _ in range(items_per_order)
+        ]
+        with db.transaction() as cur:
+            cur.executemany("INSERT INTO orders (order_id, user, date, total_items, total_amount, payment_status) "
+                            "VALUES (%s, %s, %s, %s, %s, %s)", order_rows)
+            cur.executemany("INSERT INTO order_items (order_id, product_id, quantity, price) "
+                            "VALUES (%s, %s, %s, %s)", item_rows)
+
+
+def time_queries(db, repeat):
+    results = {}
+    for name, (query, params) in schema.hot_queries().items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            db.fetchall(query, params)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--order-items', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db, target=2)
+    print(f"Seeding {args.order_items} order_items...")
+    seed(db, args.order_items)
+
+    before = time_queries(db, args.repeat)
+    schema.migrate(db)
+    db.fetchall("ANALYZE TABLE orders, order_items, products")
+    after = time_queries(db, args.repeat)
+
+    print(f"{'query':<40} {'before (ms)':>12} {'after (ms)':>12}")
+    for name in before:
+        print(f"{name:<40} {before[name]:>12.1f} {after[name]:>12.1f}")
+    _, full_scans = schema.explain_check(db)
+    print("Full scans after migration:", full_scans or "none")
+
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
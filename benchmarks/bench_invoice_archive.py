@@ -0,0 +1,48 @@
+"""Batch invoice regeneration: pages/sec and peak memory for a large date range.
+
+Seeds a scratch database with 50k orders (4 lines each) spread over three years,
+regenerates all their invoices into per-day zip archives and reports pages/sec
+together with the peak resident memory of the coordinating process, which should
+not grow with the number of orders.
+
+    python -m benchmarks.bench_invoice_archive --orders 50000 --workers 4
+"""
+import argparse
+import datetime
+import resource
+import tempfile
+
+import database
+import schema
+from benchmarks.bench_indexes import seed
+from invoice_archive import archive_invoices
+
+SCRATCH_DB = 'inventory_bench_invoice_archive'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db)
+    print(f"Seeding {args.orders} orders...")
+    seed(db, args.orders * 4)
+    before_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=3 * 365)
+    with tempfile.TemporaryDirectory() as directory:
+        report = archive_invoices(db, start, end, directory, args.workers)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(report.summary())
+    print(f"Coordinator peak RSS: {peak_mb:.0f} MB (after seeding: {before_mb:.0f} MB)")
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Invoice rendering throughput of the InvoiceQueue for 1, 4 and 8 worker processes.
+
+Renders synthetic orders with 5 and 200 lines into a temporary directory and reports
+invoices/sec, next to the inline rendering that used to block the UI thread. No
+database is needed: jobs carry their tax rates like the ones queued by Menu.buy.
+
+    python -m benchmarks.bench_invoices --invoices 100
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from invoices import InvoiceJob, InvoiceQueue, render_invoice
+
+
+def make_jobs(count, lines_per_order):
+    rng = random.Random(3)
+    return [
+        InvoiceJob(1001 + i, "Customer", "9876543210", "12 Market Road",
+                   [(f"Product{n}", rng.uniform(10, 5000), rng.randint(1, 5), 9.0, 9.0)
+                    for n in range(lines_per_order)])
+        for i in range(count)
+    ]
+
+
+def inline(jobs, directory):
+    start = time.perf_counter()
+    for job in jobs:
+        render_invoice(job, directory)
+    return len(jobs) / (time.perf_counter() - start)
+
+
+def queued(jobs, directory, workers):
+    queue = InvoiceQueue(workers=workers, output_dir=directory)
+    # Start the worker processes before timing, as the application does on its first sale
+    for future in [queue.submit(job) for job in jobs[:workers]]:
+        future.result()
+    start = time.perf_counter()
+    futures = [queue.submit(job) for job in jobs]
+    for future in futures:
+        future.result()
+    rate = len(jobs) / (time.perf_counter() - start)
+    queue.shutdown()
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--invoices', type=int, default=100)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--lines', type=int, nargs='+', default=[5, 200])
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'lines/order':>11} {'mode':>10} {'invoices/s':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for lines in args.lines:
+            jobs = make_jobs(args.invoices, lines)
+            print(f"{lines:>11} {'inline':>10} {inline(jobs, directory):>11.1f}")
+            for workers in args.workers:
+                print(f"{lines:>11} {f'{workers} worker':>10} {queued(jobs, directory, workers):>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Best- and least-selling product queries as the order history grows.
+
+For each --orders value, loads a synthetic dataset of that many orders into a
+scratch database and times the three product leaderboards (top 5 by units,
+top 10 by revenue, least-selling 5) computed three ways:
+
+    order_items     GROUP BY over every order line (the original queries)
+    daily rollup    GROUP BY over sales_daily_product (days x products)
+    product_sales   the running totals kept by checkout, read through their
+                    units/revenue indexes (what Analytics runs now)
+
+The product_sales reads should stay flat while the other two grow with the
+history. Reconciling product_sales against order_items is timed too.
+
+    python -m benchmarks.bench_leaderboards --orders 20000 --orders 200000 --orders 1000000
+"""
+import argparse
+import statistics
+import time
+
+import database
+import rollups
+import schema
+from Analytics import Analytics
+from benchmarks import synthetic
+
+SCRATCH_DB = 'inventory_bench_leaderboards'
+
+ORDER_ITEMS_QUERIES = {
+    'top_products': "SELECT p.product_name, p.category, SUM(oi.quantity) AS total_sold FROM order_items oi "
+                    "JOIN products p ON oi.product_id = p.product_id "
+                    "GROUP BY oi.product_id ORDER BY total_sold DESC LIMIT 5",
+    'revenue_per_product': "SELECT p.product_name, SUM(oi.quantity * oi.price) AS revenue FROM order_items oi "
+                           "JOIN products p ON oi.product_id = p.product_id "
+                           "GROUP BY oi.product_id ORDER BY revenue DESC LIMIT 10",
+    'least_selling': "SELECT p.product_name, p.category, SUM(oi.quantity) AS total_sold FROM products p "
+                     "LEFT JOIN order_items oi ON p.product_id = oi.product_id "
+                     "GROUP BY p.product_id ORDER BY total_sold ASC LIMIT 5",
+}
+DAILY_ROLLUP_QUERIES = {
+    'top_products': "SELECT p.product_name, p.category, SUM(s.quantity) AS total_sold FROM sales_daily_product s "
+                    "JOIN products p ON s.product_id = p.product_id "
+                    "GROUP BY s.product_id ORDER BY total_sold DESC LIMIT 5",
+    'revenue_per_product': "SELECT p.product_name, SUM(s.revenue) AS revenue FROM sales_daily_product s "
+                           "JOIN products p ON s.product_id = p.product_id "
+                           "GROUP BY s.product_id ORDER BY revenue DESC LIMIT 10",
+    'least_selling': "SELECT p.product_name, p.category, SUM(s.quantity) AS total_sold FROM products p "
+                     "LEFT JOIN sales_daily_product s ON p.product_id = s.product_id "
+                     "GROUP BY p.product_id ORDER BY total_sold ASC LIMIT 5",
+}
+
+
+def median_ms(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure(orders, iterations, seed):
+    db = database.connect(size=1, name=SCRATCH_DB)
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db)
+    # A fixed catalogue, so only the history changes between runs
+    counts = synthetic.generate(db, synthetic.Dataset.preset('medium', orders=orders, seed=seed))
+    print(f"\n{counts['orders']:,} orders, {counts['order_items']:,} lines")
+    print(f"{'leaderboard':<22} {'order_items ms':>15} {'daily rollup ms':>16} {'product_sales ms':>17}")
+    for name in ORDER_ITEMS_QUERIES:
+        timings = [median_ms(lambda: db.fetchall(query), iterations)
+                   for query in (ORDER_ITEMS_QUERIES[name], DAILY_ROLLUP_QUERIES[name], Analytics.CHART_QUERIES[name])]
+        print(f"{name:<22} {timings[0]:>15.1f} {timings[1]:>16.1f} {timings[2]:>17.2f}")
+    start = time.perf_counter()
+    mismatches = rollups.reconcile(db)
+    print(f"Reconciliation {time.perf_counter() - start:.2f}s, {len(mismatches)} mismatching products")
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, action='append', help="orders of history (repeatable)")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    for orders in args.orders or [20000, 200000, 1000000]:
+        measure(orders, args.iterations, args.seed)
+
+
+if __name__ == '__main__':
+    main()
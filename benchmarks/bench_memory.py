@@ -0,0 +1,137 @@
+"""Peak memory of rendering, exporting and charting a large orders table: fetchall vs streaming.
+
+Each mode runs in its own process, so its peak RSS is measured on its own:
+
+    export-fetchall   fetchall() every order line, then write the CSV
+    export-stream     bulk.export: unbuffered cursor, fetchmany batches
+    render-fetchall   fetchall() every order, then insert them all into a
+                      Treeview (the original render_table)
+    render-paged      walk the whole table a page at a time through PagedQuery
+                      into a Treeview holding one page (the virtual table)
+    chart-fetchall    fetchall() the per-address location sales, then fold them
+    chart-stream      Database.rows() folded as the rows arrive (Analytics)
+
+The orders come from a synthetic dataset loaded into a scratch database (kept
+with --keep, reused with --reuse). The render modes need a display and are
+skipped without one.
+
+    python -m benchmarks.bench_memory --orders 1000000
+"""
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tkinter
+from tkinter import ttk
+
+import bulk
+import database
+import schema
+from Analytics import Analytics, largest
+from benchmarks import synthetic
+from virtual_table import PagedQuery
+
+SCRATCH_DB = 'inventory_bench_memory'
+MODES = ('export-fetchall', 'export-stream', 'render-fetchall', 'render-paged', 'chart-fetchall', 'chart-stream')
+ORDER_COLUMNS = "order_id, user, date, total_items, total_amount, payment_status, customer_name, phone_number, address"
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def treeview():
+    root = tkinter.Tk()
+    tree = ttk.Treeview(root, columns=ORDER_COLUMNS.split(", "), show="headings")
+    tree.pack()
+    return root, tree
+
+
+def run(mode, db):
+    """Runs mode and returns the number of rows it went through."""
+    if mode.startswith('export'):
+        query, header = bulk.EXPORTS['orders']
+        path = os.path.join(tempfile.mkdtemp(), 'orders.csv')
+        if mode == 'export-stream':
+            return bulk.export(db, 'orders', path)
+        rows = db.fetchall(query)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return len(rows)
+
+    if mode.startswith('render'):
+        root, tree = treeview()
+        count = 0
+        if mode == 'render-fetchall':
+            for row in db.fetchall(f"SELECT {ORDER_COLUMNS} FROM orders"):
+                tree.insert("", "end", values=row)
+                count += 1
+        else:
+            source, last_key = PagedQuery(db, ORDER_COLUMNS, "orders", "order_id"), None
+            while True:
+                page = source.page_after(last_key, 100)
+                if not page:
+                    break
+                tree.delete(*tree.get_children())
+                for row in page:
+                    tree.insert("", "end", values=row[1:])
+                count += len(page)
+                last_key = page[-1][0]
+        root.update()
+        root.destroy()
+        return count
+
+    query = Analytics.LOCATION_SALES_QUERY
+    rows = db.fetchall(query) if mode == 'chart-fetchall' else db.rows(query)
+    return len(largest(rows, Analytics.LOCATION_SLICES))
+
+
+def child(mode):
+    db = database.connect(size=1, name=SCRATCH_DB)
+    baseline = peak_mb()
+    try:
+        rows = run(mode, db)
+    except tkinter.TclError:
+        print(f"{mode} skipped (no display)")
+        return
+    print(f"{mode:<18} {rows:>10,} {peak_mb():>12.0f} {peak_mb() - baseline:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--mode', action='append', choices=MODES, help="run only these modes (repeatable)")
+    parser.add_argument('--reuse', action='store_true', help=f"use the existing {SCRATCH_DB} database")
+    parser.add_argument('--keep', action='store_true', help=f"keep the {SCRATCH_DB} database afterwards")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    db = database.connect(size=1, name=SCRATCH_DB)
+    if not args.reuse:
+        db.execute(f"DROP DATABASE {SCRATCH_DB}")
+        db.close()
+        db = database.connect(size=1, name=SCRATCH_DB)
+        schema.migrate(db)
+        counts = synthetic.generate(db, synthetic.Dataset.preset('large', orders=args.orders))
+        print(f"Loaded {counts['orders']:,} orders / {counts['order_items']:,} order lines")
+
+    print(f"{'mode':<18} {'rows':>10} {'peak RSS MB':>12} {'growth MB':>12}")
+    for mode in args.mode or MODES:
+        subprocess.run([sys.executable, '-m', 'benchmarks.bench_memory', '--child', mode], check=True)
+
+    if not args.keep:
+        db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Queries/sec through the connection pool with 1 vs N connections.
+
+Each worker thread plays a till issuing short lookups while one thread runs a
+slow analytics-style query, so with a single connection the lookups queue
+behind it and with N connections they proceed in parallel.
+
+    python -m benchmarks.bench_pool --sizes 1 4 8 --seconds 5
+"""
+import argparse
+import threading
+import time
+
+import database
+import schema
+
+LOOKUP = "SELECT quantity, price FROM products WHERE product_id = %s"
+SLOW = "SELECT SLEEP(%s)"
+
+
+def run(size, workers, seconds, slow_delay):
+    pool = database.ConnectionPool(size=size, timeout=60, database=database.DB_NAME, **database.DB_CONFIG)
+    db = database.Database(pool)
+    stop = time.perf_counter() + seconds
+    counts = [0] * workers
+
+    def till(i):
+        while time.perf_counter() < stop:
+            db.fetchone(LOOKUP, (str(i),))
+            counts[i] += 1
+
+    def analytics():
+        while time.perf_counter() < stop:
+            db.fetchone(SLOW, (slow_delay,))
+
+    threads = [threading.Thread(target=till, args=(i,)) for i in range(workers)]
+    threads.append(threading.Thread(target=analytics))
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stats = pool.stats()
+    pool.close()
+    return sum(counts) / elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--slow-delay', type=float, default=0.2, help="duration of the concurrent slow query")
+    args = parser.parse_args()
+
+    setup = database.connect(size=1)
+    schema.migrate(setup)
+    setup.close()
+    print(f"{'pool size':>10} {'queries/sec':>12} {'peak in use':>12} {'waits':>8} {'reconnects':>11}")
+    for size in args.sizes:
+        qps, stats = run(size, args.workers, args.seconds, args.slow_delay)
+        print(f"{size:>10} {qps:>12.1f} {stats['peak_in_use']:>12} {stats['waits']:>8} {stats['reconnects']:>11}")
+
+
+if __name__ == '__main__':
+    main()
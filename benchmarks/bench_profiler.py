@@ -0,0 +1,89 @@
+"""Overhead of the query profiler on Database calls.
+
+Times Database.fetchone against a stub connection pool (so only the Python-side cost
+is measured) with the profiler disabled and enabled, next to a bare cursor call
+without Database at all. With --mysql the same is done with SELECT 1 against the
+configured server, where the overhead is compared with a real round-trip.
+
+    python -m benchmarks.bench_profiler --calls 200000
+"""
+import argparse
+import time
+from contextlib import contextmanager
+
+import database
+from profiling import QueryProfiler
+
+QUERY = "SELECT product_id, price FROM products WHERE product_id = %s"
+MYSQL_QUERY = "SELECT %s"
+
+
+class StubCursor:
+    rowcount = 1
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return ("1", 10)
+
+    def close(self):
+        pass
+
+
+class StubConnection:
+    def cursor(self, buffered=True):
+        return StubCursor()
+
+
+class StubPool:
+    size = 1
+
+    @contextmanager
+    def connection(self):
+        yield StubConnection()
+
+
+def per_call_us(fn, query, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(query, (i,))
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def bare(pool):
+    def call(query, params):
+        with pool.connection() as con:
+            cur = con.cursor(buffered=True)
+            cur.execute(query, params)
+            row = cur.fetchone()
+            cur.close()
+            return row
+    return call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--mysql', action='store_true', help="also measure against the MySQL server")
+    args = parser.parse_args()
+
+    setups = [("stub", StubPool(), QUERY, args.calls)]
+    if args.mysql:
+        setups.append(("mysql", database.connect(size=1).pool, MYSQL_QUERY, max(1, args.calls // 50)))
+    print(f"{'backend':<8} {'mode':<18} {'us/call':>9} {'overhead':>9}")
+    for name, pool, query, calls in setups:
+        timings = [
+            ("bare cursor", bare(pool)),
+            ("profiler disabled", database.Database(pool, QueryProfiler(enabled=False)).fetchone),
+            ("profiler enabled", database.Database(pool, QueryProfiler(enabled=True)).fetchone),
+        ]
+        baseline = None
+        for mode, fn in timings:
+            us = per_call_us(fn, query, calls)
+            baseline = baseline or us
+            print(f"{name:<8} {mode:<18} {us:>9.2f} {us - baseline:>+9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Post-checkout restock cost: the old per-product loop vs the set-based engine.
+
+The old loop fetched the whole catalogue after every sale and issued a SELECT,
+an UPDATE and a commit for each product due. The engine only looks at the
+products in the order. Runs against a scratch database.
+
+    python -m benchmarks.bench_restock --sizes 10000 100000
+"""
+import argparse
+import random
+import time
+
+import database
+import schema
+from restock import restock_after_order
+
+SCRATCH_DB = 'inventory_bench_restock'
+BATCH = 5000
+
+
+def seed(db, size, due_fraction):
+    rng = random.Random(size)
+    db.execute("DELETE FROM products")
+    db.execute("DELETE FROM restock_log")
+    rows = []
+    for i in range(size):
+        # Products that are due sit at their restock level of 10
+        quantity = 10 if rng.random() < due_fraction else 100
+        rows.append((str(i), f"Item{i}", quantity))
+    for start in range(0, size, BATCH):
+        with db.transaction() as cur:
+            cur.executemany(
+                "INSERT INTO products VALUES (%s, %s, 'bench', 10.00, %s, 'Bench', 10, 50)",
+                rows[start:start + BATCH]
+            )
+
+
+def legacy_loop(db):
+    """The pre-engine Menu.check_and_restock_products, minus the message boxes."""
+    products = db.fetchall("SELECT product_id, quantity, restock_level, restock_quantity FROM products")
+    for product_id, current_quantity, restock_level, restock_quantity in products:
+        if current_quantity <= restock_level and restock_quantity > 0:
+            db.fetchone("SELECT product_name, quantity, restock_level FROM products WHERE product_id = %s",
+                        (product_id,))
+            db.execute("UPDATE products SET quantity = quantity + %s WHERE product_id = %s",
+                       (restock_quantity, product_id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--due-fraction', type=float, default=0.01)
+    parser.add_argument('--order-lines', type=int, default=5)
+    args = parser.parse_args()
+
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db)
+    print(f"{'products':>10} {'legacy loop (ms)':>17} {'engine (ms)':>12}")
+    for size in args.sizes:
+        order = [str(i) for i in random.Random(0).sample(range(size), args.order_lines)]
+
+        seed(db, size, args.due_fraction)
+        start = time.perf_counter()
+        legacy_loop(db)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        seed(db, size, args.due_fraction)
+        start = time.perf_counter()
+        restock_after_order(db, None, order)
+        engine_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>10} {legacy_ms:>17.1f} {engine_ms:>12.1f}")
+
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
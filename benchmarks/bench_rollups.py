@@ -0,0 +1,90 @@
+"""Chart query latency reading order_items directly versus reading the daily sales rollups.
+
+Seeds a scratch database, rebuilds the rollups and times every dashboard and Analytics
+chart query in both forms. The base-table queries grow with order_items, the rollup
+queries with days x products.
+
+    python -m benchmarks.bench_rollups --order-items 1000000
+"""
+import argparse
+import statistics
+import time
+
+import database
+import rollups
+import schema
+from Analytics import Analytics
+from benchmarks.bench_indexes import seed
+from utils import MONTHLY_EARNINGS_QUERY
+
+SCRATCH_DB = 'inventory_bench_rollups'
+THIS_YEAR = "o.date >= MAKEDATE(YEAR(CURDATE()), 1) AND o.date < MAKEDATE(YEAR(CURDATE()) + 1, 1)"
+
+# (chart, query over the order tables as before the rollups, query used now)
+QUERIES = [
+    ("top products",
+     "SELECT p.product_name, p.category, SUM(oi.quantity) AS total_sold FROM order_items oi "
+     "JOIN products p ON oi.product_id = p.product_id GROUP BY oi.product_id ORDER BY total_sold DESC LIMIT 5",
+     Analytics.TOP_PRODUCTS_QUERY),
+    ("revenue per product",
+     "SELECT p.product_name, SUM(oi.quantity * oi.price) AS revenue FROM order_items oi "
+     "JOIN products p ON oi.product_id = p.product_id GROUP BY oi.product_id ORDER BY revenue DESC LIMIT 10",
+     "SELECT p.product_name, SUM(s.revenue) AS revenue FROM sales_daily_product s "
+     "JOIN products p ON s.product_id = p.product_id GROUP BY s.product_id ORDER BY revenue DESC LIMIT 10"),
+    ("category revenue",
+     "SELECT p.category, SUM(oi.quantity * oi.price) FROM order_items oi "
+     "JOIN products p ON oi.product_id = p.product_id GROUP BY p.category",
+     "SELECT category, SUM(revenue) FROM sales_daily_category GROUP BY category"),
+    ("monthly trends",
+     "SELECT MONTH(o.date), SUM(oi.quantity * oi.price) FROM orders o JOIN order_items oi "
+     f"ON o.order_id = oi.order_id WHERE {THIS_YEAR} GROUP BY MONTH(o.date)",
+     "SELECT MONTH(sale_date), SUM(revenue) FROM sales_daily WHERE sale_date >= MAKEDATE(YEAR(CURDATE()), 1) "
+     "AND sale_date < MAKEDATE(YEAR(CURDATE()) + 1, 1) GROUP BY MONTH(sale_date)"),
+    ("monthly earnings",
+     "SELECT DATE_FORMAT(o.date, '%b') AS month, SUM(oi.quantity * oi.price) FROM orders o JOIN order_items oi "
+     f"ON o.order_id = oi.order_id WHERE o.payment_status = 'paid' AND {THIS_YEAR} GROUP BY month",
+     MONTHLY_EARNINGS_QUERY),
+]
+
+
+def median_ms(db, query, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.fetchall(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--order-items', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db)
+    print(f"Seeding {args.order_items} order_items...")
+    seed(db, args.order_items)
+
+    start = time.perf_counter()
+    rollups.rebuild(db)
+    print(f"Rollup rebuild: {time.perf_counter() - start:.1f}s")
+    db.fetchall("ANALYZE TABLE orders, order_items, products, sales_daily, sales_daily_product, sales_daily_category")
+    for table in ("order_items", "sales_daily_product", "sales_daily_category", "sales_daily"):
+        print(f"{table:<22} {db.scalar(f'SELECT COUNT(*) FROM {table}'):>10} rows")
+
+    print(f"\n{'chart':<22} {'order_items (ms)':>17} {'rollups (ms)':>13} {'speed-up':>9}")
+    for name, base_query, rollup_query in QUERIES:
+        before = median_ms(db, base_query, args.repeat)
+        after = median_ms(db, rollup_query, args.repeat)
+        print(f"{name:<22} {before:>17.1f} {after:>13.1f} {before / max(after, 0.001):>8.1f}x")
+
+    mismatches = rollups.check(db)
+    print("\nRollup check:", "; ".join(mismatches) or "totals match")
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Barcode scan throughput: sustained scans into the shop cart without UI lag.
+
+Drives the shop's Scanner the way a keyboard-wedge scanner does: every scan
+types a product id into the scan entry and presses Return, at --rate scans per
+second for --seconds. Most scans repeat a product already in the cart (one
+more unit), some add a new product and a few are ids missing from the cache,
+which are looked up in the background. The cart is sold (cleared) every
+--cart lines.
+
+Reports the scans handled, the time the UI thread spent on each scan, and the
+StallMonitor histogram of mainloop lateness over the run; ticks over 16ms are
+visible lag. Finishes with back-to-back scans for the maximum rate. The
+catalogue comes from an in-memory stub, so no database is needed. Needs a
+display.
+
+    python -m benchmarks.bench_scan --rate 10 --seconds 30
+"""
+import argparse
+import random
+import statistics
+import time
+import tkinter
+from tkinter import ttk
+
+from cart import Cart
+from catalogue import Catalogue
+from scanner import Scanner
+from tasks import BackgroundExecutor, StallMonitor
+
+HEADINGS = ("Product Id", "Product Name", "Description", "Price", "Quantity", "Total Amount")
+
+
+class StubDB:
+    """A catalogue of the given number of products in one category, returned after a query's delay."""
+
+    def __init__(self, products):
+        self.products = [(str(100000 + i), f"Product {i}", f"Item {i}", 10 + i % 500, 10 ** 6, "General")
+                         for i in range(products)]
+
+    def fetchall(self, query, params=None):
+        time.sleep(0.005)
+        if 'FROM categories' in query:
+            return [("General", 9, 9)]
+        return self.products
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=float, default=10, help="scans per second")
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--cart', type=int, default=40, help="lines per cart before it is sold")
+    parser.add_argument('--burst', type=int, default=2000, help="back-to-back scans for the maximum rate")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        print("bench_scan needs a display")
+        return
+    entry = tkinter.Entry(root)
+    entry.pack()
+    tree = ttk.Treeview(root, columns=HEADINGS, show="headings", height=20)
+    tree.pack()
+    total = tkinter.Label(root)
+    total.pack()
+
+    catalogue = Catalogue(StubDB(args.products))
+    catalogue.warm()
+    ids = list(catalogue.by_id)
+    cart = Cart(catalogue.peek_tax_rate)
+
+    def render(line):
+        # What Menu.render_line does on every scan
+        if tree.exists(line.product_id):
+            tree.item(line.product_id, values=line.values())
+        else:
+            tree.insert('', 'end', iid=line.product_id, values=line.values())
+        tree.see(line.product_id)
+        total.configure(text=f"{cart.subtotal:.2f}  (+{cart.tax:.2f} GST)")
+
+    scanner = Scanner(entry, cart, catalogue, BackgroundExecutor(), on_change=render)
+    monitor = StallMonitor(root)
+    in_cart, samples = [], []
+
+    def scan():
+        """Types one product id and Return, like the scanner; returns the time spent in the handler."""
+        if len(in_cart) >= args.cart:
+            tree.delete(*tree.get_children())
+            cart.clear()
+            in_cart.clear()
+        draw = rng.random()
+        if in_cart and draw < 0.7:
+            product_id = rng.choice(in_cart)
+        elif draw < 0.98:
+            product_id = rng.choice(ids)
+            in_cart.append(product_id)
+        else:
+            product_id = f"9{rng.randrange(10 ** 6)}"  # not in the cache
+        entry.insert("end", product_id)
+        start = time.perf_counter()
+        entry.event_generate("<Return>")
+        return (time.perf_counter() - start) * 1000
+
+    scans = int(args.rate * args.seconds)
+    interval = 1 / args.rate
+    started = time.perf_counter()
+
+    def tick(n=0):
+        if n == scans:
+            root.after(200, root.quit)  # let the background lookups land
+            return
+        samples.append(scan())
+        # Scheduled against the start time, so handler time does not slow the rate down
+        delay = started + (n + 1) * interval - time.perf_counter()
+        root.after(max(0, int(delay * 1000)), tick, n + 1)
+
+    monitor.start()
+    root.after(0, tick)
+    root.mainloop()
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    print(f"{len(samples)} scans in {elapsed:.1f}s ({len(samples) / elapsed:.1f}/s), {scanner.scans} handled")
+    print(f"per scan: median {statistics.median(samples):.2f} ms, p99 {samples[int(len(samples) * 0.99)]:.2f} ms, "
+          f"max {samples[-1]:.2f} ms")
+    print(monitor.report())
+
+    start = time.perf_counter()
+    for _ in range(args.burst):
+        scan()
+    root.update()
+    print(f"Back to back: {args.burst / (time.perf_counter() - start):,.0f} scans/s")
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
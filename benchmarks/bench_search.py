@@ -0,0 +1,111 @@
+"""Product search index: build time, memory and type-ahead latency on a large catalogue.
+
+Builds a ProductIndex (product_search.py) over --products generated products
+with varied multi-word names and descriptions, and reports:
+
+    build       seconds to index the catalogue and the memory it holds
+    queries     median and p99 latency of searches typed a letter at a time
+                (every prefix of a product name, as search-as-you-type sends
+                them), of two-word prefixes, of product ids, of words found
+                only as substrings, and of searches with no match
+    updates     latency of adding and removing a product
+
+The catalogue is generated in memory, so no database is needed; --from-db
+indexes the products of the configured database instead.
+
+    python -m benchmarks.bench_search --products 100000
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+
+from product_search import ProductIndex
+
+ADJECTIVES = ("red blue green black white silver golden wooden steel cotton leather organic classic premium "
+              "compact portable wireless smart mini large soft heavy light vintage modern rustic").split()
+NOUNS = ("shirt jacket phone smartphone charger cable lamp table chair bottle kettle mug notebook pencil backpack "
+         "wallet watch speaker headphones keyboard mouse monitor blender toaster pillow blanket towel sandal "
+         "sneaker helmet bicycle tent lantern candle vase mirror basket").split()
+CATEGORIES = ("Clothing Electronics Kitchen Stationery Furniture Sports Outdoor Home Footwear Accessories").split()
+
+
+def catalogue(count, rng):
+    """Catalogue rows (product_id, product_name, description, price, quantity, category)."""
+    products = []
+    for i in range(count):
+        name = f"{rng.choice(ADJECTIVES).title()} {rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()}"
+        description = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} model {rng.randrange(1000, 9999)}"
+        products.append((str(100000 + i), name, description, rng.randrange(10, 5000), rng.randrange(0, 500),
+                         rng.choice(CATEGORIES)))
+    return products
+
+
+def latency(index, queries):
+    """Median and p99 search latency in microseconds, and the mean number of results."""
+    samples, results = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        results += len(index.search(query))
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)], results / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000, help="searches per kind")
+    parser.add_argument('--from-db', action='store_true', help="index the products of the configured database")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    if args.from_db:
+        import database
+        from catalogue import Catalogue
+        products = Catalogue(database.connect(size=1)).products()
+    else:
+        products = catalogue(args.products, rng)
+
+    start = time.perf_counter()
+    index = ProductIndex(products)
+    elapsed = time.perf_counter() - start
+    # Built again under tracemalloc, which slows building down too much to time it
+    tracemalloc.start()
+    memory = (ProductIndex(products), tracemalloc.get_traced_memory()[0] / 2 ** 20)[1]
+    tracemalloc.stop()
+    print(f"Indexed {len(index):,} products in {elapsed:.2f}s, {memory:.0f} MB "
+          f"({index.stats()['trigrams']:,} trigrams)")
+
+    sample = rng.sample(products, min(args.queries, len(products)))
+    typed = [product[1][:length] for product in sample[:args.queries // 10]
+             for length in range(1, len(product[1]) + 1)]
+    kinds = {
+        'typed a letter at a time': typed,
+        'two-word prefix': [" ".join(word[:3] for word in product[1].split()[1:]) for product in sample],
+        'product id': [product[0] for product in sample],
+        'id prefix': [product[0][:4] for product in sample],
+        'substring only': [rng.choice(("phone", "pack", "light", "ket", "ble")) for _ in sample],
+        'no match': [f"zq{i}" for i in range(len(sample))],
+    }
+    print(f"{'query':<26} {'searches':>9} {'median us':>10} {'p99 us':>10} {'results':>8}")
+    for name, queries in kinds.items():
+        median, p99, results = latency(index, queries)
+        print(f"{name:<26} {len(queries):>9,} {median:>10.1f} {p99:>10.1f} {results:>8.1f}")
+
+    added = catalogue(1000, random.Random(args.seed + 1))
+    start = time.perf_counter()
+    for product in added:
+        index.add(("new" + product[0],) + product[1:])
+    add_us = (time.perf_counter() - start) / len(added) * 1e6
+    start = time.perf_counter()
+    for product in added:
+        index.remove("new" + product[0])
+    remove_us = (time.perf_counter() - start) / len(added) * 1e6
+    print(f"add {add_us:.1f} us, remove {remove_us:.1f} us per product")
+
+
+if __name__ == '__main__':
+    main()
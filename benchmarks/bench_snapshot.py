@@ -0,0 +1,82 @@
+"""Snapshot build throughput and chart latency from the snapshot vs live SQL.
+
+Loads a synthetic dataset of about N order lines into a scratch database and
+exports it to a columnar snapshot (snapshot.py), reporting rows per second for
+the full export and the time of an incremental export after a few new orders.
+Then, for every Analytics chart, compares the median latency of its SQL query
+with the same rows computed from the memory-mapped snapshot, both cold (the
+snapshot opened again for every call, as a fresh process would) and warm.
+
+    python -m benchmarks.bench_snapshot --lines 1000000
+"""
+import argparse
+import datetime
+import shutil
+import tempfile
+import time
+
+import database
+import schema
+from Analytics import Analytics
+from benchmarks import synthetic
+from benchmarks.bench_analytics_engine import median_ms, orders_for
+from snapshot import Snapshot
+
+SCRATCH_DB = 'inventory_bench_snapshot'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=1000000, help="approximate order lines")
+    parser.add_argument('--batch', type=int, default=100000, help="order ids exported per batch")
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db = database.connect(size=1, name=SCRATCH_DB)
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db)
+    dataset = synthetic.Dataset.preset('large', orders=orders_for(args.lines), seed=args.seed)
+    counts = synthetic.generate(db, dataset)
+    print(f"{counts['orders']:,} orders, {counts['order_items']:,} lines")
+
+    path = tempfile.mkdtemp(prefix='ims_snapshot_')
+    try:
+        snapshot = Snapshot(path)
+        start = time.perf_counter()
+        snapshot.export(db, args.batch)
+        elapsed = time.perf_counter() - start
+        rows = counts['orders'] + counts['order_items']
+        print(f"Full export {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+        product_id = db.scalar("SELECT product_id FROM products LIMIT 1")
+        with db.transaction() as cur:
+            for _ in range(10):
+                cur.execute("INSERT INTO orders (user, date, total_items, total_amount, payment_status, address) "
+                            "VALUES ('user0000', %s, 1, 100, 'paid', '1 MG Road, Pune')", (datetime.date.today(),))
+                cur.execute("INSERT INTO order_items (order_id, product_id, quantity, price) "
+                            "VALUES (LAST_INSERT_ID(), %s, 1, 100)", (product_id,))
+        start = time.perf_counter()
+        added = snapshot.export(db, args.batch)
+        print(f"Incremental export of {added} orders {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        start = time.perf_counter()
+        columns = snapshot.open()
+        print(f"Snapshot opened in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        print(f"{'chart':<24} {'SQL ms':>10} {'cold ms':>10} {'warm ms':>10}")
+        for name, query in Analytics.CHART_QUERIES.items():
+            sql = median_ms(lambda: db.fetchall(query), args.iterations)
+            cold = median_ms(lambda: getattr(snapshot.open(), name)(), args.iterations)
+            warm = median_ms(getattr(columns, name), args.iterations)
+            print(f"{name:<24} {sql:>10.1f} {cold:>10.1f} {warm:>10.1f}")
+    finally:
+        shutil.rmtree(path)
+        db.execute(f"DROP DATABASE {SCRATCH_DB}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
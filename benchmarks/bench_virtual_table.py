@@ -0,0 +1,81 @@
+"""Orders screen cost: full fetch (old render_table) vs keyset-paged VirtualTable access.
+
+For each size the orders table of a scratch database is filled and we measure
+the time and Python peak memory of SELECT * + fetchall, against the paged
+path: COUNT(*), the first page, scrolling 50 pages via keyset and a jump to
+the middle via the OFFSET fallback. Treeview insertion is not included; the
+old path inserts every row, the virtual table only the visible window.
+
+    python -m benchmarks.bench_virtual_table --sizes 10000 100000 1000000
+"""
+import argparse
+import datetime
+import time
+import tracemalloc
+
+import database
+import schema
+from virtual_table import PagedQuery
+
+SCRATCH_DB = 'inventory_bench_table'
+BATCH = 10000
+PAGE = 100
+
+
+def seed(db, size):
+    db.execute("DELETE FROM order_items")
+    db.execute("DELETE FROM orders")
+    today = datetime.date.today()
+    for start in range(0, size, BATCH):
+        rows = [(1001 + i, f"user{i % 50}", today, 3, 99.5, 'paid', f"Customer {i}", '9999999999', f"Street {i % 400}")
+                for i in range(start, min(size, start + BATCH))]
+        with db.transaction() as cur:
+            cur.executemany("INSERT INTO orders VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)", rows)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    db = database.connect(size=2, name=SCRATCH_DB)
+    schema.migrate(db)
+    source = PagedQuery(db, "orders.*", "orders", "order_id")
+    print(f"{'rows':>9} {'fetchall ms':>12} {'fetchall MB':>12} {'first page ms':>14} "
+          f"{'next page ms':>13} {'jump ms':>9} {'paged MB':>9}")
+    for size in args.sizes:
+        seed(db, size)
+        _, full_ms, full_mb = measure(lambda: db.fetchall("SELECT * FROM orders;"))
+
+        def first_page():
+            source.count()
+            return source.page_after(None, PAGE)
+
+        page, first_ms, first_mb = measure(first_page)
+
+        def scroll():
+            rows = page
+            for _ in range(50):
+                rows = source.page_after(rows[-1][0], PAGE)
+
+        _, scroll_ms, scroll_mb = measure(scroll)
+        _, jump_ms, jump_mb = measure(lambda: source.page_at(size // 2, PAGE))
+        print(f"{size:>9} {full_ms:>12.1f} {full_mb:>12.1f} {first_ms:>14.1f} "
+              f"{scroll_ms / 50:>13.2f} {jump_ms:>9.1f} {max(first_mb, scroll_mb, jump_mb):>9.2f}")
+
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Load test of the checkout endpoint of the HTTP API at increasing concurrency.
+
+Start the API against a scratch database first (python api.py --pool-size 10). Each
+level runs that many concurrent clients, each with its own keep-alive connection,
+posting checkouts of 1-5 random products for the given duration. Reports throughput
+and p50/p95/p99 latency; 409 responses (out of stock) are counted separately.
+
+    python -m benchmarks.load_checkout --url http://127.0.0.1:8000 --levels 1 4 16 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+class Client:
+    """Minimal HTTP/1.1 keep-alive client, so the harness needs nothing outside the standard library."""
+
+    def __init__(self, host, port, token=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b''
+        headers = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(body)}",
+                   "Content-Type: application/json"]
+        if self.token:
+            headers.append(f"Authorization: Bearer {self.token}")
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length) or b'null')
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+async def client_loop(client, product_ids, user, deadline, results, rng):
+    while time.perf_counter() < deadline:
+        items = [{'product_id': product_id, 'quantity': rng.randint(1, 3)}
+                 for product_id in rng.sample(product_ids, rng.randint(1, min(5, len(product_ids))))]
+        start = time.perf_counter()
+        status, _ = await client.request('POST', '/checkout', {
+            'user': user, 'items': items, 'payment_status': 'paid',
+            'customer_name': 'Load Test', 'phone_number': '9999999999', 'address': 'Bench'})
+        results.append((status, time.perf_counter() - start))
+
+
+async def run_level(url, concurrency, duration, product_ids, user, token):
+    parts = urlsplit(url)
+    clients = [Client(parts.hostname, parts.port or 80, token) for _ in range(concurrency)]
+    results = []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(client, product_ids, user, deadline, results, random.Random(i))
+                           for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        await client.close()
+    return results, elapsed
+
+
+def percentile(samples, p):
+    return statistics.quantiles(samples, n=100, method='inclusive')[p - 1] if len(samples) > 1 else samples[0]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument('--user', default='ADMIN', help="existing username to place the orders as")
+    parser.add_argument('--products', type=int, default=200, help="number of products to draw from")
+    args = parser.parse_args()
+    token = os.environ.get('IMS_API_TOKEN')
+
+    parts = urlsplit(args.url)
+    setup = Client(parts.hostname, parts.port or 80, token)
+    status, page = await setup.request('GET', f'/products?limit={args.products}')
+    await setup.close()
+    if status != 200 or not page['products']:
+        raise SystemExit(f"Could not list products ({status}); seed the database first")
+    product_ids = [product['product_id'] for product in page['products']]
+
+    print(f"{'clients':>7} {'orders/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'409':>6} {'errors':>7}")
+    for concurrency in args.levels:
+        results, elapsed = await run_level(args.url, concurrency, args.duration, product_ids, args.user, token)
+        ok = [latency * 1000 for status, latency in results if status == 201]
+        conflicts = sum(1 for status, _ in results if status == 409)
+        errors = len(results) - len(ok) - conflicts
+        if not ok:
+            print(f"{concurrency:>7} {'-':>9} {'no successful checkouts':>26} {conflicts:>6} {errors:>7}")
+            continue
+        print(f"{concurrency:>7} {len(ok) / elapsed:>9.1f} {percentile(ok, 50):>8.1f} {percentile(ok, 95):>8.1f} "
+              f"{percentile(ok, 99):>8.1f} {conflicts:>6} {errors:>7}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
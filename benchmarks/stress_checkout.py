@@ -0,0 +1,89 @@
+"""Concurrency stress test for checkout.place_order.
+
+Several simulated billers check out random carts in parallel against a scratch
+database seeded with scarce stock. Afterwards it asserts that no order id was
+handed out twice, that no product went negative, and that every unit sold is
+accounted for in order_items; then it reports checkouts/sec.
+
+    python -m benchmarks.stress_checkout --billers 8 --seconds 10
+"""
+import argparse
+import random
+import threading
+import time
+
+import database
+import schema
+from checkout import place_order, OutOfStockError
+
+SCRATCH_DB = 'inventory_stress'
+
+
+def seed(db, products, stock):
+    db.execute("INSERT IGNORE INTO categories VALUES ('Stress', 18, 9, 9)")
+    db.execute("DELETE FROM order_items")
+    db.execute("DELETE FROM orders")
+    db.execute("DELETE FROM products")
+    with db.transaction() as cur:
+        cur.executemany(
+            "INSERT INTO products VALUES (%s, %s, 'stress', 10.00, %s, 'Stress', 0, 0)",
+            [(str(i), f"Item{i}", stock) for i in range(products)]
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--billers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--stock', type=int, default=500)
+    parser.add_argument('--max-lines', type=int, default=5)
+    args = parser.parse_args()
+
+    db = database.connect(size=args.billers, name=SCRATCH_DB)
+    schema.migrate(db)
+    seed(db, args.products, args.stock)
+
+    order_ids = []
+    rejected = [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + args.seconds
+
+    def biller(n):
+        rng = random.Random(n)
+        while time.perf_counter() < stop:
+            lines = [(str(rng.randrange(args.products)), rng.randint(1, 3), '10.00')
+                     for _ in range(rng.randint(1, args.max_lines))]
+            try:
+                order_id = place_order(db, f"biller{n}", lines, 'paid', 'Stress', '0', 'Bench')
+            except OutOfStockError:
+                with lock:
+                    rejected[0] += 1
+                continue
+            with lock:
+                order_ids.append(order_id)
+
+    threads = [threading.Thread(target=biller, args=(n,)) for n in range(args.billers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    assert len(order_ids) == len(set(order_ids)), "duplicate order ids were handed out"
+    assert db.scalar("SELECT COUNT(*) FROM orders") == len(order_ids), "orders table out of sync"
+    assert db.scalar("SELECT COUNT(*) FROM products WHERE quantity < 0") == 0, "stock went negative"
+    sold = db.scalar("SELECT COALESCE(SUM(quantity), 0) FROM order_items")
+    remaining = db.scalar("SELECT SUM(quantity) FROM products")
+    assert sold + remaining == args.products * args.stock, "units sold and stock left do not add up"
+
+    print(f"billers: {args.billers}, orders: {len(order_ids)}, rejected (out of stock): {rejected[0]}")
+    print(f"checkouts/sec: {len(order_ids) / elapsed:.1f}")
+    print(f"pool: {db.stats()}")
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Concurrency stress test and throughput of stock reservations (reservations.py).
+
+Many simulated tills ring up carts in parallel against a scratch database seeded
+with a few scarce products: every scan reserves one more unit of a product for
+the till's cart, and a scan the stock cannot cover is refused. Most carts are
+then checked out with cart_id, converting their reservations into the sale;
+the rest are abandoned, half released at once and half left to expire, with a
+short --ttl, by a background Sweeper.
+
+Afterwards, once every abandoned reservation has expired, it asserts that a
+cart never failed to check out the units it had reserved, that no product went
+negative, that no reservation or reserved unit is left over (reconcile finds
+nothing) and that every unit sold is accounted for in order_items. Reports
+reservations/sec with their latency, refused scans, checkouts and expiries.
+
+    python -m benchmarks.stress_reservations --tills 16 --seconds 10
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from mysql.connector import errors
+
+import database
+import schema
+from benchmarks.stress_checkout import SCRATCH_DB, seed
+from checkout import place_order, OutOfStockError
+from reservations import Reservations, ReservationError, Sweeper, reconcile
+
+DEADLOCK = 1213
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tills', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--products', type=int, default=10)
+    parser.add_argument('--stock', type=int, default=50)
+    parser.add_argument('--max-scans', type=int, default=6, help="scans per cart")
+    parser.add_argument('--abandon', type=float, default=0.2, help="share of carts not checked out")
+    parser.add_argument('--ttl', type=int, default=2, help="seconds an abandoned cart holds its stock")
+    args = parser.parse_args()
+
+    db = database.connect(size=args.tills + 2, name=SCRATCH_DB)
+    schema.migrate(db)
+    seed(db, args.products, args.stock)
+    db.execute("DELETE FROM stock_reservations")
+    db.execute("DELETE FROM reserved_stock")
+
+    held_for_sale = Reservations(db)
+    short_lived = Reservations(db, ttl=args.ttl)
+    sweeper = Sweeper(short_lived, interval=0.5).start()
+
+    latencies, failures = [], []
+    counts = {'refused': 0, 'checkouts': 0, 'released': 0, 'left': 0, 'deadlocks': 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + args.seconds
+
+    def count(name):
+        with lock:
+            counts[name] += 1
+
+    def till(n):
+        rng = random.Random(n)
+        carts = 0
+        while time.perf_counter() < stop:
+            carts += 1
+            cart_id = f"till{n}-{carts}"
+            abandon = rng.random() < args.abandon
+            reservations = short_lived if abandon else held_for_sale
+            cart = {}
+            for _ in range(rng.randint(1, args.max_scans)):
+                product_id = str(rng.randrange(args.products))
+                start = time.perf_counter()
+                try:
+                    reservations.reserve(cart_id, product_id, cart.get(product_id, 0) + 1)
+                    cart[product_id] = cart.get(product_id, 0) + 1
+                except ReservationError:
+                    count('refused')
+                except errors.DatabaseError as e:
+                    if e.errno != DEADLOCK:
+                        raise
+                    count('deadlocks')
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+            if not cart:
+                continue
+            if abandon:
+                if rng.random() < 0.5:
+                    reservations.release(cart_id)
+                    count('released')
+                else:
+                    count('left')
+                continue
+            lines = [(product_id, quantity, '10.00') for product_id, quantity in cart.items()]
+            try:
+                place_order(db, f"till{n}", lines, 'paid', 'Stress', '0', 'Bench', cart_id=cart_id)
+                count('checkouts')
+            except OutOfStockError as e:
+                with lock:
+                    failures.append((cart_id, cart, str(e)))
+            except errors.DatabaseError as e:
+                if e.errno != DEADLOCK:
+                    raise
+                count('deadlocks')
+                held_for_sale.release(cart_id)
+
+    threads = [threading.Thread(target=till, args=(n,)) for n in range(args.tills)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    # Let the carts left behind expire, then sweep once more
+    time.sleep(args.ttl + 1)
+    sweeper.stop()
+    short_lived.expire()
+
+    assert not failures, f"{len(failures)} carts could not check out what they had reserved, e.g. {failures[0]}"
+    assert db.scalar("SELECT COUNT(*) FROM products WHERE quantity < 0") == 0, "stock went negative"
+    assert reconcile(db) == [], "reserved_stock does not match the reservations"
+    assert db.scalar("SELECT COUNT(*) FROM stock_reservations") == 0, "reservations were left behind"
+    assert db.scalar("SELECT COUNT(*) FROM reserved_stock WHERE quantity <> 0") == 0, "reserved units left behind"
+    sold = db.scalar("SELECT COALESCE(SUM(quantity), 0) FROM order_items")
+    remaining = db.scalar("SELECT SUM(quantity) FROM products")
+    assert sold + remaining == args.products * args.stock, "units sold and stock left do not add up"
+
+    latencies.sort()
+    print(f"tills: {args.tills}, products: {args.products} x {args.stock} units, sold: {sold}")
+    print(f"reservations: {len(latencies)} ({len(latencies) / elapsed:.1f}/s), refused: {counts['refused']}, "
+          f"deadlocks: {counts['deadlocks']}")
+    print(f"reserve latency: median {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"checkouts: {counts['checkouts']}, abandoned: {counts['released']} released, "
+          f"{counts['left']} left to expire ({sweeper.expired} expired by the sweeper)")
+    print(f"pool: {db.stats()}")
+    db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
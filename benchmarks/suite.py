@@ -0,0 +1,288 @@
+"""Reproducible end-to-end benchmark suite, headless against a local MySQL.
+
+Loads a synthetic dataset (see benchmarks/synthetic.py) into a fresh scratch
+database and times the operations behind the user-facing screens:
+
+    history.*     opening and scrolling a user's order history
+    dashboard.*   loading the dashboard numbers, and refreshing them in place
+    analytics.*   the Analytics metric cards and every chart query
+    invoice       building and rendering one invoice PDF
+    checkout      pricing, placing and restocking an order (runs last, it writes)
+
+Every scenario draws its inputs from its own seeded random stream, so two runs
+with the same seed and size do the same work. Results (latency percentiles per
+scenario plus the dataset, commit and server version) are written as JSON;
+pass an earlier result file with --compare to print the change per scenario.
+
+    python -m benchmarks.suite --size small --output before.json
+    python -m benchmarks.suite --size small --output after.json --compare before.json
+    python -m benchmarks.suite --size tiny --scenario analytics --iterations 20
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+import database
+import schema
+from Analytics import Analytics
+from benchmarks import synthetic
+from checkout import OutOfStockError
+from dashboard import DashboardStats
+from invoices import InvoiceJob, invoice_lines, render_pdf
+from menu import HISTORY_SOURCE
+from profiling import PROFILER
+from services import InventoryService
+from virtual_table import PagedQuery
+
+SCRATCH_DB = 'inventory_bench_suite'
+SAMPLE_ORDERS = 200
+
+
+class Context:
+    """What the scenarios run against: the database, the service layer and keys sampled from the dataset."""
+
+    def __init__(self, db):
+        self.db = db
+        self.service = InventoryService(db)
+        self.service.catalogue.warm()
+        self.rng = random.Random()
+        self.dashboard = DashboardStats()
+        self.users = [row[0] for row in db.fetchall("SELECT username FROM users ORDER BY username")]
+        # Checkouts buy what customers buy, which is mostly the best sellers
+        self.popular = [row[0] for row in db.fetchall(
+            "SELECT product_id FROM sales_daily_product GROUP BY product_id ORDER BY SUM(quantity) DESC LIMIT 500")]
+        order_ids = [row[0] for row in db.fetchall("SELECT order_id FROM orders ORDER BY order_id")]
+        sample = random.Random(0).sample(order_ids, min(SAMPLE_ORDERS, len(order_ids)))
+        self.orders = self.invoice_orders(sample)
+
+    def invoice_orders(self, order_ids):
+        """(order_id, customer_name, phone_number, address, items) of the sampled orders, with items in the
+        (product_name, price, quantity, category) form the checkout screen passes to invoice_lines."""
+        if not order_ids:
+            return []
+        rows = self.db.fetchall(
+            "SELECT o.order_id, o.customer_name, o.phone_number, o.address, p.product_name, oi.price, oi.quantity, "
+            "p.category FROM orders o JOIN order_items oi ON oi.order_id = o.order_id "
+            "JOIN products p ON p.product_id = oi.product_id "
+            f"WHERE o.order_id IN ({', '.join(['%s'] * len(order_ids))}) ORDER BY o.order_id, oi.order_item_id",
+            order_ids)
+        orders = {}
+        for order_id, customer_name, phone_number, address, *item in rows:
+            orders.setdefault(order_id, (order_id, customer_name, phone_number, address, []))[4].append(tuple(item))
+        return list(orders.values())
+
+
+# Scenarios by name, in the order they run; each takes the Context and performs one iteration
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+@scenario('history.open')
+def history_open(ctx):
+    # What Menu.history does: count the rows for the scrollbar and fetch the first page
+    source = PagedQuery(ctx.db, *HISTORY_SOURCE, params=(ctx.rng.choice(ctx.users),))
+    source.count()
+    source.page_after(None, 100)
+
+
+@scenario('history.scroll')
+def history_scroll(ctx):
+    source = PagedQuery(ctx.db, *HISTORY_SOURCE, params=(ctx.rng.choice(ctx.users),))
+    last_key = None
+    for _ in range(10):
+        rows = source.page_after(last_key, 100)
+        if not rows:
+            break
+        last_key = rows[-1][0]
+
+
+@scenario('dashboard.load')
+def dashboard_load(ctx):
+    # First visit: everything from the rollups
+    DashboardStats().load(ctx.db)
+
+
+@scenario('dashboard.refresh')
+def dashboard_refresh(ctx):
+    # Later visits: only the orders placed since the previous one
+    if ctx.dashboard.watermark is None:
+        ctx.dashboard.load(ctx.db)
+    ctx.dashboard.update(ctx.db)
+
+
+@scenario('analytics.cards')
+def analytics_cards(ctx):
+    ctx.db.scalar(Analytics.TOTAL_SALES_QUERY)
+    ctx.db.scalar(Analytics.TOTAL_PRODUCTS_QUERY)
+
+
+def chart_scenario(query):
+    return lambda ctx: ctx.db.fetchall(query)
+
+
+for _chart, _query in Analytics.CHART_QUERIES.items():
+    SCENARIOS[f'analytics.{_chart}'] = chart_scenario(_query)
+
+
+@scenario('invoice')
+def invoice(ctx):
+    order_id, customer_name, phone_number, address, items = ctx.rng.choice(ctx.orders)
+    lines = invoice_lines(items, ctx.service.catalogue.tax_rate)
+    render_pdf(InvoiceJob(order_id, customer_name, phone_number, address, lines))
+
+
+@scenario('checkout')
+def checkout(ctx):
+    # What Menu.place_order does, from a cart of best sellers
+    items = [(product_id, ctx.rng.randint(1, 3)) for product_id in
+             ctx.rng.sample(ctx.popular, ctx.rng.randint(1, min(4, len(ctx.popular))))]
+    order = ctx.service.checkout(ctx.rng.choice(ctx.users), items, 'paid', "Bench Customer", "9000000000",
+                                 "1 MG Road, Mumbai")
+    ctx.service.restock(order['order_id'], [product_id for product_id, _, _ in order['lines']])
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def run_scenario(ctx, name, fn, iterations, warmup, seed, count_queries=False):
+    """Runs fn warmup + iterations times and returns its latency statistics in milliseconds."""
+    ctx.rng.seed(f"{seed}:{name}")
+    for _ in range(warmup):
+        fn(ctx)
+    if count_queries:
+        PROFILER.reset()
+    samples, errors = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            fn(ctx)
+        except OutOfStockError:
+            errors += 1
+            continue
+        samples.append((time.perf_counter() - start) * 1000)
+    ordered = sorted(samples) or [0.0]
+    result = {
+        'iterations': len(samples),
+        'errors': errors,
+        'mean_ms': statistics.fmean(ordered),
+        'median_ms': statistics.median(ordered),
+        'p95_ms': percentile(ordered, 95),
+        'p99_ms': percentile(ordered, 99),
+        'min_ms': ordered[0],
+        'max_ms': ordered[-1],
+        'stdev_ms': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+    if count_queries:
+        result['queries_per_iteration'] = sum(row['count'] for row in PROFILER.snapshot()) / iterations
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fresh_database(name, size):
+    """Drops and recreates the scratch database so every run starts from the same state."""
+    db = database.connect(size=1, name=name)
+    db.execute(f"DROP DATABASE {name}")
+    db.close()
+    db = database.connect(size=size, name=name)
+    schema.migrate(db)
+    return db
+
+
+def compare(results, baseline):
+    print(f"\n{'scenario':<34} {'baseline ms':>12} {'now ms':>10} {'change':>8}")
+    for name, now in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            print(f"{name:<34} {'-':>12} {now['median_ms']:>10.2f}")
+            continue
+        change = (now['median_ms'] - before['median_ms']) / before['median_ms'] * 100 if before['median_ms'] else 0
+        print(f"{name:<34} {before['median_ms']:>12.2f} {now['median_ms']:>10.2f} {change:>+7.1f}%")
+    if baseline.get('dataset', {}).get('fingerprint') != results['dataset']['fingerprint']:
+        print("Warning: the baseline was measured on a different dataset")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=synthetic.SIZES, default='small', help="synthetic dataset size")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--orders', type=int, help="override the number of orders of the size")
+    parser.add_argument('--today', type=datetime.date.fromisoformat,
+                        help=f"the date the generated sales run up to, YYYY-MM-DD (default {synthetic.TODAY})")
+    parser.add_argument('--scenario', action='append', default=[],
+                        help="run only scenarios starting with this name (repeatable)")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write the JSON results")
+    parser.add_argument('--compare', help="earlier JSON results to compare against")
+    parser.add_argument('--count-queries', action='store_true',
+                        help="also report statements per iteration (the query profiler adds a little latency)")
+    parser.add_argument('--keep', action='store_true', help=f"keep the {SCRATCH_DB} database afterwards")
+    args = parser.parse_args()
+
+    selected = {name: fn for name, fn in SCENARIOS.items()
+                if not args.scenario or any(name.startswith(prefix) for prefix in args.scenario)}
+    if not selected:
+        parser.error(f"no scenario matches; available: {', '.join(SCENARIOS)}")
+
+    dataset = synthetic.Dataset.preset(args.size, seed=args.seed, orders=args.orders, today=args.today)
+    db = fresh_database(SCRATCH_DB, size=2)
+    start = time.perf_counter()
+    counts = synthetic.generate(db, dataset)
+    print(f"Loaded {counts['orders']} orders / {counts['order_items']} order items "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    ctx = Context(db)
+    if args.count_queries:
+        PROFILER.enable()
+    results = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'mysql': db.scalar("SELECT VERSION()"),
+        'dataset': {**dataset.as_dict(), 'fingerprint': synthetic.fingerprint(db)},
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'scenarios': {},
+    }
+    print(f"{'scenario':<34} {'median ms':>10} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, fn in selected.items():
+        result = run_scenario(ctx, name, fn, args.iterations, args.warmup, args.seed, args.count_queries)
+        results['scenarios'][name] = result
+        print(f"{name:<34} {result['median_ms']:>10.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+              + (f"  ({result['errors']} errors)" if result['errors'] else ""))
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    if not args.keep:
+        db.execute(f"DROP DATABASE {SCRATCH_DB}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
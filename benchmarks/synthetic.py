@@ -0,0 +1,212 @@
+"""Deterministic synthetic data for benchmarks.
+
+Generates categories, products, users, orders and order_items with a realistic
+shape and loads them into a database migrated to the current schema (the same
+schema Main.__init__ creates), then rebuilds the sales rollups. The same seed
+and sizes always produce the same rows, on any day: dates run back from the
+dataset's fixed reference date (--today, default 2024-12-31) rather than the day
+of the run, so runs on different days measure the same data:
+
+- product popularity, category sizes and customer activity follow Zipf-like
+  power laws, so a few products and customers account for most sales
+- lines per order are mostly 1-3 with a long tail, and quantities are mostly 1
+- order dates grow over time, with busier weekends and a December peak
+- 85% of orders are paid, the rest are pending
+
+    python -m benchmarks.synthetic --size small --database inventory_synthetic
+"""
+import argparse
+import bisect
+import datetime
+import itertools
+import random
+from decimal import Decimal
+
+import database
+import rollups
+import schema
+
+# Named dataset sizes; any field can be overridden
+SIZES = {
+    'tiny': dict(categories=5, products=200, users=10, orders=2000),
+    'small': dict(categories=20, products=5000, users=50, orders=50000),
+    'medium': dict(categories=50, products=20000, users=200, orders=250000),
+    'large': dict(categories=100, products=100000, users=1000, orders=1000000),
+}
+
+CITIES = ["Mumbai", "Delhi", "Bengaluru", "Hyderabad", "Ahmedabad", "Chennai", "Kolkata", "Pune", "Jaipur", "Surat",
+          "Lucknow", "Kanpur", "Nagpur", "Indore", "Thane", "Bhopal", "Patna", "Vadodara", "Ludhiana", "Agra"]
+STREETS = ["MG Road", "Station Road", "Park Street", "Market Lane", "Ring Road", "Lake View", "Temple Street"]
+TAX_RATES = [(5, Decimal('2.5'), Decimal('2.5')), (12, 6, 6), (18, 9, 9), (28, 14, 14)]
+# Relative weight of 1, 2, 3... lines per order and 1, 2, 3... units per line
+LINES_PER_ORDER = [30, 25, 18, 10, 6, 4, 3, 2, 1, 1]
+UNITS_PER_LINE = [70, 15, 7, 4, 2, 1, 1]
+BATCH = 5000
+# The day the generated sales run up to, fixed so a dataset does not move with the calendar
+TODAY = datetime.date(2024, 12, 31)
+
+
+class Dataset:
+    """The sizes and seed of a synthetic dataset, and the date its sales run up to."""
+
+    def __init__(self, categories=20, products=5000, users=50, orders=50000, days=730, seed=42, today=TODAY):
+        self.categories = categories
+        self.products = products
+        self.users = users
+        self.orders = orders
+        self.days = days
+        self.seed = seed
+        self.today = today
+
+    @classmethod
+    def preset(cls, size, **overrides):
+        return cls(**{**SIZES[size], **{key: value for key, value in overrides.items() if value is not None}})
+
+    def as_dict(self):
+        return {**vars(self), 'today': self.today.isoformat()}
+
+
+def zipf_weights(n, s=1.1):
+    """Cumulative weights of a Zipf distribution over n ranks, sampled with bisect."""
+    return list(itertools.accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+def day_weights(days, today):
+    """Cumulative weights of the days before today: sales grow over time, peak at weekends and in December."""
+    weights = []
+    for offset in range(days):
+        day = today - datetime.timedelta(days=offset)
+        weight = 1 + (days - offset) / days
+        if day.weekday() >= 5:
+            weight *= 1.4
+        if day.month == 12:
+            weight *= 1.6
+        weights.append(weight)
+    return list(itertools.accumulate(weights))
+
+
+def catalogue(dataset, rng):
+    """Returns the categories, product and user rows."""
+    categories = []
+    for i in range(dataset.categories):
+        gst, sgst, cgst = rng.choice(TAX_RATES)
+        categories.append((f"Category{i:03d}", gst, sgst, cgst))
+
+    # Category sizes follow a power law; prices are log-normal
+    category_weights = zipf_weights(dataset.categories, s=0.8)
+    products = []
+    for i in range(dataset.products):
+        category = categories[bisect.bisect(category_weights, rng.random() * category_weights[-1])][0]
+        price = Decimal(str(round(min(rng.lognormvariate(5.5, 1.0), 99999), 2)))
+        restock_level = rng.randint(5, 50)
+        products.append((str(i), f"Product {i}", f"Synthetic item {i} in {category}", price,
+                         rng.randint(restock_level, 500), category, restock_level, rng.randint(50, 500)))
+
+    users = [("ADMIN", "admin", "ADMIN", "admin@example.com")]
+    users += [(f"user{i:04d}", "password", "USER", f"user{i:04d}@example.com") for i in range(dataset.users)]
+    return categories, products, users
+
+
+def order_batches(dataset, products, users, rng):
+    """Yields (order rows, order_item rows) in batches of BATCH orders, with explicit order ids from 1001, dated
+    up to dataset.today."""
+    today = dataset.today
+    # Popularity is independent of product id, so the best sellers are spread over the catalogue
+    by_popularity = list(range(len(products)))
+    rng.shuffle(by_popularity)
+    product_weights = zipf_weights(len(products))
+    user_weights = zipf_weights(len(users), s=0.9)
+    days = day_weights(dataset.days, today)
+    line_weights = list(itertools.accumulate(LINES_PER_ORDER))
+    unit_weights = list(itertools.accumulate(UNITS_PER_LINE))
+
+    def pick(cum_weights):
+        return bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+    for start in range(0, dataset.orders, BATCH):
+        order_rows, item_rows = [], []
+        for order_id in range(1001 + start, 1001 + min(start + BATCH, dataset.orders)):
+            chosen = {}
+            for _ in range(pick(line_weights) + 1):
+                product = products[by_popularity[pick(product_weights)]]
+                chosen[product[0]] = (pick(unit_weights) + 1, product[3])
+            total = sum(price * units for units, price in chosen.values())
+            city = CITIES[min(int(rng.paretovariate(1.0)) - 1, len(CITIES) - 1)]
+            user = users[pick(user_weights)][0]
+            order_rows.append((
+                order_id, user, today - datetime.timedelta(days=pick(days)), len(chosen), total,
+                'paid' if rng.random() < 0.85 else 'pending', f"Customer {rng.randrange(10 * dataset.orders)}",
+                f"9{rng.randrange(10 ** 9):09d}", f"{rng.randint(1, 999)} {rng.choice(STREETS)}, {city}",
+            ))
+            item_rows.extend((order_id, product_id, units, price) for product_id, (units, price) in chosen.items())
+        yield order_rows, item_rows
+
+
+def generate(db, dataset, progress=None):
+    """Loads the dataset into db, which must be migrated and empty, and rebuilds the rollups.
+
+    Returns the number of rows written per table.
+    """
+    if db.scalar("SELECT COUNT(*) FROM products") or db.scalar("SELECT COUNT(*) FROM orders"):
+        raise ValueError("The target database already has products or orders")
+    rng = random.Random(dataset.seed)
+    categories, products, users = catalogue(dataset, rng)
+    with db.transaction() as cur:
+        cur.executemany("INSERT INTO categories VALUES (%s, %s, %s, %s)", categories)
+        cur.executemany("INSERT INTO users VALUES (%s, %s, %s, %s)", users)
+        for start in range(0, len(products), BATCH):
+            cur.executemany("INSERT INTO products VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                            products[start:start + BATCH])
+
+    counts = {'categories': len(categories), 'products': len(products), 'users': len(users),
+              'orders': 0, 'order_items': 0}
+    for order_rows, item_rows in order_batches(dataset, products, users, rng):
+        with db.transaction() as cur:
+            cur.executemany("INSERT INTO orders (order_id, user, date, total_items, total_amount, payment_status, "
+                            "customer_name, phone_number, address) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                            order_rows)
+            cur.executemany("INSERT INTO order_items (order_id, product_id, quantity, price) "
+                            "VALUES (%s, %s, %s, %s)", item_rows)
+        counts['orders'] += len(order_rows)
+        counts['order_items'] += len(item_rows)
+        if progress:
+            progress(counts['orders'], dataset.orders)
+
+    rollups.rebuild(db)
+    db.fetchall("ANALYZE TABLE products, orders, order_items, sales_daily, sales_daily_product, sales_daily_category")
+    return counts
+
+
+def fingerprint(db):
+    """Row counts and revenue of the loaded data, to check that two benchmark runs measured the same dataset."""
+    return {
+        'products': db.scalar("SELECT COUNT(*) FROM products"),
+        'orders': db.scalar("SELECT COUNT(*) FROM orders"),
+        'order_items': db.scalar("SELECT COUNT(*) FROM order_items"),
+        'revenue': str(db.scalar("SELECT COALESCE(SUM(quantity * price), 0) FROM order_items")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--database', default='inventory_synthetic', help="database to create and fill")
+    parser.add_argument('--seed', type=int, default=42)
+    for field in ('categories', 'products', 'users', 'orders', 'days'):
+        parser.add_argument(f'--{field}', type=int, help=f"override the number of {field} of the size")
+    parser.add_argument('--today', type=datetime.date.fromisoformat, help="the date the sales run up to, YYYY-MM-DD "
+                                                                          f"(default {TODAY})")
+    args = parser.parse_args()
+
+    dataset = Dataset.preset(args.size, seed=args.seed, categories=args.categories, products=args.products,
+                             users=args.users, orders=args.orders, days=args.days, today=args.today)
+    db = database.connect(size=2, name=args.database)
+    schema.migrate(db)
+    counts = generate(db, dataset, progress=lambda done, total: print(f"\r{done}/{total} orders", end=""))
+    print()
+    print(", ".join(f"{count} {table}" for table, count in counts.items()), f"loaded into {args.database}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import csv
+import os
+import time
+
+import database
+from products import PRODUCT_COLUMNS, ValidationError, validate_product
+
+UPSERT_PRODUCTS = (
+    f"INSERT INTO products ({', '.join(PRODUCT_COLUMNS)}) VALUES ({', '.join(['%s'] * len(PRODUCT_COLUMNS))}) "
+    "ON DUPLICATE KEY UPDATE "
+    + ", ".join(f"{column} = VALUES({column})" for column in PRODUCT_COLUMNS[1:])
+)
+
+ORDER_LINE_COLUMNS = ('order_id', 'user', 'date', 'payment_status', 'customer_name', 'phone_number', 'address',
+                      'product_id', 'quantity', 'price')
+
+# What can be exported: (query, header). Both are ordered by their primary key so the output is stable.
+EXPORTS = {
+    'products': (f"SELECT {', '.join(PRODUCT_COLUMNS)} FROM products ORDER BY product_id", PRODUCT_COLUMNS),
+    'orders': ("SELECT o.order_id, o.user, o.date, o.payment_status, o.customer_name, o.phone_number, o.address, "
+               "oi.product_id, oi.quantity, oi.price FROM orders o JOIN order_items oi ON oi.order_id = o.order_id "
+               "ORDER BY o.order_id, oi.order_item_id", ORDER_LINE_COLUMNS),
+}
+
+
+class ImportReport:
+    """Outcome of a bulk import: counts plus the (line number, message) of every rejected row."""
+
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        text = (f"{self.rows} rows read: {self.inserted} added, {self.updated} updated, "
+                f"{len(self.errors)} rejected ({self.rows_per_second():,.0f} rows/s)")
+        for line, message in self.errors[:10]:
+            text += f"\nLine {line}: {message}"
+        if len(self.errors) > 10:
+            text += f"\n... and {len(self.errors) - 10} more"
+        return text
+
+    def write_errors(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('line', 'error'))
+            writer.writerows(self.errors)
+        return path
+
+
+def _is_xlsx(path):
+    return os.path.splitext(path)[1].lower() in ('.xlsx', '.xlsm')
+
+
+def _load_openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError("Excel files need openpyxl (pip install openpyxl); CSV files work without it")
+    return openpyxl
+
+
+def read_rows(path):
+    """Yields the rows of a CSV or XLSX file one at a time, header included."""
+    if _is_xlsx(path):
+        # read_only streams the sheet instead of loading the whole workbook
+        workbook = _load_openpyxl().load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield row
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.reader(f)
+
+
+def header_columns(header):
+    """Maps a header row to product columns; accepts column names or the form labels ("Product Id")."""
+    columns = [str(name).strip().lower().replace(' ', '_') if name is not None else "" for name in header or ()]
+    missing = [column for column in PRODUCT_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    return columns
+
+
+def _write_batch(db, batch, report):
+    """Upserts one batch in its own transaction, counting which products already existed."""
+    ids = list(batch)
+    with db.transaction() as cur:
+        cur.execute(f"SELECT product_id FROM products WHERE product_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        existing = len(cur.fetchall())
+        # executemany rewrites the upsert into multi-row INSERTs
+        cur.executemany(UPSERT_PRODUCTS, list(batch.values()))
+    report.updated += existing
+    report.inserted += len(ids) - existing
+
+
+def import_products(db, path, batch_size=1000, progress=None):
+    """Validates and upserts every product in a CSV or XLSX file, batch_size rows per transaction.
+
+    Rows are streamed, so memory is bounded by the batch size. Invalid rows are skipped and reported; a product
+    that appears twice takes the values of its last row. progress(rows_read) is called after every batch.
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    categories = {row[0] for row in db.fetchall("SELECT category_name FROM categories")}
+
+    rows = read_rows(path)
+    try:
+        columns = header_columns(next(rows, None))
+        positions = [columns.index(column) for column in PRODUCT_COLUMNS]
+        batch = {}
+        for line, values in enumerate(rows, start=2):
+            if not any(value not in (None, "") for value in values):
+                continue
+            report.rows += 1
+            values = list(values) + [None] * (len(columns) - len(values))
+            try:
+                product = validate_product(*(values[i] for i in positions), categories=categories)
+            except ValidationError as e:
+                report.errors.append((line, str(e)))
+                continue
+            batch.pop(product[0], None)
+            batch[product[0]] = product
+            if len(batch) >= batch_size:
+                _write_batch(db, batch, report)
+                batch = {}
+                if progress:
+                    progress(report.rows)
+        if batch:
+            _write_batch(db, batch, report)
+    finally:
+        rows.close()
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def export(db, what, path, chunk_size=1000):
+    """Streams products or order lines into a CSV or XLSX file and returns the number of rows written."""
+    query, header = EXPORTS[what]
+    count = 0
+    if _is_xlsx(path):
+        # write_only keeps only the current row in memory
+        workbook = _load_openpyxl().Workbook(write_only=True)
+        sheet = workbook.create_sheet(what)
+        sheet.append(header)
+        for rows in db.stream(query, size=chunk_size):
+            for row in rows:
+                sheet.append(row)
+            count += len(rows)
+        workbook.save(path)
+    else:
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for rows in db.stream(query, size=chunk_size):
+                writer.writerows(rows)
+                count += len(rows)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import products from, or export products/orders to, "
+                                                 "CSV or XLSX files.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    importer = commands.add_parser('import', help="upsert products from a file")
+    importer.add_argument('path')
+    importer.add_argument('--batch-size', type=int, default=1000)
+    importer.add_argument('--errors', help="write rejected rows to this CSV file")
+    exporter = commands.add_parser('export', help="write products or order lines to a file")
+    exporter.add_argument('what', choices=sorted(EXPORTS))
+    exporter.add_argument('path')
+    args = parser.parse_args()
+
+    db = database.connect(size=1)
+    if args.command == 'import':
+        report = import_products(db, args.path, args.batch_size,
+                                 progress=lambda rows: print(f"\r{rows} rows", end="", flush=True))
+        print()
+        print(report.summary())
+        if args.errors and report.errors:
+            report.write_errors(args.errors)
+    else:
+        start = time.perf_counter()
+        count = export(db, args.what, args.path)
+        seconds = time.perf_counter() - start
+        print(f"Exported {count} rows to {args.path} ({count / seconds if seconds else 0:,.0f} rows/s)")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
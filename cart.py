@@ -0,0 +1,159 @@
+import uuid
+from decimal import Decimal
+
+from products import ValidationError
+
+
+def parse_quantity(value):
+    """A quantity typed or scanned into the cart as a positive int; raises ValidationError."""
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError("Please enter a valid quantity")
+    if quantity <= 0:
+        raise ValidationError("Please enter a valid quantity")
+    return quantity
+
+
+def money(value):
+    """value as a Decimal, going through str so floats keep the digits they print with."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class CartLine:
+    """One product in the cart; price is the unit price and cgst/sgst the tax percentages (0 if unknown)."""
+
+    __slots__ = ('product_id', 'product_name', 'description', 'category', 'price', 'quantity', 'cgst', 'sgst')
+
+    def __init__(self, product_id, product_name, description, category, price, quantity, cgst=0, sgst=0):
+        self.product_id = product_id
+        self.product_name = product_name
+        self.description = description
+        self.category = category
+        self.price = money(price)
+        self.quantity = quantity
+        self.cgst = money(cgst)
+        self.sgst = money(sgst)
+
+    @property
+    def total(self):
+        return self.price * self.quantity
+
+    @property
+    def tax(self):
+        return self.total * (self.cgst + self.sgst) / 100
+
+    def values(self):
+        """The row shown in the cart table."""
+        return self.product_id, self.product_name, self.description, self.price, self.quantity, self.total
+
+
+class Cart:
+    """The sale being rung up: one line per product, in the order they were first added, and the customer.
+
+    The subtotal and tax are kept as running Decimal totals, updated by the difference each change makes, so
+    reading them never walks the lines. The shop's Treeview only renders the lines; checkout and the invoice
+    read the Cart. tax_rate(category) gives the (CGST, SGST) percentages of a category, or None; lines whose
+    rates are not known yet are taxed at 0 and listed in pending until reprice() finds them. cart_id identifies
+    the cart's stock reservations (reservations.py); copies share it.
+    """
+
+    def __init__(self, tax_rate=None, cart_id=None):
+        self.tax_rate = tax_rate
+        self.cart_id = cart_id or uuid.uuid4().hex
+        self.lines = {}  # product_id -> CartLine
+        self.pending = set()  # product_ids of the lines without a tax rate
+        self.subtotal = Decimal(0)
+        self.tax = Decimal(0)
+        self.customer_name = ""
+        self.phone_number = ""
+        self.address = ""
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(list(self.lines.values()))
+
+    def __contains__(self, product_id):
+        return product_id in self.lines
+
+    @property
+    def total(self):
+        return self.subtotal + self.tax
+
+    def quantity(self, product_id):
+        line = self.lines.get(product_id)
+        return line.quantity if line else 0
+
+    def add(self, product, quantity=1):
+        """Adds quantity units of a catalogue product row (product_id, product_name, description, price, stock,
+        category), merged into its line if it is already in the cart. Returns the line."""
+        quantity = parse_quantity(quantity)
+        product_id = str(product[0])
+        line = self.lines.get(product_id)
+        if line is None:
+            rates = self.tax_rate(product[5]) if self.tax_rate else None
+            line = self.lines[product_id] = CartLine(product_id, product[1], product[2], product[5], product[3], 0,
+                                                     *(rates or (0, 0)))
+            if rates is None:
+                self.pending.add(product_id)
+        self._change(line, line.quantity + quantity)
+        return line
+
+    def set_quantity(self, product_id, quantity):
+        """Changes the quantity of a line; returns the line."""
+        line = self.lines[product_id]
+        self._change(line, parse_quantity(quantity))
+        return line
+
+    def remove(self, product_id):
+        """Removes a line and returns it."""
+        line = self.lines.pop(product_id)
+        self.pending.discard(product_id)
+        self.subtotal -= line.total
+        self.tax -= line.tax
+        return line
+
+    def clear(self):
+        self.lines.clear()
+        self.pending.clear()
+        self.subtotal = Decimal(0)
+        self.tax = Decimal(0)
+
+    def copy(self):
+        """A copy whose lines can be read while this cart keeps changing, e.g. by an order placed in the
+        background."""
+        cart = Cart(self.tax_rate, self.cart_id)
+        for product_id, line in self.lines.items():
+            cart.lines[product_id] = CartLine(*(getattr(line, name) for name in CartLine.__slots__))
+        cart.subtotal, cart.tax, cart.pending = self.subtotal, self.tax, set(self.pending)
+        cart.customer_name, cart.phone_number, cart.address = self.customer_name, self.phone_number, self.address
+        return cart
+
+    def reprice(self):
+        """Taxes the pending lines whose rates tax_rate now knows, e.g. once the catalogue has loaded; returns
+        those lines."""
+        repriced = []
+        for product_id in list(self.pending):
+            line = self.lines[product_id]
+            rates = self.tax_rate(line.category) if self.tax_rate else None
+            if rates is None:
+                continue
+            self.tax -= line.tax
+            line.cgst, line.sgst = map(money, rates)
+            self.tax += line.tax
+            self.pending.discard(product_id)
+            repriced.append(line)
+        return repriced
+
+    def items(self):
+        """(product_id, quantity) pairs, as checkout takes them."""
+        return [(line.product_id, line.quantity) for line in self.lines.values()]
+
+    def _change(self, line, quantity):
+        self.subtotal -= line.total
+        self.tax -= line.tax
+        line.quantity = quantity
+        self.subtotal += line.total
+        self.tax += line.tax
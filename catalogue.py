@@ -0,0 +1,118 @@
+import threading
+import time
+
+
+class Catalogue:
+    """In-memory cache of products, categories and tax rates for the shop/cart workflow.
+
+    The whole catalogue is loaded with two queries and served from memory until the TTL expires or
+    invalidate() is called by code that changed products or categories. Products are
+    (product_id, product_name, description, price, quantity, category) tuples.
+    """
+
+    def __init__(self, db, ttl=300):
+        self.db = db
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self.by_id = {}
+        self.by_name = {}
+        self.by_category = {}
+        self.tax_rates = {}
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+
+    def _load(self):
+        products = self.db.fetchall(
+            "SELECT product_id, product_name, description, price, quantity, category FROM products")
+        categories = self.db.fetchall("SELECT category_name, CGST, SGST FROM categories")
+        self.queries += 2
+
+        by_id, by_name, by_category = {}, {}, {}
+        for product in products:
+            by_id[product[0]] = product
+            # Product names are not unique; like the old "WHERE product_name = %s" lookups the first one wins
+            by_name.setdefault(product[1], product)
+            by_category.setdefault(product[5], []).append(product[1])
+
+        self.by_id, self.by_name, self.by_category = by_id, by_name, by_category
+        self.tax_rates = {name: (cgst, sgst) for name, cgst, sgst in categories}
+        self._loaded_at = time.monotonic()
+
+    def _fresh(self):
+        """Makes sure the cache is loaded and not older than the TTL."""
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+                self.misses += 1
+                self._load()
+            else:
+                self.hits += 1
+
+    def warm(self):
+        self._fresh()
+
+    def stale(self):
+        """True if the next lookup would reload, e.g. after invalidate(); peek() keeps serving the old rows."""
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.ttl
+
+    def invalidate(self):
+        """Drops the cached data; the next lookup reloads it. Call after changing products or categories."""
+        with self._lock:
+            self._loaded_at = None
+
+    def categories(self):
+        self._fresh()
+        return list(self.tax_rates)
+
+    def peek_categories(self):
+        """categories() as currently cached, without reloading a stale cache."""
+        return list(self.tax_rates)
+
+    def products_in(self, category):
+        """Names of the products in a category."""
+        self._fresh()
+        return list(self.by_category.get(category, []))
+
+    def products(self):
+        """Every product row."""
+        self._fresh()
+        return list(self.by_id.values())
+
+    def product_names(self):
+        self._fresh()
+        return list(self.by_name)
+
+    def product(self, product_id):
+        self._fresh()
+        return self.by_id.get(product_id)
+
+    def peek(self, product_id):
+        """The product as currently cached, without reloading a stale cache; None if it is not there. For the UI
+        thread, where a reload would block."""
+        return self.by_id.get(product_id)
+
+    def product_by_name(self, product_name):
+        self._fresh()
+        return self.by_name.get(product_name)
+
+    def tax_rate(self, category):
+        """(CGST, SGST) percentages of a category, or None."""
+        self._fresh()
+        return self.tax_rates.get(category)
+
+    def peek_tax_rate(self, category):
+        """tax_rate() as currently cached, without reloading a stale cache."""
+        return self.tax_rates.get(category)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'queries': self.queries,
+            'products': len(self.by_id),
+        }
@@ -0,0 +1,102 @@
+from datetime import date
+from decimal import Decimal
+
+from mysql.connector import errors
+
+from reservations import held, lock_products, unreserve
+from rollups import record_order
+
+
+# InnoDB's "Deadlock found when trying to get lock": the transaction was rolled back and can run again
+DEADLOCK = 1213
+DEADLOCK_RETRIES = 3
+
+
+class OutOfStockError(Exception):
+    """Raised when a checkout asks for more units than are in stock; the whole order is rolled back."""
+
+
+def merge_lines(lines):
+    """Sums the requested quantity per product so each product is decremented exactly once."""
+    requested = {}
+    for product_id, quantity, price in lines:
+        requested[product_id] = requested.get(product_id, 0) + int(quantity)
+    return requested
+
+
+def place_order(db, user, lines, payment_status, customer_name, phone_number, address, cart_id=None):
+    """Writes an order and its line items atomically and returns the DB-generated order_id.
+
+    lines is a list of (product_id, quantity, unit_price). The product rows are locked in id order first, so
+    checkouts with overlapping lines queue rather than deadlock, then stock for every product is decremented by a
+    single guarded UPDATE; if any product is short the transaction is rolled back and OutOfStockError raised.
+    Units reserved by other carts (reservations.py) are not for sale; with cart_id, the units that cart reserved
+    are sold first and their reservations converted into the sale. The daily sales rollups are updated in the
+    same transaction. The whole checkout is ten round-trips regardless of the number of lines, plus a few to
+    convert a cart's reservations. A transaction InnoDB still rolls back as a deadlock victim (e.g. on the
+    rollup rows) is run again, up to DEADLOCK_RETRIES times.
+    """
+    if not lines:
+        raise ValueError("Cannot place an empty order")
+    for attempt in range(DEADLOCK_RETRIES + 1):
+        try:
+            return _write_order(db, user, lines, payment_status, customer_name, phone_number, address, cart_id)
+        except errors.DatabaseError as e:
+            if e.errno != DEADLOCK or attempt == DEADLOCK_RETRIES:
+                raise
+
+
+def _write_order(db, user, lines, payment_status, customer_name, phone_number, address, cart_id):
+    requested = merge_lines(lines)
+    total_amount = sum(Decimal(str(price)) * int(quantity) for _, quantity, price in lines)
+    today = date.today()
+
+    derived = " UNION ALL ".join(["SELECT %s AS product_id, %s AS quantity, %s AS used"] * len(requested))
+
+    with db.transaction() as cur:
+        # Lock the products in id order, before reading the cart's reservations as every reservation change does
+        lock_products(cur, requested)
+        used = {}
+        if cart_id:
+            used = {product_id: min(quantity, requested[product_id])
+                    for product_id, quantity in held(cur, cart_id, requested).items()}
+        params = [value for product_id, quantity in requested.items()
+                  for value in (product_id, quantity, used.get(product_id, 0))]
+
+        # Decrement all products at once; rows without enough unreserved stock (plus what this cart reserved)
+        # are left untouched by the guard
+        cur.execute(
+            f"UPDATE products p JOIN ({derived}) r ON p.product_id = r.product_id "
+            "LEFT JOIN reserved_stock s ON s.product_id = p.product_id "
+            "SET p.quantity = p.quantity - r.quantity "
+            "WHERE p.quantity - COALESCE(s.quantity, 0) + r.used >= r.quantity",
+            params
+        )
+        if cur.rowcount != len(requested):
+            raise OutOfStockError("Not enough stock for one or more items in the cart")
+
+        if used:
+            # Units sold from a reservation are no longer reserved; what the cart holds beyond the sale stays held
+            cur.executemany("UPDATE stock_reservations SET quantity = quantity - %s "
+                            "WHERE cart_id = %s AND product_id = %s",
+                            [(quantity, cart_id, product_id) for product_id, quantity in used.items()])
+            cur.execute("DELETE FROM stock_reservations WHERE cart_id = %s AND quantity <= 0", (cart_id,))
+            unreserve(cur, used)
+
+        cur.execute(
+            "INSERT INTO orders (user, date, total_items, total_amount, payment_status, customer_name, phone_number, address) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            (user, today, len(lines), total_amount, payment_status, customer_name, phone_number, address)
+        )
+        order_id = cur.lastrowid
+
+        # executemany batches the line items into one multi-row INSERT
+        cur.executemany(
+            "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (%s, %s, %s, %s)",
+            [(order_id, product_id, int(quantity), price) for product_id, quantity, price in lines]
+        )
+        # The category at the time of sale, which rebuilding the category rollup reads
+        cur.execute("UPDATE order_items oi JOIN products p ON p.product_id = oi.product_id "
+                    "SET oi.category = p.category WHERE oi.order_id = %s", (order_id,))
+        record_order(cur, today, payment_status, lines)
+
+    return order_id
@@ -0,0 +1,304 @@
+import math
+import os
+import tkinter
+from datetime import date
+
+import customtkinter as ctk
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from utils import error, MONTHLY_EARNINGS_QUERY
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+STATUSES = {'paid': 'Paid', 'pending': 'Pending'}
+
+# Orders placed since the watermark, one row each with its revenue
+DELTA_QUERY = """
+    SELECT o.order_id, o.date, o.payment_status, COALESCE(SUM(oi.quantity * oi.price), 0)
+    FROM orders o LEFT JOIN order_items oi ON oi.order_id = o.order_id
+    WHERE o.order_id > %s
+    GROUP BY o.order_id
+"""
+
+
+class DashboardStats:
+    """The numbers on the dashboard: loaded once from the daily rollups, then advanced by the orders placed
+    since the last refresh.
+
+    Order ids are handed out before the checkout commits, so concurrent tills can commit them out of order;
+    the orders in a window below the highest id seen are therefore read again, and the ones already counted
+    skipped. Blocking; runs on a worker thread.
+    """
+
+    # How far below the highest order id seen to look for late commits
+    WINDOW = 200
+
+    def __init__(self):
+        self.day = None
+        self.watermark = None
+        self.counted = set()
+        self.sales_today = 0
+        self.transactions = 0
+        self.items = 0
+        self.payments = dict.fromkeys(STATUSES.values(), 0)
+        self.earnings = [0.0] * 12
+
+    def cards(self):
+        return self.sales_today, self.transactions, self.items
+
+    def load(self, db):
+        """Reads everything from the rollups in one snapshot, so the watermark matches the totals."""
+        today = date.today()
+        with db.transaction() as cur:
+            cur.execute("SELECT COALESCE(MAX(order_id), 0) FROM orders")
+            watermark = cur.fetchone()[0]
+            cur.execute("SELECT order_id FROM orders WHERE order_id > %s", (watermark - self.WINDOW,))
+            counted = {row[0] for row in cur.fetchall()}
+            cur.execute("SELECT payment_status, SUM(orders), SUM(CASE WHEN sale_date = %s THEN orders ELSE 0 END) "
+                        "FROM sales_daily GROUP BY payment_status", (today,))
+            by_status = cur.fetchall()
+            cur.execute(MONTHLY_EARNINGS_QUERY)
+            monthly = cur.fetchall()
+            cur.execute("SELECT COUNT(*) FROM products")
+            items = cur.fetchone()[0]
+
+        self.day, self.watermark, self.counted, self.items = today, watermark, counted, items
+        self.transactions = sum(int(orders) for _, orders, _ in by_status)
+        self.sales_today = sum(int(orders_today) for _, _, orders_today in by_status)
+        self.payments = dict.fromkeys(STATUSES.values(), 0)
+        for status, orders, _ in by_status:
+            if status in STATUSES:
+                self.payments[STATUSES[status]] = int(orders)
+        self.earnings = [0.0] * 12
+        for month, earning in monthly:
+            if month in MONTHS:
+                self.earnings[MONTHS.index(month)] = float(earning or 0)
+        return True
+
+    def update(self, db):
+        """Adds the orders placed since the last refresh; returns whether anything on the dashboard changed.
+
+        Falls back to a full load on the first call and when the day changed, since "today" and the current
+        year then cover different orders.
+        """
+        today = date.today()
+        if self.watermark is None or today != self.day:
+            return self.load(db)
+
+        rows = db.fetchall(DELTA_QUERY, (self.watermark - self.WINDOW,))
+        items = db.scalar("SELECT COUNT(*) FROM products")
+        changed = items != self.items
+        self.items = items
+        for order_id, order_date, payment_status, revenue in rows:
+            if order_id in self.counted:
+                continue
+            self.counted.add(order_id)
+            changed = True
+            self.transactions += 1
+            if order_date == today:
+                self.sales_today += 1
+            if payment_status in STATUSES:
+                self.payments[STATUSES[payment_status]] += 1
+            if payment_status == 'paid' and order_date and order_date.year == today.year:
+                self.earnings[order_date.month - 1] += float(revenue)
+
+        if rows:
+            self.watermark = max(self.watermark, max(row[0] for row in rows))
+            floor = self.watermark - self.WINDOW
+            self.counted = {order_id for order_id in self.counted if order_id > floor}
+        return changed
+
+
+class DashboardGraphs:
+    """The order status pie chart and monthly earnings bar graph, drawn once and then updated in place."""
+
+    COLORS = [
+        "#FF5A5F",  # Red
+        "#0079BF",  # Blue
+        "#00C2E0",  # Teal
+        "#51E898",  # Green
+        "#F2D600",  # Yellow
+        "#FF7A5A",  # Orange
+        "#A652BB",  # Purple
+        "#EB5A46",  # Coral
+        "#FFD500",  # Gold
+        "#8ED1FC",  # Sky Blue
+    ]
+
+    def __init__(self, frame):
+        plt.style.use("dark_background")
+        for param in ['text.color', 'axes.labelcolor', 'xtick.color', 'ytick.color']:
+            plt.rcParams[param] = '0.9'
+        for param in ['figure.facecolor', 'axes.facecolor', 'savefig.facecolor']:
+            plt.rcParams[param] = '#1a1a1a'
+
+        graph_container = ctk.CTkFrame(master=frame, fg_color="transparent")
+        graph_container.pack(fill="both", expand=True, padx=20, pady=20)
+        self.make_pie(graph_container)
+        self.make_bars(graph_container)
+
+    def make_pie(self, graph_container):
+        # Placeholder sizes until the first data arrives; update() moves the wedges
+        self.pie_fig = plt.Figure(figsize=(4, 4), dpi=100)
+        self.pie_ax = self.pie_fig.add_subplot(1, 1, 1)
+        self.wedges, self.wedge_labels, self.wedge_pcts = self.pie_ax.pie(
+            [1, 1], labels=list(STATUSES.values()), autopct="%1.1f%%", colors=self.COLORS[:2], startangle=90)
+        self.pie_ax.set_title("Order Status")
+
+        pie_container = ctk.CTkFrame(master=graph_container, fg_color="transparent")
+        pie_container.pack(side="left", padx=20, pady=20, fill="both", expand=True)
+        self.pie_canvas = FigureCanvasTkAgg(self.pie_fig, master=pie_container)
+        self.pie_canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        legend_frame = ctk.CTkFrame(master=pie_container, fg_color="transparent")
+        legend_frame.pack(pady=(10, 0))
+        for color, label in zip(self.COLORS, STATUSES.values()):
+            item_frame = ctk.CTkFrame(master=legend_frame, fg_color=color, width=20, height=20)
+            item_frame.pack(side="left", padx=(0, 10), pady=5)
+            ctk.CTkLabel(master=legend_frame, text=label, font=("Century Gothic", 12)).pack(side="left", padx=(0, 20))
+
+    def make_bars(self, graph_container):
+        self.bar_fig = plt.Figure(figsize=(7, 4), dpi=100)
+        self.bar_ax = self.bar_fig.add_subplot(1, 1, 1)
+        self.bars = self.bar_ax.bar(MONTHS, [0] * 12, color=self.COLORS)
+        self.bar_ax.set_xlabel("Months")
+        self.bar_ax.set_ylabel("Earnings (₹)")
+        self.bar_ax.set_title("Monthly Earnings")
+        self.bar_ax.grid(True, linestyle='--', alpha=0.7)
+        plt.setp(self.bar_ax.get_xticklabels(), rotation=45, ha='right')
+        self.bar_fig.canvas.mpl_connect('motion_notify_event', self.on_hover)
+
+        self.bar_canvas = FigureCanvasTkAgg(self.bar_fig, master=graph_container)
+        self.bar_canvas.get_tk_widget().pack(side="right", padx=20, pady=20)
+
+    def on_hover(self, event):
+        """Shows the earnings of the bar under the mouse."""
+        if event.inaxes != self.bar_ax:
+            return
+        for bar in self.bars:
+            contains, _ = bar.contains(event)
+            if contains:
+                value = bar.get_height()
+                self.bar_ax.annotate(
+                    f'₹{value:,.2f}',
+                    xy=(bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                    xytext=(0, 5),
+                    textcoords='offset points',
+                    ha='center',
+                    bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8),
+                    fontsize=10
+                )
+                self.bar_canvas.draw_idle()
+                return
+        # Remove any existing annotations
+        for annot in self.bar_ax.texts:
+            annot.remove()
+        self.bar_canvas.draw_idle()
+
+    def update_pie(self, counts):
+        """Moves the wedges, labels and percentages to the new counts instead of drawing a new pie."""
+        total = sum(counts)
+        theta = 90.0
+        for wedge, label, pct, count in zip(self.wedges, self.wedge_labels, self.wedge_pcts, counts):
+            share = count / total if total else 0.0
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + 360 * share)
+            middle = math.radians(theta + 180 * share)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct.set_position((0.6 * x, 0.6 * y))
+            pct.set_text(f"{share * 100:.1f}%" if share > 0 else "")
+            theta += 360 * share
+
+    def update(self, stats):
+        self.update_pie([stats.payments[label] for label in STATUSES.values()])
+        for bar, earning in zip(self.bars, stats.earnings):
+            bar.set_height(earning)
+        self.bar_ax.relim()
+        self.bar_ax.autoscale_view()
+        self.pie_canvas.draw_idle()
+        self.bar_canvas.draw_idle()
+
+
+class Dashboard:
+    """The dashboard cards and graphs, built once and refreshed in place.
+
+    Every refresh only reads the orders placed since the previous one (see DashboardStats) and redraws nothing
+    when they did not change the numbers. Set IMS_DASHBOARD_REFRESH=<seconds> to also refresh periodically
+    while the dashboard is on screen.
+    """
+
+    CARDS = ("Total Sales Today", "Total Transactions", "Items in Inventory")
+
+    def __init__(self, frame, db, executor, font='Century Gothic', refresh_seconds=None, stats=None):
+        self.frame = frame
+        self.db = db
+        self.executor = executor
+        self.stats = stats or DashboardStats()
+        if refresh_seconds is None:
+            refresh_seconds = float(os.environ.get('IMS_DASHBOARD_REFRESH') or 0)
+        self.refresh_ms = int(refresh_seconds * 1000)
+        self.loading = False
+        self.loaded = False
+
+        # Create a frame for the statistics cards
+        stats_frame = ctk.CTkFrame(master=frame, fg_color="transparent")
+        stats_frame.pack(fill="x", padx=20, pady=20)
+        self.card_labels = []
+        for title in self.CARDS:
+            card = ctk.CTkFrame(master=stats_frame, width=300, height=150, corner_radius=15, fg_color="#007fff")
+            card.pack(side="left", padx=10)
+
+            # Placeholder until the counts arrive from the background query
+            value_label = ctk.CTkLabel(card, text="...", fg_color="#007fff", font=(font, 30))
+            value_label.place(relx=0.5, rely=0.4, anchor="center")
+            self.card_labels.append(value_label)
+
+            title_label = ctk.CTkLabel(card, text=title, fg_color="#007fff", font=(font, 16))
+            title_label.place(relx=0.5, rely=0.7, anchor="center")
+
+        # Create a frame for the graphs
+        self.graphs_frame = ctk.CTkFrame(master=frame, fg_color="transparent")
+        self.graphs_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        self.graphs = DashboardGraphs(self.graphs_frame)
+
+        if self.refresh_ms:
+            self.frame.after(self.refresh_ms, self.auto_refresh)
+
+    def refresh(self):
+        """Reads what changed since the last refresh in the background and updates the cards and graphs."""
+        if self.loading:
+            return
+        self.loading = True
+        self.executor.submit(self.frame, self.stats.update, self.db, callback=self.show, errback=self.failed)
+
+    def show(self, changed):
+        self.loading = False
+        if changed or not self.loaded:
+            self.redraw()
+        self.loaded = True
+
+    def redraw(self):
+        for label, count in zip(self.card_labels, self.stats.cards()):
+            label.configure(text=count)
+        try:
+            self.graphs.update(self.stats)
+        except Exception as e:
+            print(f"Error updating graphs: {e}")
+            error("Failed to update dashboard graphs")
+
+    def failed(self, exc):
+        self.loading = False
+        print(f"[!]   Dashboard refresh failed: {exc}")
+        if not self.loaded:
+            error("Failed to load dashboard graphs")
+
+    def auto_refresh(self):
+        try:
+            # Only while the dashboard is the section on screen
+            if self.frame.winfo_ismapped():
+                self.refresh()
+            self.frame.after(self.refresh_ms, self.auto_refresh)
+        except tkinter.TclError:
+            pass  # The window was closed
@@ -0,0 +1,256 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector as mycon
+from mysql.connector import errors
+
+from profiling import PROFILER, ProfiledCursor
+
+# Update the MySQL credentials here
+DB_CONFIG = {'host': 'localhost', 'user': 'root', 'passwd': 'manager'}
+DB_NAME = 'inventory'
+
+# Errors raised when the server has gone away or the socket was dropped
+CONNECTION_ERRORS = (errors.OperationalError, errors.InterfaceError)
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free within the timeout."""
+
+
+class ConnectionPool:
+    """A bounded pool of MySQL connections shared by every window of the application."""
+
+    def __init__(self, size=5, timeout=10, **config):
+        self.size = size
+        self.timeout = timeout
+        self.config = config
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._available = threading.Semaphore(size)
+        self._created = 0
+        # Utilization counters
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.reconnects = 0
+
+    def _connect(self):
+        con = mycon.connect(**self.config)
+        con.autocommit = True
+        return con
+
+    def _healthy(self, con):
+        """Check a connection before handing it out, reconnecting it if the server dropped it."""
+        try:
+            con.ping(reconnect=False)
+            return con
+        except CONNECTION_ERRORS:
+            pass
+        self.reconnects += 1
+        try:
+            con.reconnect(attempts=3, delay=1)
+            con.autocommit = True
+            return con
+        except CONNECTION_ERRORS:
+            return self._connect()
+
+    def acquire(self):
+        """Take a connection out of the pool, blocking while all of them are busy."""
+        if not self._available.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            if not self._available.acquire(timeout=self.timeout):
+                raise PoolTimeout(f"No free connection after {self.timeout}s")
+        try:
+            try:
+                con = self._healthy(self._idle.get_nowait())
+            except queue.Empty:
+                con = self._connect()
+                with self._lock:
+                    self._created += 1
+        except Exception:
+            self._available.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return con
+
+    def release(self, con, discard=False):
+        """Return a connection to the pool, or close it if it is broken."""
+        with self._lock:
+            self.in_use -= 1
+        if discard:
+            try:
+                con.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+        else:
+            self._idle.put(con)
+        self._available.release()
+
+    @contextmanager
+    def connection(self):
+        con = self.acquire()
+        broken = False
+        try:
+            yield con
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.release(con, discard=broken)
+
+    def stats(self):
+        """Return a snapshot of the pool utilization counters."""
+        with self._lock:
+            return {
+                'size': self.size,
+                'open': self._created,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'utilization': self.in_use / self.size,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'reconnects': self.reconnects,
+            }
+
+    def close(self):
+        while True:
+            try:
+                con = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                con.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+
+
+class Database:
+    """Data-access layer: every query borrows a pooled connection and its own cursor.
+
+    Statements are timed by the query profiler while it is enabled (see profiling.py).
+    """
+
+    def __init__(self, pool, profiler=PROFILER):
+        self.pool = pool
+        self.profiler = profiler
+
+    def _cursor(self, con, buffered=True):
+        """A cursor on a pooled connection; buffered unless it streams (see _run)."""
+        cur = con.cursor(buffered=buffered)
+        return ProfiledCursor(cur, self.profiler) if self.profiler.enabled else cur
+
+    def _run(self, fetch, query, params=None, retry=True):
+        try:
+            with self.pool.connection() as con:
+                # Buffered, so fetchone() on a multi-row result does not leave unread rows behind: closing the
+                # cursor would raise "Unread result found" and the connection would go back to the pool unusable
+                cur = con.cursor(buffered=True)
+                try:
+                    if self.profiler.enabled:
+                        start = time.perf_counter()
+                        cur.execute(query, params)
+                        self.profiler.record(query, time.perf_counter() - start, cur.rowcount)
+                    else:
+                        cur.execute(query, params)
+                    return fetch(cur)
+                finally:
+                    cur.close()
+        except CONNECTION_ERRORS:
+            # The connection dropped mid-query; retry once on a fresh one
+            if not retry:
+                raise
+            return self._run(fetch, query, params, retry=False)
+
+    def fetchall(self, query, params=None):
+        return self._run(lambda cur: cur.fetchall(), query, params)
+
+    def fetchone(self, query, params=None):
+        return self._run(lambda cur: cur.fetchone(), query, params)
+
+    def scalar(self, query, params=None):
+        """Return the first column of the first row, or None."""
+        row = self.fetchone(query, params)
+        return row[0] if row else None
+
+    def stream(self, query, params=None, size=1000):
+        """Yield the rows of a large result set in chunks of size without holding it all in memory.
+
+        The cursor is unbuffered, so the connection stays checked out until the generator is exhausted or closed.
+        """
+        with self.pool.connection() as con:
+            cur = self._cursor(con, buffered=False)
+            try:
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                # Drain what the caller did not read so the connection can be reused
+                if con.unread_result:
+                    con.consume_results()
+                cur.close()
+
+    def rows(self, query, params=None, size=1000):
+        """Yield the rows of query one at a time, fetched size at a time from an unbuffered cursor (see stream)."""
+        for chunk in self.stream(query, params, size):
+            yield from chunk
+
+    def execute(self, query, params=None):
+        """Run a single write statement in autocommit mode and return the affected row count."""
+        return self._run(lambda cur: cur.rowcount, query, params, retry=False)
+
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor inside an explicit transaction, committed on success and rolled back on error."""
+        with self.pool.connection() as con:
+            cur = self._cursor(con)
+            con.start_transaction()
+            try:
+                yield cur
+                con.commit()
+            except Exception:
+                try:
+                    con.rollback()
+                except CONNECTION_ERRORS:
+                    pass
+                raise
+            finally:
+                cur.close()
+
+    def stats(self):
+        return self.pool.stats()
+
+    def close(self):
+        self.pool.close()
+
+
+def create_database(config=DB_CONFIG, name=DB_NAME):
+    """Create the database itself using a throwaway connection, since the pool connects into it."""
+    con = mycon.connect(**config)
+    try:
+        cur = con.cursor()
+        cur.execute(f"CREATE DATABASE IF NOT EXISTS {name}")
+        cur.close()
+    finally:
+        con.close()
+
+
+def connect(size=5, config=DB_CONFIG, name=DB_NAME):
+    """Create the database if needed and return a pooled Database bound to it."""
+    create_database(config, name)
+    pool = ConnectionPool(size=size, database=name, **config)
+    return Database(pool)
@@ -0,0 +1,58 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+
+def fingerprint(data):
+    """A digest of a query result, to tell whether a chart's data changed since it was drawn."""
+    return hashlib.sha1(repr(data).encode()).hexdigest()
+
+
+class FigureCache:
+    """Keeps the matplotlib figure drawn for each chart, so a screen showing unchanged data reuses it.
+
+    One entry per chart key, holding the fingerprint of the data it was drawn from; a figure is rebuilt (and the
+    old one closed) when the data changes. At most size figures are retained, least recently shown evicted
+    first, and every figure leaving the cache is closed so pyplot does not keep it alive. IMS_CHART_CACHE sets
+    the size (default 16, 0 disables reuse).
+    """
+
+    def __init__(self, size=None):
+        if size is None:
+            size = int(os.environ.get('IMS_CHART_CACHE', 16))
+        self.size = size
+        self.figures = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, data, build):
+        """Returns the cached figure of key if it was drawn from the same data, otherwise build(data)."""
+        digest = fingerprint(data)
+        entry = self.figures.get(key)
+        if entry and entry[0] == digest and self.size > 0:
+            self.hits += 1
+            self.figures.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        if entry:
+            self.discard(key)
+        figure = build(data)
+        self.figures[key] = (digest, figure)
+        # The figure just built is always retained (it is about to be shown); the oldest ones make room
+        while len(self.figures) > max(self.size, 1):
+            self.discard(next(iter(self.figures)))
+        return figure
+
+    def discard(self, key):
+        _, figure = self.figures.pop(key)
+        plt.close(figure)
+
+    def clear(self):
+        for key in list(self.figures):
+            self.discard(key)
+
+    def stats(self):
+        return {'size': self.size, 'figures': len(self.figures), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,131 @@
+import argparse
+import collections
+import datetime
+import itertools
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import database
+from invoices import INVOICE_DIR, InvoiceJob, render_pdf
+
+# One row per order line, in (date, order) order so each day's orders arrive together and the
+# (date) index with its implicit order_id suffix serves the sort; taxed at the rates of the category each line
+# was sold under, so an archived invoice does not change when its product is recategorised or deleted
+ORDER_LINES_QUERY = """
+    SELECT o.order_id, o.date, o.customer_name, o.phone_number, o.address,
+           COALESCE(p.product_name, oi.product_id), oi.price, oi.quantity, c.CGST, c.SGST
+    FROM orders o
+    JOIN order_items oi ON oi.order_id = o.order_id
+    LEFT JOIN products p ON p.product_id = oi.product_id
+    LEFT JOIN categories c ON c.category_name = COALESCE(oi.category, p.category)
+    WHERE o.date >= %s AND o.date < %s
+    ORDER BY o.date, o.order_id, oi.order_item_id
+"""
+
+
+class ArchiveReport:
+    """Counts of a batch regeneration plus the orders that could not be rendered."""
+
+    def __init__(self):
+        self.invoices = 0
+        self.pages = 0
+        self.archives = []
+        self.skipped = []
+        self.seconds = 0.0
+
+    def pages_per_second(self):
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"{self.invoices} invoices ({self.pages} pages) in {len(self.archives)} archive(s), "
+                f"{len(self.skipped)} skipped, {self.pages_per_second():,.1f} pages/s")
+
+
+def order_jobs(db, start, end, skipped, chunk_size=2000):
+    """Streams an InvoiceJob per order placed between start and end (inclusive), in date order.
+
+    Orders with a line whose category has no tax rates are appended to skipped as (order_id, reason).
+    """
+    rows = (row for chunk in db.stream(ORDER_LINES_QUERY, (start, end + datetime.timedelta(days=1)), chunk_size)
+            for row in chunk)
+    for order_id, order_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        order_rows = list(order_rows)
+        _, order_date, customer_name, phone_number, address = order_rows[0][:5]
+        if any(row[8] is None or row[9] is None for row in order_rows):
+            skipped.append((order_id, "missing tax rates"))
+            continue
+        lines = [(str(name), float(price), int(quantity), float(cgst), float(sgst))
+                 for *_, name, price, quantity, cgst, sgst in order_rows]
+        order_time = datetime.datetime.combine(order_date, datetime.time())
+        yield order_date, InvoiceJob(order_id, customer_name, phone_number, address, lines, invoice_date=order_time)
+
+
+def archive_invoices(db, start, end, output_dir=None, workers=None, window=None):
+    """Regenerates the invoices of every order from start to end into one zip archive per day.
+
+    Jobs are streamed from MySQL and rendered on a process pool with at most window jobs in flight, so memory
+    stays bounded however many orders are in the range. Returns an ArchiveReport.
+    """
+    output_dir = output_dir or INVOICE_DIR
+    workers = workers or os.cpu_count() or 1
+    window = window or 4 * workers
+    os.makedirs(output_dir, exist_ok=True)
+    report = ArchiveReport()
+    started = time.perf_counter()
+
+    archive = None
+    archive_day = None
+    in_flight = collections.deque()
+
+    def collect():
+        nonlocal archive, archive_day
+        day, future = in_flight.popleft()
+        order_id, pdf, pages = future.result()
+        if day != archive_day:
+            if archive:
+                archive.close()
+            path = os.path.join(output_dir, f"invoices_{day.isoformat()}.zip")
+            archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+            archive_day = day
+            report.archives.append(path)
+        archive.writestr(f"Invoice_{order_id}.pdf", pdf)
+        report.invoices += 1
+        report.pages += pages
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        try:
+            for day, job in order_jobs(db, start, end, report.skipped):
+                in_flight.append((day, pool.submit(render_pdf, job)))
+                if len(in_flight) >= window:
+                    collect()
+            while in_flight:
+                collect()
+        finally:
+            if archive:
+                archive.close()
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the invoices of a date range into one zip per day.")
+    parser.add_argument('start', type=datetime.date.fromisoformat, help="first day, YYYY-MM-DD")
+    parser.add_argument('end', type=datetime.date.fromisoformat, nargs='?', help="last day (default: start)")
+    parser.add_argument('--output', help=f"directory for the archives (default: IMS_INVOICE_DIR or {INVOICE_DIR})")
+    parser.add_argument('--workers', type=int, help="rendering processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    db = database.connect(size=1)
+    report = archive_invoices(db, args.start, args.end or args.start, args.output, args.workers)
+    print(report.summary())
+    for order_id, reason in report.skipped:
+        print(f"Skipped order {order_id}: {reason}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+# Invoices are written here; defaults to the working directory as before
+INVOICE_DIR = os.environ.get('IMS_INVOICE_DIR', '.')
+
+
+class MissingTaxRate(Exception):
+    """Raised when a product's category has no CGST/SGST rates, so no invoice can be made."""
+
+
+class InvoiceJob:
+    """Everything needed to render one invoice, so a worker process never has to query the database.
+
+    lines are (product_name, base_price, quantity, cgst_percent, sgst_percent) tuples.
+    """
+
+    def __init__(self, order_id, customer_name, phone_number, address, lines, invoice_date=None, payment_date=None):
+        self.order_id = order_id
+        self.customer_name = customer_name
+        self.phone_number = phone_number
+        self.address = address
+        self.lines = lines
+        self.invoice_date = invoice_date or datetime.now()
+        self.payment_date = payment_date or self.invoice_date
+
+    @property
+    def filename(self):
+        return f"Invoice_{self.order_id}.pdf"
+
+
+def invoice_lines(items, tax_rate):
+    """Builds job lines from (product_name, base_price, quantity, category) items; tax_rate(category) gives the
+    (CGST, SGST) percentages or None."""
+    lines = []
+    for product_name, base_price, quantity, category in items:
+        rates = tax_rate(category)
+        if not rates:
+            raise MissingTaxRate(f"No tax rates found for category {category}")
+        lines.append((product_name, float(base_price), int(quantity), float(rates[0]), float(rates[1])))
+    return lines
+
+
+def build_invoice(job):
+    """Renders the invoice PDF and returns its bytes. CPU-bound; runs in a worker process."""
+    return render_pdf(job)[1]
+
+
+def render_pdf(job):
+    """Renders the invoice PDF and returns (order_id, pdf bytes, page count)."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    elements = []
+    styles = getSampleStyleSheet()
+    style_heading = styles['Title']
+    style_normal = styles['Normal']
+    style_bold = styles['BodyText']
+    style_bold.fontName = 'Helvetica-Bold'
+
+    # Business information section
+    elements.extend([
+        Paragraph("INVENTORY MANAGEMENT SYSTEM", style_heading),
+        Spacer(1, 12),
+        Paragraph("Your Business Name", style_bold),
+        Paragraph("GSTIN: 1234567890", style_normal),
+        Spacer(1, 12),
+        Paragraph(f"Date: {job.invoice_date.strftime('%d-%m-%Y')}", style_normal),
+        Paragraph(f"Invoice No: {job.order_id}", style_normal),
+    ])
+    elements.append(Spacer(1, 24))
+
+    # Customer information section
+    elements.extend([
+        Paragraph(f"Customer Name: {job.customer_name}", style_normal),
+        Paragraph(f"Phone Number: {job.phone_number}", style_normal),
+        Paragraph(f"Address: {job.address}", style_normal),
+        Spacer(1, 12),
+        Paragraph("--------------------------------------------------", style_normal),
+        Spacer(1, 12),
+    ])
+
+    # Table data with GST details
+    data = [
+        ['Product Name', 'Base Price', 'Quantity', 'CGST', 'SGST', 'Final Price']
+    ]
+
+    total_cgst = 0
+    total_sgst = 0
+    total_amount = 0
+
+    for product_name, base_price, quantity, cgst_percent, sgst_percent in job.lines:
+        # Calculate tax amounts
+        cgst_amount = base_price * cgst_percent / 100
+        sgst_amount = base_price * sgst_percent / 100
+        final_price = base_price + cgst_amount + sgst_amount
+
+        # Add to totals
+        total_cgst += cgst_amount * quantity
+        total_sgst += sgst_amount * quantity
+        total_amount += final_price * quantity
+
+        data.append([
+            Paragraph(product_name, style_normal),
+            Paragraph(f"{base_price:.2f} Rs", style_normal),
+            Paragraph(str(quantity), style_normal),
+            Paragraph(f"{cgst_amount:.2f} Rs", style_normal),
+            Paragraph(f"{sgst_amount:.2f} Rs", style_normal),
+            Paragraph(f"{final_price:.2f} Rs", style_normal)
+        ])
+
+    # Add total row
+    data.append([
+        Paragraph("", style_normal),
+        Paragraph("", style_normal),
+        Paragraph("", style_normal),
+        Paragraph(f"Total CGST: {total_cgst:.2f} Rs", style_bold),
+        Paragraph(f"Total SGST: {total_sgst:.2f} Rs", style_bold),
+        Paragraph(f"Total Amount: {total_amount:.2f} Rs", style_bold)
+    ])
+
+    table = Table(data, colWidths=[2.5 * inch, 1.2 * inch, 0.8 * inch, 1.2 * inch, 1.2 * inch, 1.5 * inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+        ('LINEBELOW', (0, -1), (-1, -1), 1, colors.black),
+        ('LINEABOVE', (0, 1), (-1, -2), 0.25, colors.grey),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ]))
+
+    elements.append(table)
+    elements.append(Spacer(1, 24))
+
+    # Payment information section
+    elements.extend([
+        Paragraph(f"Date of Actual Payment: {job.payment_date.strftime('%d-%m-%Y')}", style_normal),
+        Spacer(1, 12),
+        Paragraph("Thank you for your business!", style_normal),
+    ])
+
+    doc.build(elements)
+    return job.order_id, buffer.getvalue(), doc.page
+
+
+def render_invoice(job, output_dir=None):
+    """Renders a job and writes it to output_dir, returning the file path. Top-level so it can be pickled."""
+    output_dir = output_dir or INVOICE_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, job.filename)
+    # Write to a temporary name first so a half-written invoice is never picked up
+    with open(path + ".part", "wb") as f:
+        f.write(build_invoice(job))
+    os.replace(path + ".part", path)
+    return path
+
+
+class InvoiceQueue:
+    """Renders invoices on a pool of worker processes, since ReportLab is CPU-bound and holds the GIL.
+
+    Jobs are queued in the pool and their state is kept per order ('queued', 'done', 'failed') for the UI.
+    The number of workers comes from IMS_INVOICE_WORKERS (default 2).
+    """
+
+    def __init__(self, workers=None, output_dir=None):
+        if workers is None:
+            workers = int(os.environ.get('IMS_INVOICE_WORKERS', 2))
+        self.workers = workers
+        self.output_dir = output_dir or INVOICE_DIR
+        self.status = {}
+        self._pool = None
+
+    def _executor(self):
+        # Created on first use; spawn rather than fork so the workers do not inherit Tk and the DB pool
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def submit(self, job):
+        """Queues a job and returns a Future resolving to the invoice path."""
+        self.status[job.order_id] = 'queued'
+        future = self._executor().submit(render_invoice, job, self.output_dir)
+
+        def finished(future):
+            self.status[job.order_id] = 'failed' if future.exception() else 'done'
+
+        future.add_done_callback(finished)
+        return future
+
+    def pending(self):
+        return sum(1 for state in self.status.values() if state == 'queued')
+
+    def failed(self):
+        return [order_id for order_id, state in self.status.items() if state == 'failed']
+
+    def summary(self):
+        pending = self.pending()
+        failed = len(self.failed())
+        done = len(self.status) - pending - failed
+        text = f"Invoices: {pending} rendering, {done} ready"
+        return text + f", {failed} failed" if failed else text
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
@@ -9,14 +9,13 @@ from utils import error
 class Login:
     """Represents a login window for user authentication."""
 
-    def __init__(self, con):
+    def __init__(self, db):
         ctk.set_default_color_theme("dark-blue")
         ctk.set_appearance_mode("dark")
         self.window = ctk.CTk()
         self.window.title("Sign In")
         self.window.geometry("500x600")
-        self.con = con
-        self.cur = con.cursor()
+        self.db = db
         self.user = None
         self.login_window()
 
@@ -125,10 +124,9 @@ class Login:
         """Authenticate the user by checking the provided username and password with MySQL. """
         uname = self.username.get()
         pwd = self.password.get()
-        self.cur.execute(
+        self.db.execute(
             "INSERT IGNORE INTO users (username, password, account_type, email) VALUES ('ADMIN', 'ADMIN', 'ADMIN', 'admin@example.com');")
-        self.cur.execute("SELECT * FROM users WHERE username = %s AND password = %s", (uname, pwd))
-        f = self.cur.fetchall()
+        f = self.db.fetchall("SELECT * FROM users WHERE username = %s AND password = %s", (uname, pwd))
         if f:
             print("└─Logged in as {}".format(uname))
             self.window.quit()
@@ -143,8 +141,7 @@ class Login:
         pwd = self.password.get()
         email = self.email.get()
 
-        self.cur.execute("SELECT * FROM users WHERE username = %s", (uname,))
-        f = self.cur.fetchall()
+        f = self.db.fetchall("SELECT * FROM users WHERE username = %s", (uname,))
         if f:
             error("Username already exist")
         else:
@@ -155,8 +152,7 @@ class Login:
                 error("Length of the Username and Password should be less than 20")
                 return
 
-            self.cur.execute("INSERT INTO users VALUES (%s, %s, 'USER', %s)", (uname, pwd, email))
-            self.con.commit()
+            self.db.execute("INSERT INTO users VALUES (%s, %s, 'USER', %s)", (uname, pwd, email))
             messagebox.showinfo("Account created", "Your account has been succesfully created!")
             self.window.quit()
             self.user = (uname, pwd, 'USER', email)
@@ -204,11 +200,9 @@ class Login:
             error("Passwords do not match")
             return
 
-        self.cur.execute("SELECT * FROM users WHERE username = %s AND email = %s", (uname, email))
-        user = self.cur.fetchone()
+        user = self.db.fetchone("SELECT * FROM users WHERE username = %s AND email = %s", (uname, email))
         if user:
-            self.cur.execute("UPDATE users SET password = %s WHERE username = %s", (new_pwd, uname))
-            self.con.commit()
+            self.db.execute("UPDATE users SET password = %s WHERE username = %s", (new_pwd, uname))
             messagebox.showinfo("Success", "Password reset successfully!")
             self.login_window()
         else:
@@ -1,26 +1,58 @@
 import tkinter
-from tkinter import ttk, messagebox
-from datetime import date
+from tkinter import ttk, messagebox, filedialog
 import customtkinter as ctk
 from PIL import Image
 from Analytics import Analytics
 
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.units import inch
-from datetime import datetime
-import io
-
-from utils import error, add_graphs
+import subprocess
+
+from utils import error, notify
+from dashboard import Dashboard
+from tasks import BackgroundExecutor, StallMonitor
+from checkout import OutOfStockError
+from virtual_table import PagedQuery, VirtualTable
+from catalogue import Catalogue
+from product_search import ProductSearchBox
+from scanner import Scanner
+from cart import Cart, parse_quantity
+from reservations import ReservationError, Sweeper
+from restock import restock_summary
+from products import ValidationError
+from services import InventoryService, ServiceError
+from bulk import import_products, export
+from invoices import InvoiceJob, InvoiceQueue, MissingTaxRate, invoice_lines
+
+# select, from and key of the history query for keyset pagination by order item
+HISTORY_SOURCE = (
+    "o.order_id , p.product_name, oi.quantity , oi.price , o.date, o.payment_status, o.customer_name",
+    "orders o JOIN order_items oi ON o.order_id = oi.order_id JOIN products p ON oi.product_id = p.product_id",
+    "oi.order_item_id",
+    "o.user = %s",
+)
+# First page of the history, as checked by schema.explain_check
+HISTORY_QUERY = "SELECT {0} FROM {1} WHERE {3} ORDER BY {2} LIMIT 100".format(*HISTORY_SOURCE)
+
+# Primary key used to page through each table
+TABLE_KEYS = {"products": "product_id", "orders": "order_id", "users": "username"}
+
+
+def mask_user_row(item):
+    """Hides the password and email of 'USER' accounts."""
+    # Check if the user is of type 'USER' and hide password and email
+    if item[2] == 'USER':  # Assuming the third column is 'account_type'
+        # Replace password and email with ***
+        modified_item = list(item)
+        modified_item[1] = "***"  # Replace password
+        modified_item[3] = "***"  # Replace email
+        item = tuple(modified_item)
+    return item
 
 
 class Menu():
     """Represents a menu for the inventory management system."""
 
-    def __init__(self, con, user, login_win):
+    def __init__(self, db, user, login_win):
         # Set window theme as dark
         ctk.set_default_color_theme("dark-blue")
         ctk.set_appearance_mode("dark")
@@ -28,11 +60,25 @@ class Menu():
         self.login_win = login_win
         self.window = ctk.CTkToplevel(self.login_win)
         self.window.protocol("WM_DELETE_WINDOW", exit)
-        self.con = con
-        self.cur = con.cursor()
+        self.db = db
+        self.executor = BackgroundExecutor()
+        self.table = None
+        self.dashboard_view = None
+        self.catalogue = Catalogue(db)
+        self.invoices = InvoiceQueue()
+        self.service = InventoryService(db, self.catalogue)
+        # The shop cart outlives the shop view, so switching sections does not lose it
+        self.cart = Cart(self.catalogue.peek_tax_rate)
+        # The cart's reservations and its checkout run one at a time, in the order the cart changed
+        self.cart_executor = BackgroundExecutor(workers=1)
+        # Gives back the stock of carts abandoned on any till
+        self.sweeper = Sweeper(self.service.reservations).start()
+        self.stall_monitor = StallMonitor.from_env(self.window)
         self.user = user
         self.font = 'Century Gothic'
         self._logged_out = False
+        # Loads the catalogue and builds the product search index from it, then taxes the lines added before
+        self.executor.submit(self.window, self.service.index_products, callback=lambda _: self.reprice())
         self.make_window()
 
     def make_window(self):
@@ -49,7 +95,7 @@ class Menu():
 
     def show_analytics(self):
         from Analytics import Analytics
-        analytics = Analytics(self.con)
+        analytics = Analytics(self.db, self.executor)
         analytics.window.mainloop()
 
     def make_panel(self):
@@ -80,10 +126,21 @@ class Menu():
                                    fg_color="transparent", hover_color="#212121", command=section_functions[section])
             button.pack(padx=50, pady=50)
 
+        # Progress of the invoices being rendered in the background
+        self.invoice_status = ctk.CTkLabel(side_panel, text="", font=(self.font, 12), text_color="gray")
+        self.invoice_status.pack(side="bottom", pady=10)
+
         self.frame = ctk.CTkFrame(self.window, corner_radius=0, fg_color="#1a1a1a")
         self.frame.pack(fill="both", expand=True)
         self.dashboard()
 
+    def show_frame(self, frame, title):
+        """Shows an already built section frame again instead of building a new one."""
+        self.frame.forget()
+        self.frame = frame
+        self.frame.pack(fill="both", expand=True)
+        self.window.title(title)
+
     def set_title(self, title):
         """
         Sets the title of the user interface window.
@@ -102,38 +159,24 @@ class Menu():
         heading.pack()
 
     def dashboard(self):
-        """ Displays the dashboard section of the user interface."""
-        self.set_title("Dashboard")
-
-        # Create a frame for the statistics cards
-        stats_frame = ctk.CTkFrame(master=self.frame, fg_color="transparent")
-        stats_frame.pack(fill="x", padx=20, pady=20)
+        """ Displays the dashboard section of the user interface.
 
-        x = 50
-        self.cur.execute("SELECT COUNT(*) FROM orders WHERE Date(date) = Curdate();")
-        sales = self.cur.fetchall()[0]
-        self.cur.execute("SELECT COUNT(*) FROM orders;")
-        transactions = self.cur.fetchall()[0]
-        self.cur.execute("SELECT COUNT(*) FROM products;")
-        items = self.cur.fetchall()[0]
-
-        header = {"Total Sales Today": sales, "Total Transactions": transactions, "Items in Inventory": items}
-        for title in header:
-            card = ctk.CTkFrame(master=stats_frame, width=300, height=150, corner_radius=15, fg_color="#007fff")
-            card.pack(side="left", padx=10)
-
-            value_label = ctk.CTkLabel(card, text=header[title], fg_color="#007fff", font=(self.font, 30))
-            value_label.place(relx=0.5, rely=0.4, anchor="center")
+        The cards and graphs are built on the first visit; later visits show the same frame again and refresh
+        it in place with the orders placed in the meantime.
+        """
+        if self.dashboard_view:
+            self.show_frame(self.dashboard_view.frame, "Dashboard")
+            self.dashboard_view.refresh()
+            return
 
-            title_label = ctk.CTkLabel(card, text=title, fg_color="#007fff", font=(self.font, 16))
-            title_label.place(relx=0.5, rely=0.7, anchor="center")
+        self.set_title("Dashboard")
+        self.dashboard_view = Dashboard(self.frame, self.db, self.executor, self.font)
 
         # Analytics button (only for admin)
         if self.user[2] == 'ADMIN':
-            # Create a frame to hold the analytics button
+            # Create a frame to hold the analytics button, between the cards and the graphs
             analytics_frame = ctk.CTkFrame(master=self.frame, fg_color="transparent")
-            analytics_frame.pack(fill="x", padx=20, pady=20)
-
+            analytics_frame.pack(fill="x", padx=20, pady=20, before=self.dashboard_view.graphs_frame)
             # Place the analytics button in the center of the frame
             analytics_button = ctk.CTkButton(
                 analytics_frame,
@@ -145,15 +188,11 @@ class Menu():
             )
             analytics_button.pack(pady=10)  # Add padding to ensure it doesn't get cut-off # Place below the cards and center it
 
-        # Create a frame for the graphs
-        graphs_frame = ctk.CTkFrame(master=self.frame, fg_color="transparent")
-        graphs_frame.pack(fill="both", expand=True, padx=20, pady=20)
+            profile_button = ctk.CTkButton(analytics_frame, text="Query Profile", command=self.query_profile,
+                                           fg_color="#565b5e", font=(self.font, 16), width=200)
+            profile_button.pack(pady=(0, 10))
 
-        try:
-            add_graphs(self.cur, graphs_frame)
-        except Exception as e:
-            print(f"Error adding graphs: {e}")
-            error("Failed to load dashboard graphs")
+        self.dashboard_view.refresh()
 
     # In menu.py, modify the inventory method to include the "Add Category" button
     def inventory(self):
@@ -174,8 +213,76 @@ class Menu():
                                                 fg_color="#00cc00", font=(self.font, 20))
             add_category_button.place(x=300, y=50)
 
+            import_button = ctk.CTkButton(self.frame, width=100, command=self.import_products, text="Import",
+                                          fg_color="#007fff", font=(self.font, 20))
+            import_button.place(x=470, y=50)
+
+            export_button = ctk.CTkButton(self.frame, width=100, command=lambda: self.export_file("products"),
+                                          text="Export", fg_color="#007fff", font=(self.font, 20))
+            export_button.place(x=580, y=50)
+
         self.make_table(("Product ID", "Product Name", "Description", "Price", "Quantity", "Category"), 130, "products")
 
+    def query_profile(self):
+        """Shows the per-query timing stats collected by the query profiler (admin only)."""
+        profiler = self.db.profiler
+        win = ctk.CTkToplevel(self.window)
+        win.title("Query Profile")
+        win.geometry("1200x600")
+
+        controls = ctk.CTkFrame(win, fg_color="transparent")
+        controls.pack(fill="x", padx=10, pady=10)
+        enabled = ctk.BooleanVar(value=profiler.enabled)
+        ctk.CTkSwitch(controls, text="Profiling enabled", variable=enabled, font=(self.font, 14),
+                      command=lambda: profiler.enable() if enabled.get() else profiler.disable()).pack(side="left")
+        summary = ctk.CTkLabel(controls, text="", font=(self.font, 14))
+        summary.pack(side="left", padx=20)
+
+        columns = ("Count", "Total ms", "Mean ms", "p95 ms", "Rows", "Query", "Top call site")
+        frame = ctk.CTkFrame(win)
+        frame.pack(fill="both", expand=True, padx=10)
+        tree = ttk.Treeview(frame, columns=columns, show="headings")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        tree.pack(fill="both", expand=True)
+        for column, width in zip(columns, (60, 80, 70, 70, 70, 560, 260)):
+            tree.heading(column, text=column, anchor=tkinter.W)
+            tree.column(column, width=width, stretch=column == "Query")
+        tree.tag_configure("n_plus_one", foreground="#ff9f43")
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            snapshot = profiler.snapshot()
+            for row in snapshot:
+                site = next(iter(row['sites']), "")
+                query = row['query']
+                if row['n_plus_one']:
+                    # Flag queries issued in a loop, e.g. one lookup per cart line
+                    query = f"[N+1] {query}"
+                    site = next(iter(row['n_plus_one']))
+                tree.insert('', 'end', values=(row['count'], f"{row['total_ms']:.1f}", f"{row['mean_ms']:.2f}",
+                                               f"{row['p95_ms']:.2f}", row['rows'], query, site),
+                            tags=("n_plus_one",) if row['n_plus_one'] else ())
+            flagged = sum(1 for row in snapshot if row['n_plus_one'])
+            summary.configure(text=f"{len(snapshot)} queries, {sum(row['count'] for row in snapshot)} executions, "
+                                   f"{flagged} N+1 pattern(s)")
+
+        def reset():
+            profiler.reset()
+            refresh()
+
+        def export_json():
+            path = filedialog.asksaveasfilename(title="Export Query Profile", defaultextension=".json",
+                                                initialfile="query_profile.json", filetypes=[("JSON", "*.json")])
+            if path:
+                profiler.dump_json(path)
+                notify(win, "Query Profile", f"Saved to {path}", duration=3000)
+
+        for text, command in (("Refresh", refresh), ("Reset", reset), ("Export JSON", export_json)):
+            ctk.CTkButton(controls, text=text, width=100, command=command).pack(side="right", padx=5)
+        refresh()
+
     # New method to create the Add Category form
     def add_category_form(self):
         """Creates a new window with entry fields to add a category to the inventory."""
@@ -258,28 +365,29 @@ class Menu():
         sgst = gst / 2
 
         # Check for duplicate category
-        self.cur.execute("SELECT * FROM categories WHERE category_name = %s", (category_name,))
-        if self.cur.fetchall():
+        if self.db.fetchall("SELECT * FROM categories WHERE category_name = %s", (category_name,)):
             error("Category already exists")
             return
 
         # Insert into database
         try:
-            self.cur.execute(
+            self.db.execute(
                 "INSERT INTO categories (category_name, GST, SGST, CGST) VALUES (%s, %s, %s, %s)",
                 (category_name, gst, sgst, cgst)
             )
-            self.con.commit()
+            self.catalogue.invalidate()
             messagebox.showinfo("Success", f"Category '{category_name}' added successfully!")
             self.category_win.destroy()
             self.inventory()  # Refresh the inventory view
         except Exception as e:
             error(f"Failed to add category: {str(e)}")
 
-    def make_table(self, col, width, table=None, height=600):
-        """Create a tkinter treeview table with specified columns, column widths, and optional data source table."""
-        tableframe = ctk.CTkScrollableFrame(self.frame, width=1000, height=height)
-        tableframe.place(x=1070, y=100, anchor=tkinter.NE)
+    def make_table(self, col, width, table=None, height=600, source=None):
+        """Create a tkinter treeview table with specified columns, column widths, and optional data source table.
+
+        Database tables (or a PagedQuery source) are shown in a VirtualTable that pages rows in as the user
+        scrolls; without a source a plain Treeview is created, as used by the shop cart.
+        """
         style = ttk.Style()
         style.theme_use("default")
         style.configure("Treeview",
@@ -294,8 +402,20 @@ class Menu():
         style.configure("Treeview.Heading", background="#565b5e", foreground="white", relief="flat")
         style.map("Treeview.Heading",
                   background=[('active', '#3484F0')])
-        self.tree = ttk.Treeview(tableframe, columns=col,
-                                 selectmode="browse", height=100)
+
+        if table:
+            source = PagedQuery(self.db, f"{table}.*", table, TABLE_KEYS[table])
+        if source:
+            transform = mask_user_row if table == "users" else None
+            self.table = VirtualTable(self.frame, col, source, self.executor, height=height, transform=transform)
+            self.table.frame.place(x=1070, y=100, anchor=tkinter.NE)
+            self.tree = self.table.tree
+        else:
+            self.table = None
+            tableframe = ctk.CTkScrollableFrame(self.frame, width=1000, height=height)
+            tableframe.place(x=1070, y=100, anchor=tkinter.NE)
+            self.tree = ttk.Treeview(tableframe, columns=col,
+                                     selectmode="browse", height=100)
 
         for i, value in enumerate(col):
             if value == 'Price':
@@ -305,10 +425,13 @@ class Menu():
             self.tree.column(f'#{i}', stretch=tkinter.NO, minwidth=30, width=w)
             self.tree.heading(value, text=value, anchor=tkinter.W)
 
-        self.tree.grid(row=1, column=0, sticky="W")
-        self.tree.pack(fill="both", expand=True)
-        if table:
-            self.render_table(table)
+        if not source:
+            self.tree.pack(fill="both", expand=True)
+
+    def refresh_table(self):
+        """Reloads the database table currently on screen, if any."""
+        if self.table:
+            self.table.refresh()
 
     def users(self):
         """ Displays the Users section of the user interface. """
@@ -329,11 +452,79 @@ class Menu():
         label = ctk.CTkLabel(self.frame, text="Total Amount :", font=(self.font, 30))
         label.place(x=700, y=530)
 
-        button = ctk.CTkButton(master=self.frame, width=390, text="Sell Items", corner_radius=6, command=self.buy)
-        button.place(x=700, y=600)
-        headings = ("Product Id", "Product Name", "Description", "Price", "Quantity", "Total Amount", "Customer Name",
-                    "Phone Number", "Address")
-        self.make_table(headings, 130, height=400)
+        self.sell_button = ctk.CTkButton(master=self.frame, width=390, text="Sell Items", corner_radius=6,
+                                         command=self.buy)
+        self.sell_button.place(x=700, y=600)
+        headings = ("Product Id", "Product Name", "Description", "Price", "Quantity", "Total Amount")
+        self.make_table(headings, 180, height=400)
+        self.cart_view = self.frame
+        for line in self.cart:
+            self.render_line(line)
+        self.total()
+
+        # Scan mode: a barcode scanner types the product id and Return; the entry keeps the focus between scans
+        scan_entry = ctk.CTkEntry(self.frame, width=250, placeholder_text="Scan or type a Product Id")
+        scan_entry.place(x=250, y=55)
+        scan_status = ctk.CTkLabel(self.frame, text="", font=(self.font, 16))
+        scan_status.place(x=520, y=55)
+        self.scanner = Scanner(scan_entry, self.cart, self.catalogue, self.executor, on_change=self.cart_changed,
+                               status=scan_status)
+        scan_entry.focus_set()
+
+        # Customer details, entered once per cart
+        self.cart_customer = {}
+        for i, (field, value) in enumerate((("Customer Name", self.cart.customer_name),
+                                            ("Phone Number", self.cart.phone_number),
+                                            ("Address", self.cart.address))):
+            entry = ctk.CTkEntry(self.frame, width=250, placeholder_text=field)
+            entry.place(x=300, y=530 + 40 * i)
+            if value:
+                entry.insert(0, value)
+            self.cart_customer[field] = entry
+
+    def render_line(self, line):
+        """Shows a changed cart line in the cart table (the product id is the row id) and the new totals."""
+        if getattr(self, 'cart_view', None) is not self.frame:
+            return  # The shop is not on screen; it renders the whole cart when shown again
+        if line.product_id not in self.cart:
+            if self.tree.exists(line.product_id):
+                self.tree.delete(line.product_id)
+        elif self.tree.exists(line.product_id):
+            self.tree.item(line.product_id, values=line.values())
+        else:
+            self.tree.insert('', 'end', iid=line.product_id, values=line.values())
+        if line.product_id in self.cart:
+            self.tree.see(line.product_id)
+        self.total()
+
+    def cart_changed(self, line):
+        """Renders a changed cart line and holds its stock (none once it is removed) in the background. When the
+        units are no longer available the line goes back to what the cart still holds."""
+        self.render_line(line)
+        product_id = line.product_id
+
+        def refused(exc):
+            if not isinstance(exc, ReservationError):
+                print(f"[!]   Could not reserve {product_id}: {exc}")
+                return  # Checkout still checks the stock
+            if product_id in self.cart:
+                if exc.held:
+                    self.render_line(self.cart.set_quantity(product_id, exc.held))
+                else:
+                    self.render_line(self.cart.remove(product_id))
+            notify(self.window, "Out of stock", f"Only {exc.available} of {line.product_name} available")
+
+        self.cart_executor.submit(self.window, self.service.reserve, self.cart.cart_id, product_id,
+                                  self.cart.quantity(product_id), errback=refused)
+        if product_id in self.cart.pending:
+            # A category the cached catalogue has no rates for yet: reload it if stale, then look again
+            self.executor.submit(self.window, self.catalogue.warm, callback=lambda _: self.reprice())
+
+    def reprice(self):
+        """Taxes the cart lines whose rates were not known when they were added, now that the catalogue has
+        them."""
+        for line in self.cart.reprice():
+            self.render_line(line)
 
     def orders(self):
         """ Displays all the Orders placed in the system."""
@@ -347,17 +538,11 @@ class Menu():
         """ Displays the order history of the user. """
         self.set_title("Transactions History")
         headings = ("Order Id", "Product Name", "Quantity", "Price", "Date", "Payment Status", "Customer Name")
-        query = '''SELECT o.order_id , p.product_name, oi.quantity , oi.price , o.date, o.payment_status, o.customer_name
-        FROM orders o
-        JOIN order_items oi ON o.order_id = oi.order_id
-        JOIN products p ON oi.product_id = p.product_id
-        WHERE o.user = %s;
-        '''
-        self.make_table(headings, 130)
-        self.cur.execute(query, (self.user[0],))
-        items = self.cur.fetchall()
-        for item in items:
-            self.tree.insert('', 'end', values=item)
+        if self.user[2] == 'ADMIN':
+            export_button = ctk.CTkButton(self.frame, width=100, command=lambda: self.export_file("orders"),
+                                          text="Export Orders", fg_color="#007fff", font=(self.font, 20))
+            export_button.place(x=50, y=50)
+        self.make_table(headings, 130, source=PagedQuery(self.db, *HISTORY_SOURCE, params=(self.user[0],)))
 
     def add_item(self):
         """Display another window to add items to cart"""
@@ -368,39 +553,34 @@ class Menu():
         self.win_frame = ctk.CTkFrame(master=new_win, width=480, height=670, corner_radius=15)
         self.win_frame.place(relx=0.5, rely=0.5, anchor=tkinter.CENTER)
 
-        # Category combobox
+        # Category combobox, narrowing the product search
         label = ctk.CTkLabel(self.win_frame, text="Select Category:", font=(self.font, 20))
         label.place(x=50, y=50)
 
-        # Fetch categories from the database
-        self.cur.execute("SELECT category_name FROM categories")
-        categories = self.cur.fetchall()
-        category_names = [category[0] for category in categories]
-
-        self.category_var = ctk.StringVar(value="")
+        self.category_var = ctk.StringVar(value="All")
         self.category_combobox = ctk.CTkComboBox(
             self.win_frame,
-            values=category_names,
+            values=["All"],
             variable=self.category_var,
             width=200,
             command=self.update_products
         )
         self.category_combobox.place(x=250, y=50)
+        self.load_categories(self.category_combobox, "All")
 
-        # Product combobox
-        self.product_label = ctk.CTkLabel(self.win_frame, text="Select Product:", font=(self.font, 20))
+        # Search-as-you-type over product ids, names, descriptions and categories
+        self.product_label = ctk.CTkLabel(self.win_frame, text="Search Product:", font=(self.font, 20))
         self.product_label.place(x=50, y=100)
 
         self.product_var = ctk.StringVar(value="")
-        self.product_combobox = ctk.CTkComboBox(
+        self.product_search = ProductSearchBox(
             self.win_frame,
-            values=[],
-            variable=self.product_var,
-            width=200,
-            state="readonly",
-            command=self.fill_product_details
+            self.service.index,
+            command=self.fill_product_details,
+            category=lambda: None if self.category_var.get() == "All" else self.category_var.get(),
+            width=200
         )
-        self.product_combobox.place(x=250, y=100)
+        self.product_search.place(x=250, y=100)
 
         # Labels for product details
         self.available_quantity_label = ctk.CTkLabel(self.win_frame, text="Available Quantity:", font=(self.font, 20))
@@ -429,78 +609,62 @@ class Menu():
         )
         self.quantity_spinbox.place(x=250, y=383)  # Positioned to the right of the label
 
-        # Customer name entry
-        self.customer_name_label = ctk.CTkLabel(self.win_frame, text="Customer Name:", font=(self.font, 20))
-        self.customer_name_label.place(x=50, y=300)
-        self.customer_name_entry = ctk.CTkEntry(self.win_frame, width=200)
-        self.customer_name_entry.place(x=250, y=300)
-
-        self.phone_number_label = ctk.CTkLabel(self.win_frame, text="Phone Number:", font=(self.font, 20))
-        self.phone_number_label.place(x=50, y=350)
-        self.phone_number_entry = ctk.CTkEntry(self.win_frame, width=200)
-        self.phone_number_entry.place(x=250, y=350)
-
-        self.address_label = ctk.CTkLabel(self.win_frame, text="Address:", font=(self.font, 20))
-        self.address_label.place(x=50, y=400)
-        self.address_entry = ctk.CTkEntry(self.win_frame, width=200)
-        self.address_entry.place(x=250, y=400)
-
         # Add button
         button = ctk.CTkButton(master=self.win_frame, width=400, text="Add", corner_radius=6, command=self.add_to_cart)
         button.place(x=25, y=460)
 
+    def load_categories(self, combobox, *first):
+        """Fills a category combobox from the catalogue cache at once and, as the cache may be stale (every sale
+        and product change invalidates it), again once it is reloaded on a worker thread."""
+        combobox.configure(values=[*first, *self.catalogue.peek_categories()])
+        self.executor.submit(combobox, self.catalogue.categories,
+                             callback=lambda names: combobox.configure(values=[*first, *names]))
+
     def update_products(self, choice):
-        """Update the product combobox based on the selected category."""
-        category = self.category_var.get()
-        if not category:
-            self.product_combobox.configure(values=[])
-            return
+        """Searches again within the selected category."""
+        self.product_var.set("")
+        self.available_quantity_value.configure(text="")
+        self.unit_price_value.configure(text="")
+        self.product_search.update_results()
 
-        # Fetch products for the selected category
-        self.cur.execute("SELECT product_name FROM products WHERE category = %s", (category,))
-        products = self.cur.fetchall()
-        product_names = [product[0] for product in products]
+    def fill_product_details(self, choice):
+        """Fill product details (available quantity and unit price) when a product is picked in the search."""
+        product_id, product_name = choice[0], choice[1]
+        self.product_var.set(product_name)
 
-        # Update the product combobox
-        self.product_combobox.configure(values=product_names)
-        self.product_combobox.set("")  # Clear the selection
+        self.available_quantity_value.configure(text="...")
+        self.unit_price_value.configure(text="...")
 
-    def fill_product_details(self, choice):
-        """Fill product details (available quantity and unit price) when a product is selected."""
-        product_name = self.product_var.get()
-        if not product_name:
-            self.available_quantity_value.configure(text="")
-            self.unit_price_value.configure(text="")
-            return
+        def show_details(details):
+            if self.product_var.get() != product_name:
+                return
+            product, quantity = details
+            if not product:
+                error("Product details not found")
+                return
+
+            price = product[3]
+            self.available_quantity_value.configure(text=str(quantity))
+            self.unit_price_value.configure(text=str(price))
+            self.quantity_spinbox.configure(to=max(quantity, 1))
 
         # Fetch product details
-        self.cur.execute("SELECT quantity, price FROM products WHERE product_name = %s", (product_name,))
-        fetch = self.cur.fetchone()
-        if not fetch:
-            error("Product details not found")
-            return
+        self.executor.submit(self.available_quantity_value, self.product_details, product_id,
+                             callback=show_details)
 
-        quantity, price = fetch
-        self.available_quantity_value.configure(text=str(quantity))
-        self.unit_price_value.configure(text=str(price))
-        self.quantity_spinbox.configure(to=quantity)
+    def product_details(self, product_id):
+        """The catalogue row of a product and the units not held by any cart. Runs on a worker thread."""
+        product = self.catalogue.product(product_id)
+        return product, self.service.available(product_id) if product else 0
 
     def remove_item(self):
         """ Removes selected item from the cart."""
         selected_item = self.tree.selection()
 
         if selected_item and messagebox.askyesno('Alert!', 'Do you want to remove this item?') == True:
+            # Stock is only taken at checkout; removing a line gives back its reservation
             for i in selected_item:
-                item = self.tree.item(i)
-                self.tree.delete(i)
-
-                values = item['values']
-
-            p_id = values[0]
-            qty = values[4]
-            self.cur.execute("UPDATE products SET quantity = quantity + %s WHERE product_id = %s", (qty, p_id))
-            self.con.commit()
-        self.total()
+                self.cart_changed(self.cart.remove(i))
 
     def fill_labels(self, choice):
         """Fills labels with data of a particular item chosen by user"""
@@ -509,13 +673,12 @@ class Menu():
             error("Please select a product")
             return
 
-        self.cur.execute("SELECT quantity, price FROM products WHERE product_name = %s", (product_name,))
-        fetch = self.cur.fetchall()
-        if not fetch:
+        product = self.catalogue.product_by_name(product_name)
+        if not product:
             error("Product not found")
             return
 
-        quantity, price = fetch[0]
+        quantity, price = product[4], product[3]
         self.spin_var = ctk.IntVar(value=1)
         x = 250
 
@@ -555,54 +718,40 @@ class Menu():
 
     def add_to_cart(self):
         """Add the selected product to the cart with the specified quantity."""
-        product_name = self.product_var.get()
-        if not product_name:
+        picked = self.product_search.selected
+        if not picked:
             error("Please select a product")
             return
 
         try:
-            quantity = int(self.quantity_spinbox.get())
-            if quantity <= 0:
-                error("Please enter a valid quantity")
-                return
-
-            customer_name = self.customer_name_entry.get()
-            phone_number = self.phone_number_entry.get()  # Get phone number
-            address = self.address_entry.get()  # Get address
-
-            if not customer_name or not phone_number or not address:
-                error("Please fill all fields: Customer Name, Phone Number, Address")
-                return
+            quantity = parse_quantity(self.quantity_spinbox.get())
+        except ValidationError as e:
+            error(str(e))
+            return
 
-            # Fetch product details
-            self.cur.execute("SELECT product_id, description, price FROM products WHERE product_name = %s", (product_name,))
-            product = self.cur.fetchone()
+        def checked(details):
+            product, available = details
             if not product:
                 error("Product not found")
                 return
+            # Units held by any cart, this one included, are not available
+            if quantity > available:
+                error(f"Only {available} more of {product[1]} available")
+                return
+            self.cart_changed(self.cart.add(product, quantity))
 
-            p_id, desc, price = product
-            total = price * quantity
-
-            # Insert into the cart (assuming self.tree is the Treeview for the cart)
-            self.tree.insert('', 'end', values=(
-                p_id, product_name, desc, price, quantity, total, customer_name, phone_number, address
-            ))
-
-            # Update the total amount displayed
-            self.total()
-
-        except Exception as e:
-            error(f"Error adding item to cart: {str(e)}")
+        self.executor.submit(self.window, self.product_details, picked[0], callback=checked)
 
     def total(self):
-        """Evaluates the total amount in cart and displays it"""
-        total = round(sum(float(self.tree.item(item, "values")[-2]) for item in self.tree.get_children()), 2)
-        try:
-            self.total_label.place_forget()
-        except:
-            pass
-        self.total_label = ctk.CTkLabel(self.frame, text=total, font=(self.font, 22))
+        """Displays the cart total, kept up to date by the Cart itself"""
+        text = f"{self.cart.subtotal:.2f}  (+{self.cart.tax:.2f} GST)"
+        if self.cart.pending:
+            text += "  tax pending"
+        # Updated in place while the shop is on screen; scanning calls this for every item
+        if getattr(self, 'total_label', None) is not None and self.total_label.master is self.frame:
+            self.total_label.configure(text=text)
+            return
+        self.total_label = ctk.CTkLabel(self.frame, text=text, font=(self.font, 22))
         self.total_label.place(x=940, y=538)
 
     # menu.py
@@ -622,15 +771,11 @@ class Menu():
             label = ctk.CTkLabel(frame, text=i, font=(self.font, 14))
             label.pack(pady=(10, 0))
             if i == 'Category':
-                # Fetch categories from the database
-                self.cur.execute("SELECT category_name FROM categories")
-                categories = self.cur.fetchall()
-                category_names = [category[0] for category in categories]
-
                 # Create a combobox for categories
                 self.category_var = ctk.StringVar(value="")
-                combobox = ctk.CTkComboBox(frame, values=category_names, variable=self.category_var, width=350)
+                combobox = ctk.CTkComboBox(frame, values=[], variable=self.category_var, width=350)
                 combobox.pack(pady=(0, 10))
+                self.load_categories(combobox)
                 self.product_entries[i] = combobox
             else:
                 entry = ctk.CTkEntry(master=frame, placeholder_text=i, width=350, height=35)
@@ -643,125 +788,73 @@ class Menu():
 
     def buy(self):
         """Function to buy items which are added to cart"""
-        all_items = self.tree.get_children()
-        if not all_items:
+        if not self.cart:
             error("No items available. Add items to cart to buy")
             return
 
+        self.cart.customer_name, self.cart.phone_number, self.cart.address = (
+            entry.get() for entry in self.cart_customer.values())
         result = messagebox.askquestion("Payment", "Pay Now ?")
         if result == "yes":
             payment_status = "paid"
         else:
             payment_status = "pending"
 
-        # Fetch the next order_id
-        self.cur.execute("SELECT MAX(order_id) FROM orders")
-        max_order_id = self.cur.fetchone()[0]
-        order_id = max_order_id + 1 if max_order_id else 1001  # Start from 1001 if no orders exist
-
-        # Fetch the next order_item_id
-        self.cur.execute("SELECT MAX(order_item_id) FROM order_items")
-        max_order_item_id = self.cur.fetchone()[0]
-        order_item_id = max_order_item_id + 1 if max_order_item_id else 1
-
-        items = []
-        customer_name = None
-        phone_number = None
-        address = None
-
-        for item in all_items:
-            values = self.tree.item(item, "values")
-            product_id = values[0]
-            quantity = values[4]  # Assuming quantity is at index 4
-            price = values[3]  # Assuming price is at index 3
-            customer_name = values[6]  # Assuming customer name is at index 6
-            phone_number = values[7]  # Assuming phone number is at index 7
-            address = values[8]  # Assuming address is at index 8
-            items.append(values)
-
-            # Deduct the quantity from the product inventory using a parameterized query
-            self.cur.execute(
-                "UPDATE products SET quantity = quantity - %s WHERE product_id = %s",
-                (quantity, product_id)
-            )
+        # The order is placed from a copy, so scanning can go on meanwhile
+        cart = self.cart.copy()
+        # Prevent a second sale of the same cart while the order is being written
+        self.sell_button.configure(state="disabled", text="Processing...")
+
+        def placed(order):
+            self.sell_button.configure(state="normal", text="Sell Items")
+            order_id, prices = order
+
+            # Invoice the prices that were actually charged
+            self.generate_invoice(order_id, cart, prices)
+
+            # Check if any of the sold products needs restocking
+            self.check_and_restock_products(order_id, [line.product_id for line in cart])
+
+            messagebox.showinfo("Success", "Order placed successfully.")
+            # Units scanned while the order was written stay in the cart. A reservation queued for them after the
+            # order may have held the sold units again, so every sold line is reserved again at what is left
+            for line in cart:
+                remaining = self.cart.quantity(line.product_id) - line.quantity
+                if remaining > 0:
+                    self.cart_changed(self.cart.set_quantity(line.product_id, remaining))
+                elif line.product_id in self.cart:
+                    self.cart_changed(self.cart.remove(line.product_id))
+            self.cart.customer_name = self.cart.phone_number = self.cart.address = ""
+            for entry in self.cart_customer.values():
+                entry.delete(0, "end")
+
+        def failed(exc):
+            self.sell_button.configure(state="normal", text="Sell Items")
+            if isinstance(exc, OutOfStockError):
+                error(str(exc))
+            else:
+                error(f"Failed to place order: {exc}")
 
-            # Add to order_items using a parameterized query
-            self.cur.execute(
-                "INSERT INTO order_items (order_item_id, order_id, product_id, quantity, price) VALUES (%s, %s, %s, %s, %s)",
-                (order_item_id, order_id, product_id, quantity, price)
-            )
-            order_item_id += 1
+        # After the reservations of the lines already in the cart
+        self.cart_executor.submit(self.sell_button, self.place_order, cart, payment_status,
+                                  callback=placed, errback=failed)
 
-        total_amount = sum(
-            float(self.tree.item(item, "values")[5]) for item in all_items)  # Assuming total is at index 5
-        total_items = len(all_items)
+    def place_order(self, cart, payment_status):
+        """Writes the order in one transaction. Runs on a worker thread."""
+        order = self.service.checkout(self.user[0], cart.items(), payment_status, cart.customer_name,
+                                      cart.phone_number, cart.address, cart_id=cart.cart_id)
+        # Reload the catalogue here rather than on the UI thread when the invoice looks up tax rates
+        self.catalogue.warm()
+        return order['order_id'], {product_id: price for product_id, _, price in order['lines']}
 
-        # Insert into order table using a parameterized query
-        self.cur.execute(
-            "INSERT INTO orders (order_id, user, date, total_items, total_amount, payment_status, customer_name, phone_number, address) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
-            (order_id, self.user[0], date.today(), total_items, total_amount, payment_status, customer_name,
-             phone_number, address)
-        )
+    def check_and_restock_products(self, order_id, product_ids):
+        """Restocks the products sold in an order if they fell to their restock level and notifies the biller."""
+
+        def notify_restock(events):
+            if events:
+                notify(self.window, "Restock Summary", restock_summary(events))
 
-        self.con.commit()
-
-        # Generate invoice
-        self.generate_invoice(order_id, customer_name, items, total_amount, phone_number, address)
-
-        # Check if any product needs restocking
-        self.check_and_restock_products()
-
-        messagebox.showinfo("Success", "Order placed successfully.")
-        self.tree.delete(*self.tree.get_children())
-        self.render_table("products")  # Refresh the product table
-
-    def check_and_restock_products(self):
-        """Checks if any products need restocking and restocks them if necessary."""
-        self.cur.execute("SELECT product_id, quantity, restock_level, restock_quantity FROM products")
-        products = self.cur.fetchall()
-        restocked_products = []
-
-        for product in products:
-            product_id, current_quantity, restock_level, restock_quantity = product
-            if current_quantity <= restock_level and restock_quantity > 0:
-                restocked_products.append(product_id)
-                self.restock_product(product_id, restock_quantity)
-
-        if restocked_products:
-            # Additional summary notification if multiple products were restocked
-            message = "Multiple products restocked:\n\n"
-            for pid in restocked_products:
-                message += f"Product ID: {pid}\n"
-            messagebox.showinfo("Restock Summary", message)
-            self.render_table("products")  # Refresh the product table
-
-    # In menu.py
-    def restock_product(self, product_id, quantity):
-        """Restocks a product with the specified quantity and notifies admin."""
-        # Get current product details before restocking
-        self.cur.execute(
-            "SELECT product_name, quantity, restock_level FROM products WHERE product_id = %s", (product_id,))
-        product = self.cur.fetchone()
-        product_name, current_quantity, restock_level = product
-
-        # Perform the restocking
-        self.cur.execute("UPDATE products SET quantity = quantity + %s WHERE product_id = %s", (quantity, product_id))
-        self.con.commit()
-
-        # Calculate new quantity after restocking
-        new_quantity = current_quantity + quantity
-
-        # Show notification to biller
-        message = f"Product Restocked:\n\n"
-        message += f"Product ID: {product_id}\n"
-        message += f"Product Name: {product_name}\n"
-        message += f"Previous Quantity: {current_quantity}\n"
-        message += f"Restocked Quantity: {quantity}\n"
-        message += f"New Quantity: {new_quantity}\n"
-        message += f"Restock Level: {restock_level}"
-
-        messagebox.showinfo("Restock Notification", message)
-        print(f"Restocked {product_id} with {quantity} units")
+        self.executor.submit(self.window, self.service.restock, order_id, product_ids, callback=notify_restock)
 
     # menu.py
     def add_product(self):
@@ -775,57 +868,48 @@ class Menu():
         restock_level = self.product_entries['Restock Level'].get()
         restock_quantity = self.product_entries['Restock Quantity'].get()
 
-        # Validation checks
-        if not p_id.isdigit():
-            error("Product ID must contain only numbers")
-            return
-        if not p_name.isalpha():
-            error("Product Name must contain only characters")
-            return
-        if not p_desc.isalpha():
-            error("Description must contain only characters")
-            return
-        try:
-            float(p_price)
-        except ValueError:
-            error("Price must be a number")
-            return
-        try:
-            int(p_qty)
-        except ValueError:
-            error("Quantity must be a number")
-            return
-        if not p_category:  # Check if category is selected
-            error("Please select a category")
-            return
         try:
-            int(restock_level)
-        except ValueError:
-            error("Restock Level must be a number")
+            self.service.add_product(p_id, p_name, p_desc, p_price, p_qty, p_category, restock_level,
+                                     restock_quantity)
+        except (ValidationError, ServiceError) as e:
+            error(str(e))
             return
-        try:
-            int(restock_quantity)
-        except ValueError:
-            error("Restock Quantity must be a number")
+
+        messagebox.showinfo("Item Added!", "Item successfully created!")
+        self.topwin.destroy()
+        self.refresh_table()  # Refresh table with updated data
+
+    def import_products(self):
+        """Upserts products from a CSV or Excel file in the background and reports the rejected rows."""
+        path = filedialog.askopenfilename(title="Import Products",
+                                          filetypes=[("CSV or Excel", "*.csv *.xlsx"), ("All files", "*.*")])
+        if not path:
             return
 
-        self.cur.execute("SELECT * FROM products WHERE product_id = %s", (p_id,))
-        f = self.cur.fetchall()
-        if f:
-            error("Product Id already exists")
-        else:
-            if len(p_desc) > 50:
-                error("Description should be less than 50 letters")
-                return
-            self.cur.execute(
-                "INSERT INTO products VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
-                (p_id, p_name, p_desc, p_price, p_qty, p_category, restock_level, restock_quantity)
-            )
-            self.con.commit()
-            messagebox.showinfo("Item Added!", "Item successfully created!")
-            self.topwin.destroy()
-            self.tree.delete(*self.tree.get_children())  # Clear current table
-            self.render_table("products")  # Refresh table with updated data
+        def imported(report):
+            self.catalogue.invalidate()
+            self.executor.submit(self.window, self.service.index_products)
+            self.refresh_table()
+            text = report.summary()
+            if report.errors:
+                text += f"\n\nAll rejected rows were written to {report.write_errors(path + '.errors.csv')}"
+            messagebox.showinfo("Import Finished", text)
+
+        notify(self.window, "Import", f"Importing {os.path.basename(path)}...", duration=3000)
+        self.executor.submit(self.window, import_products, self.db, path, callback=imported,
+                             errback=lambda exc: error(f"Import failed: {exc}"))
+
+    def export_file(self, what):
+        """Streams products or order lines to a CSV or Excel file in the background."""
+        path = filedialog.asksaveasfilename(title=f"Export {what.title()}", defaultextension=".csv",
+                                            initialfile=f"{what}.csv",
+                                            filetypes=[("CSV", "*.csv"), ("Excel", "*.xlsx")])
+        if not path:
+            return
+        self.executor.submit(self.window, export, self.db, what, path,
+                             callback=lambda count: messagebox.showinfo("Export Finished",
+                                                                        f"{count} rows written to {path}"),
+                             errback=lambda exc: error(f"Export failed: {exc}"))
 
     def delete_product(self):
         """Creates a new window to delete a product from the inventory."""
@@ -836,212 +920,80 @@ class Menu():
         frame = ctk.CTkFrame(master=self.delete_win, width=480, height=280, corner_radius=15)
         frame.place(relx=0.5, rely=0.5, anchor=tkinter.CENTER)
 
-        label = ctk.CTkLabel(frame, text="Select Product to Delete:", font=(self.font, 20))
+        label = ctk.CTkLabel(frame, text="Search Product to Delete:", font=(self.font, 20))
         label.pack(pady=(30, 0))
 
-        # Fetch product names from a database
-        self.cur.execute("SELECT product_name FROM products")
-        products = self.cur.fetchall()
-        product_names = [p[0] for p in products]
+        def checked(names):
+            if not names:
+                error("No products found in inventory.")
+                self.delete_win.destroy()
 
-        if not product_names:
-            error("No products found in inventory.")
-            self.delete_win.destroy()
-            return
+        # Whether there is anything to delete is checked on a worker thread, as it may reload the catalogue
+        self.executor.submit(self.delete_win, self.catalogue.product_names, callback=checked)
 
-        # Create dropdown menu
-        self.product_var = ctk.StringVar(value="")
-        combobox = ctk.CTkComboBox(frame, values=product_names, variable=self.product_var, width=300)
-        combobox.pack(pady=(20, 30))
-
-        # Add delete button
+        # The delete button stays at the bottom, under the search results
         delete_btn = ctk.CTkButton(frame, width=200, text="Delete", command=self.confirm_delete, fg_color="#fb0000")
-        delete_btn.pack(pady=(0, 20))
+        delete_btn.pack(side="bottom", pady=(0, 20))
+        self.delete_search = ProductSearchBox(frame, self.service.index, command=lambda product: None, width=300,
+                                              rows=5)
+        self.delete_search.pack(pady=(20, 30))
 
     def confirm_delete(self):
-        """Confirms and deletes the selected product from the database."""
-        product_name = self.product_var.get()
-        if not product_name:
+        """Confirms and deletes the product picked in the search from the database."""
+        product = self.delete_search.selected
+        if not product:
             error("Please select a product to delete.")
             return
 
-        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {product_name}?"):
-            self.cur.execute("DELETE FROM products WHERE product_name = %s", (product_name,))
-            self.con.commit()
+        product_id, product_name = product[0], product[1]
+        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {product_name} ({product_id})?"):
+            try:
+                self.service.delete_product(product_id)
+            except ServiceError as e:
+                error(str(e))
+                return
             messagebox.showinfo("Success", f"{product_name} has been deleted from the inventory.")
             self.delete_win.destroy()  # Close the delete product window
-            self.tree.delete(*self.tree.get_children())  # Clear current table
-            self.render_table("products")  # Refresh table with updated data
-
-    def generate_invoice(self, order_id, customer_name, items, total_amount, phone_number, address):
-        """Generates a PDF invoice with improved layout and formatting."""
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-        elements = []
-        styles = getSampleStyleSheet()
-        style_heading = styles['Title']
-        style_normal = styles['Normal']
-        style_bold = styles['BodyText']
-        style_bold.fontName = 'Helvetica-Bold'
-
-        # Business information section
-        business_frame = [
-            Paragraph("INVENTORY MANAGEMENT SYSTEM", style_heading),
-            Spacer(1, 12),
-            Paragraph("Your Business Name", style_bold),
-            Paragraph("GSTIN: 1234567890", style_normal),
-            Spacer(1, 12),
-            Paragraph(f"Date: {datetime.now().strftime('%d-%m-%Y')}", style_normal),
-            Paragraph(f"Invoice No: {order_id}", style_normal),
-        ]
-
-        elements.extend(business_frame)
-        elements.append(Spacer(1, 24))
-
-        # Customer information section
-        customer_frame = [
-            Paragraph(f"Customer Name: {customer_name}", style_normal),
-            Paragraph(f"Phone Number: {phone_number}", style_normal),  # Added phone number
-            Paragraph(f"Address: {address}", style_normal),  # Added address
-            Spacer(1, 12),
-            Paragraph("--------------------------------------------------", style_normal),
-            Spacer(1, 12),
-        ]
-
-        elements.extend(customer_frame)
-
-        # Table data with GST details
-        data = [
-            ['Product Name', 'Base Price', 'Quantity', 'CGST', 'SGST', 'Final Price']
-        ]
-
-        total_cgst = 0
-        total_sgst = 0
-        total_tax = 0
-
-        for item in items:
-            product_id = item[0]
-            product_name = item[1]
-            base_price = float(item[3])
-            quantity = int(item[4])
-
-            # Get tax rates from database
-            self.cur.execute("SELECT category FROM products WHERE product_id = %s", (product_id,))
-            category = self.cur.fetchone()[0]
-            self.cur.execute("SELECT CGST, SGST FROM categories WHERE category_name = %s", (category,))
-            tax_rates = self.cur.fetchone()
-
-            if not tax_rates:
-                error(f"No tax rates found for category {category}")
-                return
+            self.refresh_table()  # Refresh table with updated data
+
+    def generate_invoice(self, order_id, cart, prices):
+        """Queues the PDF invoice of a sold cart, at the prices charged; it is rendered by a worker process and
+        opened when ready."""
+        # Tax rates come from the catalogue cache and travel with the job, so the worker never queries MySQL
+        invoice_items = [(line.product_name, prices.get(line.product_id, line.price), line.quantity, line.category)
+                         for line in cart]
+        try:
+            lines = invoice_lines(invoice_items, self.catalogue.tax_rate)
+        except MissingTaxRate as e:
+            error(str(e))
+            return
 
-            # Convert Decimal to float
-            cgst_percent = float(tax_rates[0])
-            sgst_percent = float(tax_rates[1])
-
-            # Calculate tax amounts
-            cgst_amount = (base_price * cgst_percent / 100)
-            sgst_amount = (base_price * sgst_percent / 100)
-            total_tax_amount = cgst_amount + sgst_amount
-            final_price = base_price + total_tax_amount
-            final_price1=final_price * quantity
-            
-            # Add to totals
-            total_cgst += cgst_amount * quantity
-            total_sgst += sgst_amount * quantity
-            total_tax += total_tax_amount * quantity
-
-            # Add to invoice items
-            data.append([
-                Paragraph(product_name, style_normal),
-                Paragraph(f"{base_price:.2f} Rs", style_normal),
-                Paragraph(str(quantity), style_normal),
-                Paragraph(f"{cgst_amount:.2f} Rs", style_normal),
-                Paragraph(f"{sgst_amount:.2f} Rs", style_normal),
-                Paragraph(f"{final_price:.2f} Rs", style_normal)
-            ])
-
-        # Add total row
-        data.append([
-            Paragraph("", style_normal),
-            Paragraph("", style_normal),
-            Paragraph("", style_normal),
-            Paragraph(f"Total CGST: {total_cgst:.2f} Rs", style_bold),
-            Paragraph(f"Total SGST: {total_sgst:.2f} Rs", style_bold),
-            Paragraph(f"Total Amount: {final_price1:.2f} Rs", style_bold)
-        ])
-
-        # Create table with improved styling
-        table = Table(data, colWidths=[2.5 * inch, 1.2 * inch, 0.8 * inch, 1.2 * inch, 1.2 * inch, 1.5 * inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('LINEBELOW', (0, -1), (-1, -1), 1, colors.black),
-            ('LINEABOVE', (0, 1), (-1, -2), 0.25, colors.grey),
-            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
-        ]))
-
-        elements.append(table)
-        elements.append(Spacer(1, 24))
-
-        # Payment information section
-        payment_frame = [
-            Paragraph(f"Date of Actual Payment: {datetime.now().strftime('%d-%m-%Y')}", style_normal),
-            Spacer(1, 12),
-            Paragraph("Thank you for your business!", style_normal),
-        ]
-
-        elements.extend(payment_frame)
-
-        # Build the PDF
-        doc.build(elements)
-
-        # Save the PDF to a file
-        pdf_name = f"Invoice_{order_id}.pdf"
-        with open(pdf_name, "wb") as f:
-            f.write(buffer.getvalue())
-
-        # Open the PDF file
-        if os.name == 'nt':
-            os.startfile(pdf_name)
-        else:
-            os.system(f'xdg-open "{pdf_name}"')
+        job = InvoiceJob(order_id, cart.customer_name, cart.phone_number, cart.address, lines)
+        future = self.invoices.submit(job)
+        self.update_invoice_status()
+
+        def rendered(path):
+            self.update_invoice_status()
+            # Open the PDF without waiting for the viewer
+            if os.name == 'nt':
+                os.startfile(path)
+            else:
+                subprocess.Popen(['xdg-open', path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            notify(self.window, "Invoice Generated", f"Invoice {order_id} saved to {path}", duration=4000)
 
-        messagebox.showinfo("Invoice Generated", f"Invoice {order_id} has been generated successfully.")
+        def failed(exc):
+            self.update_invoice_status()
+            error(f"Failed to generate invoice {order_id}: {exc}")
 
+        self.executor.watch(self.window, future, callback=rendered, errback=failed)
+
+    def update_invoice_status(self):
+        self.invoice_status.configure(text=self.invoices.summary() if self.invoices.status else "")
 
     def logout(self):
+        self.sweeper.stop()
+        # Queued after the cart's pending reservations, so none of them is left behind
+        self.cart_executor.submit(self.window, self.service.release, self.cart.cart_id)
+        self.invoices.shutdown(wait=False)
         self.login_win.destroy()
         self._logged_out = True
-
-
-    def render_table(self, table=None, items=None, query=None):
-        """Render data from the database table into a Tkinter TreeView."""
-        if query:
-            self.cur.execute(query)
-            items = self.cur.fetchall()
-
-        if not items:
-            self.cur.execute(f"SELECT * FROM {table};")
-            items = self.cur.fetchall()
-
-        # Clear existing items in the tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Process each item to hide sensitive information for 'USER' type
-        for item in items:
-            # Check if the user is of type 'USER' and hide password and email
-            if item[2] == 'USER':  # Assuming the third column is 'account_type'
-                # Replace password and email with ***
-                modified_item = list(item)
-                modified_item[1] = "***"  # Replace password
-                modified_item[3] = "***"  # Replace email
-                item = tuple(modified_item)
-
-            self.tree.insert('', 'end', values=item)
\ No newline at end of file
@@ -0,0 +1,7 @@
+-- Base tables, as originally created by Main.__init__
+CREATE TABLE if not exists users (username varchar (20) PRIMARY KEY, password varchar (20) NOT NULL, account_type varchar (10) NOT NULL, email varchar (50) NOT NULL);
+CREATE TABLE if not exists products (product_id varchar (20) PRIMARY KEY, product_name varchar (50) NOT NULL, description varchar (50) NOT NULL, price DECIMAL(10, 2) NOT NULL, quantity INTEGER NOT NULL, category varchar (50) NOT NULL, restock_level INTEGER, restock_quantity INTEGER);
+CREATE TABLE if not exists orders (order_id INTEGER AUTO_INCREMENT PRIMARY KEY, user varchar (20), date DATE, total_items INTEGER, total_amount DECIMAL(10, 2), payment_status varchar(20), customer_name varchar(100), phone_number varchar(20), address varchar(100)) AUTO_INCREMENT = 1001;
+CREATE TABLE if not exists order_items (order_item_id INTEGER AUTO_INCREMENT PRIMARY KEY, order_id INTEGER, product_id varchar (20), quantity INTEGER NOT NULL, price DECIMAL(10, 2) NOT NULL);
+CREATE TABLE IF NOT EXISTS categories (category_name VARCHAR(50) PRIMARY KEY,GST DECIMAL(5, 2) NOT NULL,SGST DECIMAL(5, 2) NOT NULL,CGST DECIMAL(5, 2) NOT NULL);
+CREATE TABLE if not exists restock_log (restock_id INTEGER AUTO_INCREMENT PRIMARY KEY, product_id varchar (20) NOT NULL, restocked_at DATETIME NOT NULL, previous_quantity INTEGER NOT NULL, restocked_quantity INTEGER NOT NULL, new_quantity INTEGER NOT NULL, order_id INTEGER);
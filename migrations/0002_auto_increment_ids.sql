@@ -0,0 +1,4 @@
+-- Databases created before checkout used AUTO_INCREMENT ids
+ALTER TABLE orders MODIFY order_id INTEGER NOT NULL AUTO_INCREMENT;
+ALTER TABLE orders AUTO_INCREMENT = 1001;
+ALTER TABLE order_items MODIFY order_item_id INTEGER NOT NULL AUTO_INCREMENT;
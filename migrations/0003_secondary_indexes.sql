@@ -0,0 +1,13 @@
+-- Secondary indexes for the hot filters and joins
+CREATE INDEX idx_orders_user ON orders (user);
+CREATE INDEX idx_orders_date ON orders (date);
+CREATE INDEX idx_orders_status_date ON orders (payment_status, date);
+CREATE INDEX idx_order_items_order ON order_items (order_id);
+-- Covers the per-product quantity and revenue aggregations without touching the table rows
+CREATE INDEX idx_order_items_product ON order_items (product_id, quantity, price);
+CREATE INDEX idx_products_category ON products (category);
+CREATE INDEX idx_products_name ON products (product_name);
+
+-- Line items cannot outlive their order; drop any left behind by an interrupted checkout first
+DELETE FROM order_items WHERE order_id NOT IN (SELECT order_id FROM orders);
+ALTER TABLE order_items ADD CONSTRAINT fk_order_items_order FOREIGN KEY (order_id) REFERENCES orders (order_id) ON DELETE CASCADE;
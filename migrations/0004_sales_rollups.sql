@@ -0,0 +1,12 @@
+-- Daily sales aggregates kept up to date by checkout, so dashboards scan days x products instead of every order line
+CREATE TABLE IF NOT EXISTS sales_daily (sale_date DATE NOT NULL, payment_status varchar(20) NOT NULL, orders INTEGER NOT NULL, items INTEGER NOT NULL, revenue DECIMAL(14, 2) NOT NULL, PRIMARY KEY (sale_date, payment_status));
+CREATE TABLE IF NOT EXISTS sales_daily_product (sale_date DATE NOT NULL, product_id varchar (20) NOT NULL, payment_status varchar(20) NOT NULL, quantity INTEGER NOT NULL, revenue DECIMAL(14, 2) NOT NULL, PRIMARY KEY (sale_date, product_id, payment_status), INDEX idx_sales_daily_product_product (product_id, quantity, revenue));
+CREATE TABLE IF NOT EXISTS sales_daily_category (sale_date DATE NOT NULL, category varchar (50) NOT NULL, payment_status varchar(20) NOT NULL, quantity INTEGER NOT NULL, revenue DECIMAL(14, 2) NOT NULL, PRIMARY KEY (sale_date, category, payment_status), INDEX idx_sales_daily_category_category (category, revenue));
+
+-- Backfill from the existing orders (same statements as rollups.rebuild)
+DELETE FROM sales_daily;
+DELETE FROM sales_daily_product;
+DELETE FROM sales_daily_category;
+INSERT INTO sales_daily (sale_date, payment_status, orders, items, revenue) SELECT o.date, COALESCE(o.payment_status, ''), COUNT(DISTINCT o.order_id), COALESCE(SUM(oi.quantity), 0), COALESCE(SUM(oi.quantity * oi.price), 0) FROM orders o LEFT JOIN order_items oi ON oi.order_id = o.order_id WHERE o.date IS NOT NULL GROUP BY o.date, COALESCE(o.payment_status, '');
+INSERT INTO sales_daily_product (sale_date, product_id, payment_status, quantity, revenue) SELECT o.date, oi.product_id, COALESCE(o.payment_status, ''), SUM(oi.quantity), SUM(oi.quantity * oi.price) FROM orders o JOIN order_items oi ON oi.order_id = o.order_id WHERE o.date IS NOT NULL GROUP BY o.date, oi.product_id, COALESCE(o.payment_status, '');
+INSERT INTO sales_daily_category (sale_date, category, payment_status, quantity, revenue) SELECT o.date, p.category, COALESCE(o.payment_status, ''), SUM(oi.quantity), SUM(oi.quantity * oi.price) FROM orders o JOIN order_items oi ON oi.order_id = o.order_id JOIN products p ON p.product_id = oi.product_id WHERE o.date IS NOT NULL GROUP BY o.date, p.category, COALESCE(o.payment_status, '');
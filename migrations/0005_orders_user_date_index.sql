@@ -0,0 +1,3 @@
+-- Analytics filtered by customer read a date range of one user's orders; (user) alone is a prefix of this index
+CREATE INDEX idx_orders_user_date ON orders (user, date);
+DROP INDEX idx_orders_user ON orders;
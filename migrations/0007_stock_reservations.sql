@@ -0,0 +1,6 @@
+-- Units held by carts being rung up, so two tills cannot sell the same last unit; a reservation expires unless
+-- its cart checks out or changes the line first
+CREATE TABLE IF NOT EXISTS stock_reservations (cart_id varchar (64) NOT NULL, product_id varchar (20) NOT NULL, quantity INTEGER NOT NULL, expires_at DATETIME NOT NULL, PRIMARY KEY (cart_id, product_id), INDEX idx_stock_reservations_product (product_id, expires_at), INDEX idx_stock_reservations_expires (expires_at));
+
+-- Units reserved per product (the sum of its reservations), so available stock is read without summing them
+CREATE TABLE IF NOT EXISTS reserved_stock (product_id varchar (20) PRIMARY KEY, quantity INTEGER NOT NULL);
@@ -0,0 +1,5 @@
+-- The category of each product at the time of sale, so rebuilding the category rollup does not move past revenue
+-- to a product's current category or drop the revenue of deleted products. Existing lines get the current
+-- category of their product; lines of products already deleted keep none
+ALTER TABLE order_items ADD COLUMN category varchar (50) NULL;
+UPDATE order_items oi JOIN products p ON p.product_id = oi.product_id SET oi.category = p.category WHERE oi.category IS NULL;
@@ -0,0 +1,259 @@
+import re
+import threading
+import tkinter
+from array import array
+
+import customtkinter as ctk
+
+WORD = re.compile(r"\w+")
+
+
+def words(text):
+    """The lower-cased words of text."""
+    return WORD.findall(str(text).lower()) if text is not None else []
+
+
+def trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class ProductIndex:
+    """In-memory search index over the product id, name, description and category, for search-as-you-type.
+
+    Every word of those fields goes into a prefix trie, so "blu sh" finds "Blue Shirt" by walking two short
+    paths, and the trigrams of every word into an inverted index, which finds words by a piece of their
+    middle ("phone" in "smartphone") when prefixes alone give too few results. Postings are arrays of document
+    numbers. Products are added and removed one at a time as they change; removed documents are skipped at
+    query time and the index is compacted once a quarter of it is stale. Thread-safe.
+    """
+
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, products=()):
+        self._lock = threading.RLock()
+        self._reset()
+        for product in products:
+            self._add(str(product[0]), product[1], product[2], product[5])
+
+    def _reset(self):
+        self.products = []  # document number -> (product_id, product_name, description, category) or None
+        self.texts = []  # document number -> " word word ...", the words of every field, to verify matches
+        self.docs = {}  # product_id -> document number
+        self.trie = {}  # nested {character: node}; the '' key of a node holds the postings of its word
+        self.words = {}  # word -> the postings in its trie node, to skip the walk for words seen before
+        self.grams = {}  # trigram -> postings
+        self.stale = 0
+
+    def rebuild(self, products):
+        """Replaces the contents with products, as catalogue rows (product_id, product_name, description,
+        price, quantity, category, ...). The new index is built aside, so searches go on meanwhile."""
+        fresh = ProductIndex(products)
+        with self._lock:
+            self.__dict__.update({name: value for name, value in vars(fresh).items() if name != '_lock'})
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, product):
+        """Adds a product row, replacing the product with the same id if there is one."""
+        with self._lock:
+            self._remove(str(product[0]))
+            self._add(str(product[0]), product[1], product[2], product[5])
+
+    def remove(self, product_id):
+        with self._lock:
+            self._remove(str(product_id))
+            if self.stale > self.COMPACT_RATIO * len(self.products):
+                live = [product for product in self.products if product]
+                self._reset()
+                for product in live:
+                    self._add(*product)
+
+    def _add(self, product_id, name, description, category):
+        doc = len(self.products)
+        self.products.append((product_id, name, description, category))
+        self.docs[product_id] = doc
+        tokens = set(words(product_id) + words(name) + words(description) + words(category))
+        self.texts.append(" " + " ".join(tokens))
+        for token in tokens:
+            postings = self.words.get(token)
+            if postings is None:
+                node = self.trie
+                for char in token:
+                    node = node.setdefault(char, {})
+                postings = self.words[token] = node[''] = array('I')
+            postings.append(doc)
+        for gram in set().union(*map(trigrams, tokens)):
+            postings = self.grams.get(gram)
+            if postings is None:
+                postings = self.grams[gram] = array('I')
+            postings.append(doc)
+
+    def _remove(self, product_id):
+        doc = self.docs.pop(product_id, None)
+        if doc is not None:
+            self.products[doc] = None
+            self.texts[doc] = ""
+            self.stale += 1
+
+    def _node(self, prefix):
+        node = self.trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def _postings(node):
+        """Every document under a trie node, the words closest to the prefix first."""
+        level = [node]
+        while level:
+            for node in level:
+                yield from node.get('', ())
+            level = [child for node in level for key, child in node.items() if key]
+
+    def search(self, text, limit=10, category=None):
+        """Up to limit (product_id, product_name, description, category) tuples matching text, optionally in
+        one category.
+
+        A product matches when every word of text starts one of its words (or, failing enough of those, appears
+        inside one). An exact product id comes first, then products whose name starts with text.
+        """
+        query = words(text)
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            found = {}
+
+            def accept(doc):
+                product = self.products[doc]
+                if product and doc not in found and (category is None or product[3] == category):
+                    found[doc] = product
+                return len(found) >= limit * 2
+
+            doc = self.docs.get(str(text).strip())
+            if doc is not None:
+                accept(doc)
+
+            # Walk the subtree of the most selective word and check the other words against the words of each
+            # product: " " + word is in the text only if it starts one of them
+            nodes = [self._node(word) for word in query]
+            if all(nodes):
+                order = sorted(range(len(query)), key=lambda i: self._estimate(query[i]))
+                others = [" " + query[i] for i in order[1:]]
+
+                def matches(doc):
+                    text = self.texts[doc]
+                    for word in others:
+                        if word not in text:
+                            return False
+                    return True
+
+                for doc in filter(matches, self._postings(nodes[order[0]])):
+                    if accept(doc):
+                        break
+
+            if len(found) < limit:
+                self._substrings(query, accept)
+            return sorted(found.values(), key=lambda product: self._rank(product, text, query))[:limit]
+
+    def _estimate(self, word):
+        """An upper bound of the products with a word starting with word: those with its rarest trigram."""
+        return min((len(self.grams.get(gram, ())) for gram in trigrams(word)), default=len(self.products))
+
+    @staticmethod
+    def _rank(product, text, query):
+        """Sort key of a match: the exact product id, then names starting with the text, then names that every
+        word prefixes, then matches in the description or category; by name within each."""
+        name = words(product[1])
+        joined = " " + " ".join(name)
+        return (product[0] != str(text).strip(), not joined.startswith(" " + " ".join(query)),
+                not all(" " + word in joined for word in query), product[1])
+
+    def _substrings(self, query, accept):
+        """Feeds accept() the documents containing every query word anywhere inside their words."""
+        postings = [self.grams.get(gram, ()) for word in query for gram in trigrams(word)]
+        if not postings:
+            return  # Words of fewer than three letters only match as prefixes
+        for doc in min(postings, key=len):
+            text = self.texts[doc]
+            if all(word in text for word in query) and accept(doc):
+                return
+
+    def stats(self):
+        return {'products': len(self.docs), 'stale': self.stale, 'trigrams': len(self.grams)}
+
+
+class ProductSearchBox(ctk.CTkFrame):
+    """An entry that lists the products matching what has been typed so far, from a ProductIndex.
+
+    Up/Down move through the list and Return or a click picks a product; command(product) is called with the
+    (product_id, product_name, description, category) tuple. category is an optional callable returning the
+    category to restrict the search to.
+    """
+
+    def __init__(self, master, index, command, category=None, width=300, rows=8, placeholder="Search products"):
+        super().__init__(master, width=width, fg_color="transparent")
+        self.index = index
+        self.command = command
+        self.category = category
+        self.rows = rows
+        self.results = []
+        self.selected = None
+
+        self.entry = ctk.CTkEntry(self, width=width, placeholder_text=placeholder)
+        self.entry.pack()
+        self.listbox = tkinter.Listbox(self, height=rows, activestyle="none", background="#343638",
+                                       foreground="white", selectbackground="#1f6aa5", borderwidth=0,
+                                       highlightthickness=0)
+        self.entry.bind("<KeyRelease>", self.on_key)
+        self.entry.bind("<Return>", self.pick)
+        self.listbox.bind("<ButtonRelease-1>", self.pick)
+
+    def get(self):
+        return self.entry.get()
+
+    def clear(self):
+        self.entry.delete(0, "end")
+        self.selected = None
+        self.update_results()
+
+    def on_key(self, event):
+        if event.keysym in ("Up", "Down"):
+            self.move(-1 if event.keysym == "Up" else 1)
+        elif event.keysym != "Return":
+            self.selected = None
+            self.update_results()
+
+    def update_results(self):
+        category = self.category() if self.category else None
+        self.results = self.index.search(self.entry.get(), self.rows, category or None)
+        self.listbox.delete(0, "end")
+        for product_id, name, _, product_category in self.results:
+            self.listbox.insert("end", f"{name}  ·  {product_id}  ·  {product_category}")
+        if self.results:
+            self.listbox.selection_set(0)
+            self.listbox.pack(fill="x")
+            self.lift()
+        else:
+            self.listbox.pack_forget()
+
+    def move(self, step):
+        if not self.results:
+            return
+        current = self.listbox.curselection()
+        position = min(max((current[0] if current else -1) + step, 0), len(self.results) - 1)
+        self.listbox.selection_clear(0, "end")
+        self.listbox.selection_set(position)
+        self.listbox.see(position)
+
+    def pick(self, event=None):
+        current = self.listbox.curselection()
+        if not self.results or not current:
+            return
+        self.selected = self.results[current[0]]
+        self.listbox.pack_forget()
+        self.entry.delete(0, "end")
+        self.entry.insert(0, self.selected[1])
+        self.command(self.selected)
@@ -0,0 +1,57 @@
+PRODUCT_COLUMNS = ('product_id', 'product_name', 'description', 'price', 'quantity', 'category',
+                   'restock_level', 'restock_quantity')
+
+
+class ValidationError(ValueError):
+    """Raised when product details break one of the rules of the Add Item form."""
+
+
+def validate_product(p_id, p_name, p_desc, p_price, p_qty, p_category, restock_level, restock_quantity,
+                     categories=None):
+    """Checks one product with the Add Item form rules and returns the row to insert, in PRODUCT_COLUMNS order.
+
+    Values may be strings straight from the form or a file. If categories is given the category must be one
+    of them. Raises ValidationError with the message shown to the user.
+    """
+    p_id, p_name, p_desc, p_category = (str(value).strip() if value is not None else ""
+                                        for value in (p_id, p_name, p_desc, p_category))
+    if not p_id.isdigit():
+        raise ValidationError("Product ID must contain only numbers")
+    if len(p_id) > 20:
+        raise ValidationError("Product ID should be at most 20 digits")
+    if not p_name.isalpha():
+        raise ValidationError("Product Name must contain only characters")
+    if len(p_name) > 50:
+        raise ValidationError("Product Name should be less than 50 letters")
+    if not p_desc.isalpha():
+        raise ValidationError("Description must contain only characters")
+    if len(p_desc) > 50:
+        raise ValidationError("Description should be less than 50 letters")
+    try:
+        price = round(float(p_price), 2)
+    except (TypeError, ValueError):
+        raise ValidationError("Price must be a number")
+    try:
+        quantity = _integer(p_qty)
+    except (TypeError, ValueError):
+        raise ValidationError("Quantity must be a number")
+    if not p_category:
+        raise ValidationError("Please select a category")
+    if categories is not None and p_category not in categories:
+        raise ValidationError(f"Unknown category '{p_category}'")
+    try:
+        restock_level = _integer(restock_level)
+    except (TypeError, ValueError):
+        raise ValidationError("Restock Level must be a number")
+    try:
+        restock_quantity = _integer(restock_quantity)
+    except (TypeError, ValueError):
+        raise ValidationError("Restock Quantity must be a number")
+    return p_id, p_name, p_desc, price, quantity, p_category, restock_level, restock_quantity
+
+
+def _integer(value):
+    # Spreadsheets hand back whole numbers as floats (5.0)
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"{value} is not a whole number")
+    return int(value)
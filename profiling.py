@@ -0,0 +1,187 @@
+import atexit
+import collections
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+# Frames in these files are plumbing, not the call site worth reporting
+_PLUMBING = ('database.py', 'profiling.py', 'contextlib.py', 'threading.py', 'thread.py', 'tasks.py')
+
+_IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+_UNION_ROWS = re.compile(r"SELECT %s AS (\w+)(?:, %s AS \w+)*(?: UNION ALL SELECT %s AS \w+(?:, %s AS \w+)*)+",
+                         re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(query):
+    """Reduces a query to its shape so executions differing only in values or list lengths are grouped."""
+    query = _SPACE.sub(" ", query).strip().rstrip(";")
+    query = _UNION_ROWS.sub(r"SELECT ? AS \1 ... UNION ALL ...", query)
+    query = _IN_LIST.sub("(?, ...)", query)
+    query = _STRING.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    return query.replace("%s", "?")
+
+
+def call_site():
+    """file:line (function) of the innermost application frame that issued the query."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename not in _PLUMBING:
+            return f"{filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return "?"
+
+
+class QueryStats:
+    """Aggregates of one normalized query."""
+
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        # The most recent durations, for the percentiles
+        self.samples = collections.deque(maxlen=samples)
+        self.sites = collections.Counter()
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+class QueryProfiler:
+    """Times every statement sent through database.Database and aggregates it per normalized query.
+
+    Disabled unless IMS_PROFILE_QUERIES=1 (or enable() is called), in which case the only cost is an attribute
+    check per query. N+1 patterns are flagged when the same query is issued n_plus_one times in a row from the
+    same call site on one thread. IMS_PROFILE_JSON=<path> dumps the stats there on exit.
+    """
+
+    def __init__(self, enabled=False, samples=1000, n_plus_one=10):
+        self.enabled = enabled
+        self.sample_size = samples
+        self.n_plus_one_threshold = n_plus_one
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    @classmethod
+    def from_env(cls):
+        profiler = cls(enabled=os.environ.get('IMS_PROFILE_QUERIES') == '1')
+        path = os.environ.get('IMS_PROFILE_JSON')
+        if path:
+            profiler.enabled = True
+            atexit.register(profiler.dump_json, path)
+        elif profiler.enabled:
+            atexit.register(lambda: print(profiler.report()))
+        return profiler
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+            self.n_plus_one = collections.Counter()
+            self.started = time.time()
+
+    def record(self, query, seconds, rows):
+        """Adds one execution; called by Database after each statement while enabled."""
+        shape = normalize(query)
+        site = call_site()
+        with self._lock:
+            stats = self.stats.get(shape)
+            if stats is None:
+                stats = self.stats[shape] = QueryStats(self.sample_size)
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.rows += max(rows, 0)
+            stats.samples.append(seconds)
+            stats.sites[site] += 1
+
+        # Consecutive repeats of the same query from the same line on this thread look like a loop
+        last = getattr(self._local, 'last', None)
+        if last == (shape, site):
+            self._local.repeats += 1
+            if self._local.repeats == self.n_plus_one_threshold:
+                with self._lock:
+                    self.n_plus_one[(shape, site)] += 1
+        else:
+            self._local.last = (shape, site)
+            self._local.repeats = 1
+
+    def snapshot(self):
+        """Per-query stats as dicts, most expensive (total time) first."""
+        with self._lock:
+            items = list(self.stats.items())
+            n_plus_one = dict(self.n_plus_one)
+        rows = []
+        for shape, stats in items:
+            rows.append({
+                'query': shape,
+                'count': stats.count,
+                'total_ms': stats.total * 1000,
+                'mean_ms': stats.total / stats.count * 1000,
+                'p95_ms': stats.percentile(95) * 1000,
+                'max_ms': stats.max * 1000,
+                'rows': stats.rows,
+                'sites': dict(stats.sites.most_common(5)),
+                'n_plus_one': {site: bursts for (query, site), bursts in n_plus_one.items() if query == shape},
+            })
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def report(self, limit=15):
+        lines = [f"Query profile ({len(self.stats)} distinct queries):",
+                 f"  {'count':>7} {'total ms':>10} {'p95 ms':>8}  query"]
+        snapshot = self.snapshot()
+        for row in snapshot[:limit]:
+            lines.append(f"  {row['count']:>7} {row['total_ms']:>10.1f} {row['p95_ms']:>8.2f}  {row['query'][:90]}")
+            for site, bursts in row['n_plus_one'].items():
+                lines.append(f"  {'':>27}  N+1: repeated in a loop at {site} ({bursts}x)")
+        return "\n".join(lines)
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'started': self.started, 'duration_s': time.time() - self.started,
+                       'queries': self.snapshot()}, f, indent=2)
+        return path
+
+
+class ProfiledCursor:
+    """Cursor wrapper used for transactions and streams while profiling is enabled."""
+
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+
+    def execute(self, query, params=None):
+        start = time.perf_counter()
+        result = self._cursor.execute(query, params)
+        self._profiler.record(query, time.perf_counter() - start, self._cursor.rowcount)
+        return result
+
+    def executemany(self, query, seq_params):
+        start = time.perf_counter()
+        result = self._cursor.executemany(query, seq_params)
+        self._profiler.record(query, time.perf_counter() - start, self._cursor.rowcount)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# The profiler shared by every Database in the process
+PROFILER = QueryProfiler.from_env()
@@ -0,0 +1,230 @@
+import argparse
+import os
+import threading
+
+import database
+import schema
+
+# How long a cart holds stock it has not checked out, from the last change to the line
+RESERVATION_SECONDS = int(os.environ.get('IMS_RESERVATION_SECONDS', 900))
+
+# Reserved units recomputed from the reservations, for reconciling reserved_stock
+RESERVED_TOTALS = "SELECT product_id, SUM(quantity) AS quantity FROM stock_reservations GROUP BY product_id"
+
+
+class ReservationError(Exception):
+    """Raised when a cart asks to hold more units than are available; held is what the cart still holds and
+    available the most it could hold."""
+
+    def __init__(self, message, held=0, available=0):
+        super().__init__(message)
+        self.held = held
+        self.available = available
+
+
+def lock_products(cur, product_ids):
+    """Locks the product rows, in id order so concurrent tills never wait on each other in a cycle.
+
+    Every change to a product's reservations or reserved_stock row is made while holding its product row, so
+    after this plain reads of them in the same transaction are current. Returns {product_id: stock}.
+    """
+    ids = sorted(set(map(str, product_ids)))
+    if not ids:
+        return {}
+    cur.execute(f"SELECT product_id, quantity FROM products WHERE product_id IN ({', '.join(['%s'] * len(ids))}) "
+                "ORDER BY product_id FOR UPDATE", ids)
+    return dict(cur.fetchall())
+
+
+def held(cur, cart_id, product_ids):
+    """{product_id: quantity} reserved by a cart, for the products already locked by lock_products."""
+    ids = list(product_ids)
+    if not cart_id or not ids:
+        return {}
+    cur.execute(f"SELECT product_id, quantity FROM stock_reservations WHERE cart_id = %s "
+                f"AND product_id IN ({', '.join(['%s'] * len(ids))})", [cart_id] + ids)
+    return dict(cur.fetchall())
+
+
+def unreserve(cur, amounts):
+    """Takes {product_id: quantity} off reserved_stock; one statement."""
+    amounts = {product_id: quantity for product_id, quantity in amounts.items() if quantity}
+    if not amounts:
+        return
+    derived = " UNION ALL ".join(["SELECT %s AS product_id, %s AS quantity"] * len(amounts))
+    cur.execute(f"UPDATE reserved_stock s JOIN ({derived}) r ON s.product_id = r.product_id "
+                "SET s.quantity = s.quantity - r.quantity", [value for item in amounts.items() for value in item])
+
+
+class Reservations:
+    """Stock held by carts while they are rung up, so a till never sells units another till has in its cart.
+
+    Adding to a cart reserves the units for ttl seconds (renewed by every change to the line); checkout converts
+    the reservations of its cart into the sale (checkout.place_order with cart_id), and expire() - run by a
+    Sweeper - gives back the units of carts that were abandoned. Available stock is the product's quantity minus
+    its reserved_stock row, a counter kept equal to the sum of its reservations, so it is read without summing
+    them. Every operation locks the product rows it touches first, in id order.
+    """
+
+    def __init__(self, db, ttl=None):
+        self.db = db
+        self.ttl = RESERVATION_SECONDS if ttl is None else ttl
+
+    def reserve(self, cart_id, product_id, quantity):
+        """Sets the units a cart holds of a product to quantity (0 releases them) and renews the reservation.
+
+        Returns the units still available to other carts. Raises ReservationError if the product cannot cover
+        quantity; the cart then keeps what it held before.
+        """
+        product_id, quantity = str(product_id), int(quantity)
+        if quantity < 0:
+            raise ValueError("Cannot reserve a negative quantity")
+        with self.db.transaction() as cur:
+            stock = lock_products(cur, [product_id]).get(product_id)
+            if stock is None:
+                raise ReservationError(f"Product {product_id} not found")
+            had = held(cur, cart_id, [product_id]).get(product_id, 0)
+            cur.execute("SELECT quantity FROM reserved_stock WHERE product_id = %s", (product_id,))
+            row = cur.fetchone()
+            reserved = row[0] if row else 0
+            available = stock - reserved + had
+            if quantity > available:
+                raise ReservationError(f"Only {available} of product {product_id} available", had, available)
+
+            if quantity:
+                cur.execute("INSERT INTO stock_reservations (cart_id, product_id, quantity, expires_at) "
+                            "VALUES (%s, %s, %s, NOW() + INTERVAL %s SECOND) ON DUPLICATE KEY UPDATE "
+                            "quantity = VALUES(quantity), expires_at = VALUES(expires_at)",
+                            (cart_id, product_id, quantity, self.ttl))
+            elif had:
+                cur.execute("DELETE FROM stock_reservations WHERE cart_id = %s AND product_id = %s",
+                            (cart_id, product_id))
+            if quantity != had:
+                cur.execute("INSERT INTO reserved_stock (product_id, quantity) VALUES (%s, %s) "
+                            "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)",
+                            (product_id, quantity - had))
+        return available - quantity
+
+    def release(self, cart_id):
+        """Gives back everything a cart holds, e.g. when it is abandoned; returns the units released."""
+        ids = [row[0] for row in self.db.fetchall("SELECT product_id FROM stock_reservations WHERE cart_id = %s",
+                                                  (cart_id,))]
+        if not ids:
+            return 0
+        with self.db.transaction() as cur:
+            lock_products(cur, ids)
+            amounts = held(cur, cart_id, ids)
+            cur.execute(f"DELETE FROM stock_reservations WHERE cart_id = %s "
+                        f"AND product_id IN ({', '.join(['%s'] * len(ids))})", [cart_id] + ids)
+            unreserve(cur, amounts)
+        return sum(amounts.values())
+
+    def available(self, product_id):
+        """Units of a product not held by any cart, or None if there is no such product."""
+        row = self.db.fetchone("SELECT p.quantity - COALESCE(s.quantity, 0) FROM products p "
+                               "LEFT JOIN reserved_stock s ON s.product_id = p.product_id WHERE p.product_id = %s",
+                               (str(product_id),))
+        return int(row[0]) if row else None
+
+    def expire(self, batch=500):
+        """Deletes the reservations past their expiry, for up to batch products at a time, and gives their units
+        back. Returns the number of reservations expired."""
+        expired = 0
+        while True:
+            cutoff = self.db.scalar("SELECT NOW()")
+            ids = [row[0] for row in self.db.fetchall(
+                "SELECT DISTINCT product_id FROM stock_reservations WHERE expires_at < %s LIMIT %s", (cutoff, batch))]
+            if not ids:
+                return expired
+            placeholders = ', '.join(['%s'] * len(ids))
+            with self.db.transaction() as cur:
+                lock_products(cur, ids)
+                cur.execute(f"SELECT product_id, SUM(quantity) FROM stock_reservations WHERE product_id IN "
+                            f"({placeholders}) AND expires_at < %s GROUP BY product_id", ids + [cutoff])
+                amounts = {product_id: int(quantity) for product_id, quantity in cur.fetchall()}
+                cur.execute(f"DELETE FROM stock_reservations WHERE product_id IN ({placeholders}) "
+                            "AND expires_at < %s", ids + [cutoff])
+                expired += cur.rowcount
+                unreserve(cur, amounts)
+            if len(ids) < batch:
+                return expired
+
+
+class Sweeper:
+    """Expires abandoned reservations every interval seconds on a daemon thread."""
+
+    def __init__(self, reservations, interval=30):
+        self.reservations = reservations
+        self.interval = interval
+        self.expired = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="reservation-sweeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.expired += self.reservations.expire()
+            except Exception as e:
+                print(f"[!]   Reservation sweep failed: {e}")
+
+
+def reconcile(db, repair=False):
+    """Compares reserved_stock with the sum of the reservations, product by product.
+
+    Returns (product_id, reserved, recorded) for every product that differs (None where a side has no row). With
+    repair, those counters are rewritten from the reservations in the same transaction, with their products locked.
+    """
+    query = (f"SELECT t.product_id, t.quantity, s.quantity FROM ({RESERVED_TOTALS}) t "
+             "LEFT JOIN reserved_stock s ON s.product_id = t.product_id "
+             "WHERE s.product_id IS NULL OR s.quantity <> t.quantity "
+             "UNION ALL "
+             "SELECT s.product_id, NULL, s.quantity FROM reserved_stock s WHERE s.quantity <> 0 "
+             "AND NOT EXISTS (SELECT 1 FROM stock_reservations r WHERE r.product_id = s.product_id)")
+    mismatches = db.fetchall(query)
+    if not repair or not mismatches:
+        return mismatches
+    with db.transaction() as cur:
+        lock_products(cur, [product_id for product_id, *_ in mismatches])
+        cur.execute(query)
+        mismatches = cur.fetchall()
+        cur.executemany("INSERT INTO reserved_stock (product_id, quantity) VALUES (%s, %s) "
+                        "ON DUPLICATE KEY UPDATE quantity = VALUES(quantity)",
+                        [(product_id, reserved or 0) for product_id, reserved, _ in mismatches])
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expire abandoned stock reservations or verify the reserved "
+                                                 "stock counters.")
+    parser.add_argument('--expire', action='store_true', help="expire the reservations past their expiry")
+    parser.add_argument('--repair', action='store_true',
+                        help="rewrite the reserved_stock counters that differ from the reservations")
+    args = parser.parse_args()
+
+    db = database.connect(size=1)
+    schema.migrate(db)
+    if args.expire:
+        print(f"Expired {Reservations(db).expire()} reservations")
+    if args.repair:
+        print(f"Repaired {len(reconcile(db, repair=True))} reserved_stock rows")
+    mismatches = reconcile(db)
+    for mismatch in mismatches:
+        print("Mismatch:", mismatch)
+    print("Reserved stock matches the reservations" if not mismatches else f"{len(mismatches)} mismatches")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def _restock(cur, where, params, order_id=None):
+    """Locks the due products matching where, tops them up and logs each restock."""
+    cur.execute(
+        "SELECT product_id, product_name, quantity, restock_quantity, restock_level FROM products "
+        f"WHERE {where} AND quantity <= restock_level AND restock_quantity > 0 FOR UPDATE",
+        params
+    )
+    due = cur.fetchall()
+    if not due:
+        return []
+
+    due_ids = [row[0] for row in due]
+    cur.execute(
+        f"UPDATE products SET quantity = quantity + restock_quantity WHERE product_id IN ({_placeholders(due_ids)})",
+        due_ids
+    )
+    cur.executemany(
+        "INSERT INTO restock_log (product_id, restocked_at, previous_quantity, restocked_quantity, new_quantity, order_id) "
+        "VALUES (%s, NOW(), %s, %s, %s, %s)",
+        [(product_id, quantity, restock_quantity, quantity + restock_quantity, order_id)
+         for product_id, _, quantity, restock_quantity, _ in due]
+    )
+    return due
+
+
+def restock_products(cur, product_ids, order_id=None):
+    """Restocks those of product_ids that are at or below their restock level, inside the caller's transaction.
+
+    Only the given products are considered, so the cost depends on the size of the order and not on the
+    size of the catalogue. Every restock is recorded in restock_log. Returns a list of
+    (product_id, product_name, previous_quantity, restocked_quantity, restock_level) tuples.
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    if not product_ids:
+        return []
+    return _restock(cur, f"product_id IN ({_placeholders(product_ids)})", product_ids, order_id)
+
+
+def restock_after_order(db, order_id, product_ids):
+    """Restocks the products sold in an order in its own short transaction."""
+    with db.transaction() as cur:
+        return restock_products(cur, product_ids, order_id)
+
+
+def restock_all(db):
+    """Restocks every product in the catalogue that is due (maintenance sweep, not run at checkout)."""
+    with db.transaction() as cur:
+        return _restock(cur, "1 = 1", ())
+
+
+def restock_summary(events):
+    """Builds a single notification message for a batch of restock events."""
+    lines = [f"{len(events)} product(s) restocked:", ""]
+    for product_id, product_name, previous, restocked, restock_level in events:
+        lines.append(f"{product_name} (ID {product_id}): {previous} -> {previous + restocked} "
+                     f"(restock level {restock_level})")
+    return "\n".join(lines)
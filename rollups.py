@@ -0,0 +1,176 @@
+import argparse
+from decimal import Decimal
+
+import database
+import schema
+
+# Rebuild statements; migrations/0004_sales_rollups.sql backfilled with the same SQL, except that the category
+# comes from the order line (as stored at checkout) rather than the product's current category
+REBUILD_STATEMENTS = [
+    # Lines written without a category (older code, bulk loaders) take their product's current one
+    "UPDATE order_items oi JOIN products p ON p.product_id = oi.product_id SET oi.category = p.category "
+    "WHERE oi.category IS NULL",
+    "DELETE FROM sales_daily",
+    "DELETE FROM sales_daily_product",
+    "DELETE FROM sales_daily_category",
+    "DELETE FROM product_sales",
+    "INSERT INTO sales_daily (sale_date, payment_status, orders, items, revenue) "
+    "SELECT o.date, COALESCE(o.payment_status, ''), COUNT(DISTINCT o.order_id), COALESCE(SUM(oi.quantity), 0), "
+    "COALESCE(SUM(oi.quantity * oi.price), 0) "
+    "FROM orders o LEFT JOIN order_items oi ON oi.order_id = o.order_id WHERE o.date IS NOT NULL "
+    "GROUP BY o.date, COALESCE(o.payment_status, '')",
+    "INSERT INTO sales_daily_product (sale_date, product_id, payment_status, quantity, revenue) "
+    "SELECT o.date, oi.product_id, COALESCE(o.payment_status, ''), SUM(oi.quantity), SUM(oi.quantity * oi.price) "
+    "FROM orders o JOIN order_items oi ON oi.order_id = o.order_id WHERE o.date IS NOT NULL "
+    "GROUP BY o.date, oi.product_id, COALESCE(o.payment_status, '')",
+    "INSERT INTO sales_daily_category (sale_date, category, payment_status, quantity, revenue) "
+    "SELECT o.date, COALESCE(oi.category, ''), COALESCE(o.payment_status, ''), SUM(oi.quantity), "
+    "SUM(oi.quantity * oi.price) FROM orders o JOIN order_items oi ON oi.order_id = o.order_id "
+    "WHERE o.date IS NOT NULL GROUP BY o.date, COALESCE(oi.category, ''), COALESCE(o.payment_status, '')",
+    "INSERT INTO product_sales (product_id, units, revenue) "
+    "SELECT product_id, SUM(quantity), SUM(quantity * price) FROM order_items GROUP BY product_id",
+]
+
+# Per-category totals recomputed from order_items, for checking sales_daily_category
+CATEGORY_TOTALS = ("SELECT COALESCE(oi.category, ''), SUM(oi.quantity), SUM(oi.quantity * oi.price) FROM orders o "
+                   "JOIN order_items oi ON oi.order_id = o.order_id WHERE o.date IS NOT NULL "
+                   "GROUP BY COALESCE(oi.category, '')")
+
+# Per-product totals recomputed from order_items, for reconciling product_sales
+PRODUCT_TOTALS = ("SELECT product_id, SUM(quantity) AS units, SUM(quantity * price) AS revenue "
+                  "FROM order_items GROUP BY product_id")
+
+
+def record_order(cur, sale_date, payment_status, lines):
+    """Adds one order to the daily rollups and the product totals inside the caller's (checkout) transaction.
+
+    lines is a list of (product_id, quantity, unit_price). Four statements regardless of the number of lines;
+    the category of each product is looked up by the server as part of the category upsert.
+    """
+    sold = {}
+    for product_id, quantity, price in lines:
+        quantity = int(quantity)
+        units, revenue = sold.get(product_id, (0, Decimal(0)))
+        sold[product_id] = (units + quantity, revenue + Decimal(str(price)) * quantity)
+
+    cur.execute(
+        "INSERT INTO sales_daily (sale_date, payment_status, orders, items, revenue) VALUES (%s, %s, 1, %s, %s) "
+        "ON DUPLICATE KEY UPDATE orders = orders + 1, items = items + VALUES(items), revenue = revenue + VALUES(revenue)",
+        (sale_date, payment_status, sum(units for units, _ in sold.values()),
+         sum(revenue for _, revenue in sold.values()))
+    )
+    cur.executemany(
+        "INSERT INTO sales_daily_product (sale_date, product_id, payment_status, quantity, revenue) "
+        "VALUES (%s, %s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity), revenue = revenue + VALUES(revenue)",
+        [(sale_date, product_id, payment_status, units, revenue) for product_id, (units, revenue) in sold.items()]
+    )
+
+    cur.executemany(
+        "INSERT INTO product_sales (product_id, units, revenue) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE units = units + VALUES(units), revenue = revenue + VALUES(revenue)",
+        [(product_id, units, revenue) for product_id, (units, revenue) in sold.items()]
+    )
+
+    derived = " UNION ALL ".join(["SELECT %s AS product_id, %s AS quantity, %s AS revenue"] * len(sold))
+    params = [value for product_id, (units, revenue) in sold.items() for value in (product_id, units, revenue)]
+    cur.execute(
+        "INSERT INTO sales_daily_category (sale_date, category, payment_status, quantity, revenue) "
+        f"SELECT %s, p.category, %s, SUM(r.quantity), SUM(r.revenue) FROM ({derived}) r "
+        "JOIN products p ON p.product_id = r.product_id GROUP BY p.category "
+        "ON DUPLICATE KEY UPDATE quantity = sales_daily_category.quantity + VALUES(quantity), "
+        "revenue = sales_daily_category.revenue + VALUES(revenue)",
+        [sale_date, payment_status] + params
+    )
+
+
+def rebuild(db):
+    """Recomputes every rollup from orders and order_items in one transaction (backfill / repair)."""
+    with db.transaction() as cur:
+        for statement in REBUILD_STATEMENTS:
+            cur.execute(statement)
+        cur.execute("SELECT COUNT(*) FROM sales_daily_product")
+        return cur.fetchone()[0]
+
+
+def check(db):
+    """Compares the rollup totals with the base tables; returns a list of mismatch descriptions."""
+    mismatches = []
+    orders = db.scalar("SELECT COUNT(*) FROM orders WHERE date IS NOT NULL")
+    revenue = db.scalar("SELECT COALESCE(SUM(oi.quantity * oi.price), 0) FROM orders o "
+                        "JOIN order_items oi ON oi.order_id = o.order_id WHERE o.date IS NOT NULL")
+    rolled_orders, rolled_revenue = db.fetchone(
+        "SELECT COALESCE(SUM(orders), 0), COALESCE(SUM(revenue), 0) FROM sales_daily")
+    if orders != rolled_orders:
+        mismatches.append(f"orders: {orders} in orders, {rolled_orders} in sales_daily")
+    if revenue != rolled_revenue:
+        mismatches.append(f"revenue: {revenue} in order_items, {rolled_revenue} in sales_daily")
+    units = db.scalar("SELECT COALESCE(SUM(oi.quantity), 0) FROM orders o "
+                      "JOIN order_items oi ON oi.order_id = o.order_id WHERE o.date IS NOT NULL")
+    rolled_units = db.scalar("SELECT COALESCE(SUM(quantity), 0) FROM sales_daily_product")
+    if units != rolled_units:
+        mismatches.append(f"units: {units} in order_items, {rolled_units} in sales_daily_product")
+    recorded = {category: (units, revenue) for category, units, revenue in db.fetchall(
+        "SELECT category, SUM(quantity), SUM(revenue) FROM sales_daily_category GROUP BY category")}
+    for category, units, revenue in db.fetchall(CATEGORY_TOTALS):
+        rolled_units, rolled_revenue = recorded.pop(category, (0, 0))
+        if (units, revenue) != (rolled_units, rolled_revenue):
+            mismatches.append(f"category {category!r}: {units} units / Rs {revenue} in order_items, "
+                              f"{rolled_units} units / Rs {rolled_revenue} in sales_daily_category")
+    mismatches += [f"category {category!r}: no order lines, {units} units / Rs {revenue} in sales_daily_category"
+                   for category, (units, revenue) in recorded.items()]
+    mismatches += [f"product {product_id}: {units} units / Rs {revenue} in order_items, "
+                   f"{rolled_units} units / Rs {rolled_revenue} in product_sales"
+                   for product_id, units, revenue, rolled_units, rolled_revenue in reconcile(db)]
+    return mismatches
+
+
+def reconcile(db, repair=False):
+    """Compares product_sales with totals recomputed from order_items, product by product.
+
+    Returns (product_id, units, revenue, recorded units, recorded revenue) for every product that differs (None
+    where a side has no row). With repair, those rows are rewritten from order_items in the same transaction.
+    """
+    with db.transaction() as cur:
+        cur.execute(f"SELECT t.product_id, t.units, t.revenue, ps.units, ps.revenue FROM ({PRODUCT_TOTALS}) t "
+                    "LEFT JOIN product_sales ps ON ps.product_id = t.product_id "
+                    "WHERE ps.product_id IS NULL OR ps.units <> t.units OR ps.revenue <> t.revenue "
+                    "UNION ALL "
+                    "SELECT ps.product_id, NULL, NULL, ps.units, ps.revenue FROM product_sales ps "
+                    "WHERE NOT EXISTS (SELECT 1 FROM order_items oi WHERE oi.product_id = ps.product_id)")
+        mismatches = cur.fetchall()
+        if repair and mismatches:
+            cur.executemany("DELETE FROM product_sales WHERE product_id = %s",
+                            [(product_id,) for product_id, *_ in mismatches])
+            cur.executemany("INSERT INTO product_sales (product_id, units, revenue) VALUES (%s, %s, %s)",
+                            [(product_id, units, revenue) for product_id, units, revenue, *_ in mismatches
+                             if units is not None])
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify the daily sales rollups and product totals.")
+    parser.add_argument('--rebuild', action='store_true', help="recompute the rollups from the order tables")
+    parser.add_argument('--repair', action='store_true',
+                        help="rewrite only the product_sales rows that differ from order_items")
+    args = parser.parse_args()
+
+    db = database.connect(size=1)
+    schema.migrate(db)
+    if args.rebuild:
+        rows = rebuild(db)
+        print(f"Rebuilt sales rollups ({rows} product-day rows)")
+    elif args.repair:
+        repaired = reconcile(db, repair=True)
+        print(f"Repaired {len(repaired)} product_sales rows")
+    mismatches = check(db)
+    for mismatch in mismatches:
+        print("Mismatch:", mismatch)
+    db.close()
+    if mismatches:
+        raise SystemExit(1)
+    print("Rollups match the order tables.")
+
+
+if __name__ == '__main__':
+    main()
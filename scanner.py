@@ -0,0 +1,76 @@
+class Scanner:
+    """Adds products to the shop cart from a keyboard-wedge barcode scanner.
+
+    The scanner types a product id into entry and presses Return. Known ids are looked up in the catalogue
+    already in memory, so a scan adds to the Cart without touching MySQL; scanning a product already in the cart
+    adds one more unit to its line. Ids missing from the cache (e.g. a product added since it was loaded) are
+    looked up in the background. on_change(line) is called with every line that changed.
+
+    Checkouts and restocks invalidate the catalogue; the scan after that reloads it in the background, and until
+    the reload lands the cached stock, which may be out of date, is not used to refuse a scan (the shop's stock
+    reservation still is).
+    """
+
+    def __init__(self, entry, cart, catalogue, executor, on_change=None, status=None):
+        self.entry = entry
+        self.cart = cart
+        self.catalogue = catalogue
+        self.executor = executor
+        self.on_change = on_change
+        self.status = status
+        self.scans = 0
+        self._refreshing = False
+        entry.bind("<Return>", self.on_scan)
+
+    def on_scan(self, event=None):
+        product_id = self.entry.get().strip()
+        self.entry.delete(0, "end")
+        if product_id:
+            self.scan(product_id)
+        return "break"
+
+    def scan(self, product_id):
+        """Adds one unit of a product to the cart."""
+        self.scans += 1
+        if self.catalogue.stale():
+            self.refresh()
+        product = self.catalogue.peek(product_id)
+        if product:
+            self.add(product)
+            return
+        self.show(f"Looking up {product_id}...")
+
+        def found(product):
+            if product:
+                self.add(product)
+            else:
+                self.show(f"Unknown product {product_id}", error=True)
+
+        self.executor.submit(self.entry, self.catalogue.product, product_id, callback=found)
+
+    def refresh(self):
+        """Reloads the stale catalogue on a worker thread, once at a time."""
+        if self._refreshing:
+            return
+
+        def done(result=None):
+            self._refreshing = False
+
+        self._refreshing = True
+        self.executor.submit(self.entry, self.catalogue.warm, callback=done, errback=done)
+
+    def add(self, product):
+        quantity = self.cart.quantity(str(product[0])) + 1
+        if not self.catalogue.stale() and quantity > product[4]:
+            self.show(f"Only {product[4]} of {product[1]} in stock", error=True)
+            return
+        line = self.cart.add(product)
+        self.show(f"{line.product_name} x{line.quantity}")
+        if self.on_change:
+            self.on_change(line)
+
+    def show(self, text, error=False):
+        if self.status:
+            self.status.configure(text=text, text_color="#fb0000" if error else "white")
+        if error:
+            self.entry.bell()
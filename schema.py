@@ -0,0 +1,129 @@
+import argparse
+import os
+import re
+
+from mysql.connector import errors
+
+import database
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Errors meaning a statement was already applied by an earlier, interrupted run
+ALREADY_APPLIED = {
+    1060,  # Duplicate column name
+    1061,  # Duplicate key name
+    1091,  # Can't DROP a key that does not exist
+    1826,  # Duplicate foreign key constraint name
+}
+
+
+def migration_files():
+    """Returns the (version, name, path) of every migration file, in order."""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = re.match(r'^(\d+)_(\w+)\.sql$', filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return sorted(migrations)
+
+
+def statements(path):
+    """Splits a migration file into statements, dropping comment lines."""
+    with open(path) as f:
+        sql = "\n".join(line for line in f if not line.lstrip().startswith('--'))
+    return [statement.strip() for statement in sql.split(';') if statement.strip()]
+
+
+def migrate(db, target=None):
+    """Applies every migration not yet recorded in schema_version, up to target. Safe to run on every startup.
+
+    A named lock serialises tills that start at the same time. Returns the versions that were applied.
+    """
+    applied_now = []
+    with db.pool.connection() as con:
+        cur = con.cursor()
+        try:
+            cur.execute("SELECT GET_LOCK('inventory_schema_migration', 60)")
+            cur.fetchall()
+            cur.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, name varchar (100) NOT NULL, applied_at DATETIME NOT NULL)")
+            cur.execute("SELECT version FROM schema_version")
+            applied = {row[0] for row in cur.fetchall()}
+
+            for version, name, path in migration_files():
+                if version in applied or (target is not None and version > target):
+                    continue
+                for statement in statements(path):
+                    try:
+                        cur.execute(statement)
+                    except errors.DatabaseError as e:
+                        if e.errno not in ALREADY_APPLIED:
+                            raise
+                cur.execute("INSERT INTO schema_version VALUES (%s, %s, NOW())", (version, name))
+                applied_now.append(version)
+                print(f"* Applied migration {version:04d}_{name}")
+        finally:
+            cur.execute("SELECT RELEASE_LOCK('inventory_schema_migration')")
+            cur.fetchall()
+            cur.close()
+    return applied_now
+
+
+def current_version(db):
+    return db.scalar("SELECT MAX(version) FROM schema_version")
+
+
+def hot_queries():
+    """The queries that must be served from indexes, with sample parameters."""
+    from menu import HISTORY_QUERY
+    from Analytics import Analytics
+    from utils import MONTHLY_EARNINGS_QUERY
+    return {
+        'Menu.history': (HISTORY_QUERY, ('ADMIN',)),
+        'Analytics.create_top_products_chart': (Analytics.TOP_PRODUCTS_QUERY, None),
+        'add_graphs monthly earnings': (MONTHLY_EARNINGS_QUERY, None),
+    }
+
+
+def explain_check(db, queries=None):
+    """Runs EXPLAIN on the hot queries and returns {name: [(table, access type, key), ...]} plus the full scans found."""
+    plans = {}
+    full_scans = []
+    for name, (query, params) in (queries or hot_queries()).items():
+        plan = []
+        with db.pool.connection() as con:
+            cur = con.cursor(dictionary=True)
+            cur.execute("EXPLAIN " + query, params)
+            for row in cur.fetchall():
+                plan.append((row['table'], row['type'], row['key']))
+                # type ALL is a full table scan; 'index' is a scan of a covering index, which is acceptable
+                if row['type'] == 'ALL':
+                    full_scans.append((name, row['table']))
+            cur.close()
+        plans[name] = plan
+    return plans, full_scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations and check query plans.")
+    parser.add_argument('--target', type=int, help="migrate up to this version only")
+    parser.add_argument('--explain', action='store_true', help="EXPLAIN the hot queries after migrating")
+    args = parser.parse_args()
+
+    db = database.connect(size=1)
+    migrate(db, args.target)
+    print(f"Schema version: {current_version(db)}")
+    if args.explain:
+        plans, full_scans = explain_check(db)
+        for name, plan in plans.items():
+            print(name)
+            for table, access, key in plan:
+                print(f"    {table:<12} {access:<8} {key}")
+        if full_scans:
+            print("Full table scans:", ", ".join(f"{name} ({table})" for name, table in full_scans))
+            raise SystemExit(1)
+        print("All hot queries use indexes.")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
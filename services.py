@@ -0,0 +1,163 @@
+from decimal import Decimal
+
+from catalogue import Catalogue
+from checkout import place_order
+from product_search import ProductIndex
+from products import PRODUCT_COLUMNS, ValidationError, validate_product
+from reservations import Reservations
+from restock import restock_after_order
+
+
+class ServiceError(Exception):
+    """Base class of the errors a service call reports back to its caller (GUI or API)."""
+
+
+class NotFound(ServiceError):
+    """Raised when a product or user does not exist."""
+
+
+class DuplicateProduct(ServiceError):
+    """Raised when adding a product whose id is already taken."""
+
+
+class InventoryService:
+    """The inventory, cart and checkout operations, independent of any user interface.
+
+    Used by the Tk menu and by the HTTP API (api.py); every method is blocking and thread-safe, so callers run
+    them on worker threads. Stock-changing operations invalidate the catalogue cache; adding and deleting products
+    also updates the search index, which index_products() builds from the catalogue. Carts hold the stock they
+    contain through reserve(), so two tills cannot sell the same last unit.
+    """
+
+    def __init__(self, db, catalogue=None, index=None, reservations=None):
+        self.db = db
+        self.catalogue = catalogue or Catalogue(db)
+        self.index = index if index is not None else ProductIndex()
+        self.reservations = reservations if reservations is not None else Reservations(db)
+
+    # Inventory
+    def categories(self):
+        return self.catalogue.categories()
+
+    def products(self, category=None, after=None, limit=100):
+        """A page of products ordered by id, starting after the given product id."""
+        where, params = [], []
+        if category:
+            where.append("category = %s")
+            params.append(category)
+        if after is not None:
+            where.append("product_id > %s")
+            params.append(str(after))
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        rows = self.db.fetchall(f"SELECT {', '.join(PRODUCT_COLUMNS)} FROM products{clause} "
+                                "ORDER BY product_id LIMIT %s", params + [int(limit)])
+        return [dict(zip(PRODUCT_COLUMNS, row)) for row in rows]
+
+    def product(self, product_id):
+        row = self.db.fetchone(f"SELECT {', '.join(PRODUCT_COLUMNS)} FROM products WHERE product_id = %s",
+                               (str(product_id),))
+        if not row:
+            raise NotFound(f"Product {product_id} not found")
+        return dict(zip(PRODUCT_COLUMNS, row))
+
+    def add_product(self, p_id, p_name, p_desc, p_price, p_qty, p_category, restock_level, restock_quantity):
+        """Validates and creates a product; raises ValidationError or DuplicateProduct."""
+        product = validate_product(p_id, p_name, p_desc, p_price, p_qty, p_category, restock_level,
+                                   restock_quantity, categories=set(self.catalogue.categories()))
+        if self.db.fetchone("SELECT 1 FROM products WHERE product_id = %s", (product[0],)):
+            raise DuplicateProduct("Product Id already exists")
+        self.db.execute("INSERT INTO products VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", product)
+        self.catalogue.invalidate()
+        self.index.add(product)
+        return dict(zip(PRODUCT_COLUMNS, product))
+
+    def delete_product(self, product_id):
+        """Deletes a product; raises NotFound if there is no such product."""
+        if not self.db.execute("DELETE FROM products WHERE product_id = %s", (str(product_id),)):
+            raise NotFound(f"Product {product_id} not found")
+        self.catalogue.invalidate()
+        self.index.remove(product_id)
+
+    def index_products(self):
+        """(Re)builds the product search index from the whole catalogue, e.g. at startup or after an import."""
+        self.index.rebuild(self.catalogue.products())
+
+    def search(self, text, limit=10, category=None):
+        """Products matching what has been typed so far, as (product_id, product_name, description, category)."""
+        return self.index.search(text, limit, category)
+
+    # Cart
+    def quote(self, items):
+        """Prices (product_id, quantity) items at the current database prices.
+
+        Returns (lines, total) where lines are (product_id, quantity, price, in_stock) tuples.
+        """
+        requested = {}
+        for product_id, quantity in items:
+            try:
+                quantity = int(quantity)
+            except (TypeError, ValueError):
+                raise ValidationError(f"Invalid quantity for product {product_id}")
+            if quantity <= 0:
+                raise ValidationError(f"Invalid quantity for product {product_id}")
+            requested[str(product_id)] = requested.get(str(product_id), 0) + quantity
+        if not requested:
+            raise ValidationError("The cart is empty")
+
+        ids = list(requested)
+        rows = self.db.fetchall(f"SELECT product_id, price, quantity FROM products "
+                                f"WHERE product_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        stock = {product_id: (price, available) for product_id, price, available in rows}
+        missing = [product_id for product_id in ids if product_id not in stock]
+        if missing:
+            raise NotFound(f"Product(s) not found: {', '.join(missing)}")
+
+        lines = [(product_id, quantity, stock[product_id][0], stock[product_id][1] >= quantity)
+                 for product_id, quantity in requested.items()]
+        total = sum((Decimal(price) * quantity for _, quantity, price, _ in lines), Decimal(0))
+        return lines, total
+
+    def reserve(self, cart_id, product_id, quantity):
+        """Holds quantity units of a product for a cart (0 releases them); returns the units left available.
+        Raises reservations.ReservationError when they are not available."""
+        return self.reservations.reserve(cart_id, product_id, quantity)
+
+    def release(self, cart_id):
+        """Gives back all the stock a cart holds."""
+        return self.reservations.release(cart_id)
+
+    def available(self, product_id):
+        """Units of a product in stock and not held by any cart; raises NotFound."""
+        available = self.reservations.available(product_id)
+        if available is None:
+            raise NotFound(f"Product {product_id} not found")
+        return available
+
+    # Checkout
+    def checkout(self, user, items, payment_status, customer_name, phone_number, address, cart_id=None):
+        """Places an order for (product_id, quantity) items priced from the database.
+
+        Returns a dict with order_id, total_amount and the (product_id, quantity, price) lines charged. Raises
+        checkout.OutOfStockError when stock ran out, in which case nothing is written. With cart_id the order
+        sells the stock that cart reserved.
+        """
+        if payment_status not in ('paid', 'pending'):
+            raise ValidationError("Payment status must be 'paid' or 'pending'")
+        if not customer_name or not phone_number or not address:
+            raise ValidationError("Please fill all fields: Customer Name, Phone Number, Address")
+        if not self.db.fetchone("SELECT 1 FROM users WHERE username = %s", (user,)):
+            raise NotFound(f"User {user} not found")
+
+        priced, total = self.quote(items)
+        lines = [(product_id, quantity, price) for product_id, quantity, price, _ in priced]
+        order_id = place_order(self.db, user, lines, payment_status, customer_name, phone_number, address,
+                               cart_id=cart_id)
+        self.catalogue.invalidate()  # Stock levels changed
+        return {'order_id': order_id, 'total_amount': total, 'lines': lines}
+
+    def restock(self, order_id, product_ids):
+        """Restocks the products of an order that fell to their restock level; returns the restock events."""
+        events = restock_after_order(self.db, order_id, product_ids)
+        if events:
+            self.catalogue.invalidate()
+        return events
@@ -0,0 +1,241 @@
+import argparse
+import datetime
+import json
+import os
+import time
+
+import numpy as np
+from numpy.lib import format as npy
+
+import database
+import schema
+from analytics_engine import PRODUCTS_QUERY, Column, Dictionary, SalesColumns
+
+ORDER_COLUMNS = ('order_id', 'order_day', 'order_user', 'order_status', 'order_location', 'order_total')
+LINE_COLUMNS = ('line_product', 'line_quantity', 'line_revenue', 'line_day', 'line_user', 'line_status',
+                'line_location', 'line_category')
+DICTIONARIES = ('products', 'categories', 'users', 'locations', 'statuses')
+PRODUCT_COLUMNS = ('product_category', 'product_stock', 'product_exists')
+DEFAULT_PATH = os.environ.get('IMS_ANALYTICS_SNAPSHOT') or 'snapshots/sales'
+
+
+def append_npy(path, values, start):
+    """Writes values after the first start rows of the 1-d .npy file at path, creating it if needed.
+
+    numpy pads .npy headers so the length can grow without moving the data, so only the header and the new rows
+    are written. Rows past start (left by an interrupted export) are overwritten.
+    """
+    if not os.path.exists(path):
+        np.save(path, values[:0])
+    with open(path, 'r+b') as f:
+        version = npy.read_magic(f)
+        read_header, write_header = ((npy.read_array_header_1_0, npy.write_array_header_1_0) if version == (1, 0)
+                                     else (npy.read_array_header_2_0, npy.write_array_header_2_0))
+        shape, _, dtype = read_header(f)
+        offset = f.tell()
+        if dtype != values.dtype or shape[0] < start:
+            raise ValueError(f"{path} does not match the snapshot manifest")
+        f.seek(offset + start * dtype.itemsize)
+        f.truncate()
+        f.write(np.ascontiguousarray(values).tobytes())
+        f.seek(0)
+        write_header(f, {'descr': npy.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (start + len(values),)})
+        if f.tell() != offset:
+            raise ValueError(f"The header of {path} cannot grow in place")
+
+
+def map_npy(path, rows):
+    """The first rows rows of the 1-d .npy file at path, memory-mapped read-only.
+
+    The length comes from the manifest rather than the file header, which an export may be updating.
+    """
+    with open(path, 'rb') as f:
+        version = npy.read_magic(f)
+        read_header = npy.read_array_header_1_0 if version == (1, 0) else npy.read_array_header_2_0
+        _, _, dtype = read_header(f)
+        offset = f.tell()
+    if not rows:
+        return np.empty(0, dtype)
+    return np.memmap(path, dtype, mode='r', offset=offset, shape=(rows,))
+
+
+def save_atomic(path, write):
+    """Calls write(file) on a temporary file and moves it over path, so readers see the old or the new file."""
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        write(f)
+    os.replace(temporary, path)
+
+
+class Snapshot:
+    """A columnar copy of the sales data on disk, so the Analytics charts can run without touching MySQL.
+
+    The columns of SalesColumns are stored one .npy file each, appended in place and memory-mapped when read;
+    the dictionary-encoded strings are JSON lines files, also append-only. manifest.json records the watermark
+    and the committed length of every file and is replaced atomically after each batch, so readers never see a
+    partial export and an interrupted one is simply overwritten by the next. Product attributes (names,
+    categories, stock) are small and rewritten on every export.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    def manifest(self):
+        try:
+            with open(self.file('manifest.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def export(self, db, batch=100000, progress=None):
+        """Appends the orders above the snapshot's watermark (all of them on the first run); returns how many.
+
+        Orders are read batch order ids at a time, so memory stays bounded however large the first export is.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        manifest = self.manifest()
+        if manifest and not all(os.path.exists(self.file(f'{name}.npy')) for name in ORDER_COLUMNS + LINE_COLUMNS):
+            manifest = None  # Written before a column was added: exported again from scratch
+        manifest = manifest or {'watermark': 0, 'recent': [], 'orders': 0, 'lines': 0,
+                                       'dictionaries': {name: {'count': 0, 'bytes': 0} for name in DICTIONARIES}}
+        columns = SalesColumns()
+        self.read_dictionaries(columns, manifest)
+        columns.watermark = manifest['watermark']
+        columns.recent = set(manifest['recent'])
+
+        top = db.scalar("SELECT COALESCE(MAX(order_id), 0) FROM orders")
+        for (category,) in db.fetchall("SELECT category_name FROM categories"):
+            columns.categories.encode(category)
+        columns.load_products(db.stream(PRODUCTS_QUERY, size=10000))
+        # The first batch also re-reads the window below the watermark for ids that committed late
+        low, added = columns.watermark - columns.WINDOW, 0
+        while True:
+            high = min(low + batch, top)
+            added += columns.read(db, low, high)
+            columns.advance(high)
+            manifest = self.write(columns, manifest)
+            if progress:
+                progress(manifest['orders'], high, top)
+            if high >= top:
+                return added
+            low = high
+
+    def write(self, columns, manifest):
+        """Appends the rows read since the last write, then commits them with a new manifest."""
+        counts = {'orders': manifest['orders'] + columns.order_id.size,
+                  'lines': manifest['lines'] + columns.line_product.size}
+        for names, count in ((ORDER_COLUMNS, 'orders'), (LINE_COLUMNS, 'lines')):
+            for name in names:
+                column = getattr(columns, name)
+                append_npy(self.file(f'{name}.npy'), column.values, manifest[count])
+                # Written rows are dropped from memory, so each batch starts empty
+                setattr(columns, name, Column(column.data.dtype))
+        dictionaries = {}
+        for name in DICTIONARIES:
+            written, values = manifest['dictionaries'][name], getattr(columns, name).values
+            with open(self.file(f'{name}.jsonl'), 'ab') as f:
+                f.truncate(written['bytes'])
+                f.writelines(json.dumps(value).encode() + b'\n' for value in values[written['count']:])
+                dictionaries[name] = {'count': len(values), 'bytes': f.tell()}
+        for name in PRODUCT_COLUMNS:
+            save_atomic(self.file(f'{name}.npy'), lambda f: np.save(f, getattr(columns, name)))
+        save_atomic(self.file('product_names.json'), lambda f: f.write(json.dumps(columns.product_name).encode()))
+
+        manifest = {**counts, 'generation': manifest.get('generation', 0) + 1, 'watermark': columns.watermark,
+                    'recent': sorted(columns.recent), 'dictionaries': dictionaries,
+                    'exported': datetime.datetime.now().isoformat(timespec='seconds')}
+        save_atomic(self.file('manifest.json'), lambda f: f.write(json.dumps(manifest).encode()))
+        return manifest
+
+    def read_dictionaries(self, columns, manifest, previous=None):
+        """Fills the dictionaries of columns from the JSON lines files, reading only what previous did not."""
+        for name in DICTIONARIES:
+            written = manifest['dictionaries'][name]
+            start = previous['dictionaries'][name] if previous else {'count': 0, 'bytes': 0}
+            if not previous:
+                setattr(columns, name, Dictionary())
+                columns.location_labels = []
+            dictionary = getattr(columns, name)
+            if written['count'] > start['count']:
+                with open(self.file(f'{name}.jsonl'), 'rb') as f:
+                    f.seek(start['bytes'])
+                    lines = f.read(written['bytes'] - start['bytes']).splitlines()
+                for value in json.loads(b'[' + b','.join(lines) + b']'):
+                    dictionary.encode(value)
+        columns.location_labels += [address[:10] if address is not None else None
+                                    for address in columns.locations.values[len(columns.location_labels):]]
+
+    def open(self, manifest=None, columns=None, previous=None):
+        """The snapshot as SalesColumns whose row columns are memory-mapped; None if nothing was exported yet.
+
+        columns and previous (the manifest columns was last filled from) refresh existing columns instead.
+        """
+        manifest = manifest or self.manifest()
+        if manifest is None:
+            return None
+        columns = columns or SalesColumns()
+        self.read_dictionaries(columns, manifest, previous)
+        for names, count in ((ORDER_COLUMNS, 'orders'), (LINE_COLUMNS, 'lines')):
+            for name in names:
+                setattr(columns, name, Column.wrap(map_npy(self.file(f'{name}.npy'), manifest[count])))
+        size = len(columns.products)
+        for name in PRODUCT_COLUMNS:
+            setattr(columns, name, np.load(self.file(f'{name}.npy'))[:size])
+        with open(self.file('product_names.json')) as f:
+            columns.product_name = json.load(f)[:size]
+        columns.watermark = manifest['watermark']
+        columns.recent = set(manifest['recent'])
+        return columns
+
+
+class SnapshotColumns(SalesColumns):
+    """SalesColumns read from a Snapshot instead of MySQL, for IMS_ANALYTICS_ENGINE=snapshot.
+
+    refresh() maps the snapshot again when an export committed since, reading only the new dictionary entries;
+    the database is never queried.
+    """
+
+    def __init__(self, snapshot):
+        super().__init__()
+        self.snapshot = snapshot
+        self.manifest = None
+
+    def refresh(self, db=None, max_age=30):
+        with self.lock:
+            if self.manifest and time.monotonic() - self.refreshed <= max_age:
+                return
+            manifest = self.snapshot.manifest()
+            if manifest is None:
+                raise FileNotFoundError(f"No analytics snapshot in {self.snapshot.path}; run python snapshot.py")
+            if manifest['generation'] != (self.manifest or {}).get('generation'):
+                # A snapshot exported again from scratch is read from the start
+                grown = self.manifest and manifest['generation'] > self.manifest['generation'] \
+                    and manifest['orders'] >= self.manifest['orders']
+                self.snapshot.open(manifest, self, self.manifest if grown else None)
+                self.manifest = manifest
+            self.refreshed = time.monotonic()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the sales data to a columnar snapshot for Analytics.")
+    parser.add_argument('--path', default=DEFAULT_PATH, help=f"snapshot directory (default: {DEFAULT_PATH})")
+    parser.add_argument('--batch', type=int, default=100000, help="order ids read per batch")
+    args = parser.parse_args()
+
+    db = database.connect(size=1)
+    schema.migrate(db)
+    snapshot = Snapshot(args.path)
+    start = time.perf_counter()
+    added = snapshot.export(db, args.batch, lambda orders, high, top: print(f"\r{orders} orders (id {high}/{top})",
+                                                                            end='', flush=True))
+    manifest = snapshot.manifest()
+    print(f"\nAdded {added} orders in {time.perf_counter() - start:.1f}s; the snapshot has {manifest['orders']} "
+          f"orders and {manifest['lines']} lines up to order {manifest['watermark']}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
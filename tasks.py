@@ -0,0 +1,145 @@
+import atexit
+import os
+import time
+import tkinter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import customtkinter as ctk
+
+from utils import error
+
+
+def _alive(widget):
+    try:
+        return bool(widget.winfo_exists())
+    except tkinter.TclError:
+        return False
+
+
+class BackgroundExecutor:
+    """Runs blocking work (mostly SQL) on worker threads and delivers the results back on the Tk thread.
+
+    Results are marshalled by polling the future with ``widget.after`` so callbacks always run on the
+    mainloop and never touch Tk from a worker thread. Set IMS_SYNC_QUERIES=1 to run everything inline,
+    which reproduces the old blocking behaviour for comparison with the StallMonitor.
+    """
+
+    def __init__(self, workers=4, poll_ms=10, synchronous=None):
+        if synchronous is None:
+            synchronous = os.environ.get('IMS_SYNC_QUERIES') == '1'
+        self.synchronous = synchronous
+        self.poll_ms = poll_ms
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ims-query')
+
+    def submit(self, widget, fn, *args, callback=None, errback=None, **kwargs):
+        """Run fn(*args, **kwargs) in the background and call callback(result) or errback(exc) on the UI thread.
+
+        The callbacks are dropped if the widget was destroyed in the meantime (e.g. the user navigated away).
+        """
+        if self.synchronous:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self.pool.submit(fn, *args, **kwargs)
+        return self.watch(widget, future, callback=callback, errback=errback)
+
+    def watch(self, widget, future, callback=None, errback=None):
+        """Deliver the result of a future from any executor (e.g. a process pool) to callbacks on the UI thread."""
+        if errback is None:
+            errback = lambda exc: error(str(exc))
+
+        def poll():
+            if not future.done():
+                widget.after(self.poll_ms, poll)
+                return
+            if not _alive(widget):
+                return
+            exc = future.exception()
+            if exc is not None:
+                errback(exc)
+            elif callback:
+                callback(future.result())
+
+        if self.synchronous and future.done():
+            poll()
+        else:
+            widget.after(self.poll_ms, poll)
+        return future
+
+    def load(self, parent, fn, *args, render, text="Loading...", **kwargs):
+        """Show a loading placeholder in parent until fn's result is ready, then replace it with render(result)."""
+        placeholder = ctk.CTkLabel(parent, text=text, font=('Century Gothic', 16), text_color="gray")
+        placeholder.pack(pady=20)
+
+        def done(result):
+            placeholder.destroy()
+            render(result)
+
+        def failed(exc):
+            print(f"[!]   Background query failed: {exc}")
+            placeholder.configure(text="Failed to load data")
+
+        return self.submit(parent, fn, *args, callback=done, errback=failed, **kwargs)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class StallMonitor:
+    """Histogram of how late the Tk mainloop services a periodic tick, i.e. how long the UI thread was blocked.
+
+    Enable with IMS_STALL_MONITOR=1; the histogram is printed when the application exits.
+    """
+
+    BUCKETS_MS = (4, 8, 16, 33, 66, 125, 250, 500, 1000)
+
+    def __init__(self, widget, interval_ms=5):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.worst_ms = 0.0
+        self._expected = None
+
+    @classmethod
+    def from_env(cls, widget):
+        if os.environ.get('IMS_STALL_MONITOR') != '1':
+            return None
+        monitor = cls(widget)
+        monitor.start()
+        atexit.register(lambda: print(monitor.report()))
+        return monitor
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self.widget.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.record(max(0.0, (now - self._expected) * 1000))
+        self._expected = now + self.interval_ms / 1000
+        if _alive(self.widget):
+            self.widget.after(self.interval_ms, self._tick)
+
+    def record(self, stall_ms):
+        self.worst_ms = max(self.worst_ms, stall_ms)
+        for i, bound in enumerate(self.BUCKETS_MS):
+            if stall_ms < bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def histogram(self):
+        labels = [f"<{b}ms" for b in self.BUCKETS_MS] + [f">={self.BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, self.counts))
+
+    def report(self):
+        total = sum(self.counts) or 1
+        over = sum(self.counts[self.BUCKETS_MS.index(16) + 1:])
+        lines = ["UI-thread stall histogram:"]
+        for label, count in self.histogram().items():
+            lines.append(f"  {label:>9} {count:>8}  {'#' * round(40 * count / total)}")
+        lines.append(f"  ticks over 16ms: {over} / {total}, worst: {self.worst_ms:.1f}ms")
+        return "\n".join(lines)
@@ -0,0 +1,125 @@
+"""The NumPy analytics engine (analytics_engine.py) against a few orders served by a fake database.
+
+    python -m unittest discover tests
+"""
+import datetime
+import unittest
+
+import numpy as np
+
+from analytics_engine import EPOCH, SalesColumns, top_n
+from analytics_filters import Filters
+
+
+def day(year, month, date):
+    return (datetime.date(year, month, date) - EPOCH).days
+
+
+class FakeDB:
+    """Serves the engine's queries from lists of rows, the way Database.stream chunks them."""
+
+    def __init__(self, products, orders, lines):
+        self.products, self.orders, self.lines = products, orders, lines
+
+    def scalar(self, query, params=None):
+        return max((row[0] for row in self.orders), default=0)
+
+    def stream(self, query, params=None, size=1000):
+        if 'FROM products' in query:
+            rows = self.products
+        else:
+            low, high = params
+            rows = [row for row in (self.orders if 'FROM orders' in query else self.lines) if low < row[0] <= high]
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+
+
+PRODUCTS = [('1', 'Apple', 'Fruit', 10), ('2', 'Bread', 'Bakery', 5), ('3', 'Cheese', 'Dairy', 0)]
+ORDERS = [
+    (1001, 'alice', day(2024, 1, 15), 'paid', '12 MG Road, Pune', 30),
+    (1002, 'bob', day(2024, 2, 3), 'pending', '7 Park Street', 20),
+    # No date: counted by location but not by the daily rollups
+    (1003, 'alice', None, 'paid', '12 MG Road, Pune', 5),
+]
+LINES = [
+    (1001, '1', 2, 10, 'Fruit'),
+    (1001, '2', 1, 10, 'Bakery'),
+    # Sold before Apple moved to Fruit
+    (1002, '1', 1, 20, 'Produce'),
+    # A product deleted since
+    (1003, '9', 1, 5, ''),
+]
+
+
+class SalesColumnsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = FakeDB(PRODUCTS, list(ORDERS), list(LINES))
+        self.engine = SalesColumns()
+        self.engine.load(self.db, chunk_size=2)
+
+    def test_product_charts(self):
+        self.assertEqual(self.engine.top_products(), [('Apple', 'Fruit', 3), ('Bread', 'Bakery', 1)])
+        self.assertEqual(self.engine.revenue_per_product(), [('Apple', 40.0), ('Bread', 10.0)])
+        # Never sold comes first
+        self.assertEqual(self.engine.least_selling(),
+                         [('Cheese', 'Dairy', None), ('Bread', 'Bakery', 1), ('Apple', 'Fruit', 3)])
+        self.assertEqual(sorted(self.engine.products_per_category()), [('Bakery', 1), ('Dairy', 1), ('Fruit', 1)])
+        self.assertEqual(self.engine.total_products(), 3)
+
+    def test_category_revenue_by_category_sold_under(self):
+        self.assertEqual(sorted(self.engine.category_revenue()), [('Bakery', 10.0), ('Fruit', 20.0), ('Produce', 20.0)])
+        self.assertEqual(self.engine.category_revenue(Filters(category='Fruit')), [('Fruit', 20.0)])
+
+    def test_totals_and_locations(self):
+        self.assertEqual(self.engine.total_sales(), 50.0)
+        self.assertEqual(self.engine.total_sales(Filters(user='bob')), 20.0)
+        self.assertEqual(self.engine.total_sales(Filters(user='nobody')), 0.0)
+        self.assertEqual(sorted(self.engine.location_sales()), [('12 MG Road', 35.0), ('7 Park Str', 20.0)])
+        self.assertEqual(self.engine.location_sales(Filters(payment_status='pending')), [('7 Park Str', 20.0)])
+
+    def test_monthly_trends(self):
+        self.assertEqual(self.engine.monthly_trends(2024), [(1, 30.0), (2, 20.0)])
+        self.assertEqual(self.engine.monthly_trends(2023), [])
+        filters = Filters(datetime.date(2024, 1, 1), datetime.date(2024, 3, 31))
+        self.assertEqual(self.engine.monthly_trends(filters=filters), [('2024-01', 30.0), ('2024-02', 20.0)])
+
+    def test_update_appends_new_orders(self):
+        self.db.orders.append((1004, 'carol', day(2024, 2, 20), 'paid', '7 Park Street', 10))
+        self.db.lines.append((1004, '2', 2, 5, 'Bakery'))
+        self.assertEqual(self.engine.update(self.db), 1)
+        self.assertEqual(self.engine.total_sales(), 60.0)
+        self.assertEqual(self.engine.top_products(), [('Apple', 'Fruit', 3), ('Bread', 'Bakery', 3)])
+        self.assertEqual(self.engine.stats()['orders'], 4)
+        # The orders within the window below the watermark are not read twice
+        self.assertEqual(self.engine.update(self.db), 0)
+        self.assertEqual(self.engine.stats()['lines'], 5)
+
+    def test_per_month(self):
+        days = np.array([day(2024, 1, 31), day(2024, 2, 1), day(2024, 3, 10), day(2023, 12, 31), -1])
+        revenue = np.array([1.0, 2.0, 4.0, 8.0, 16.0])
+        months, totals, lines = SalesColumns.per_month(days, revenue, datetime.date(2024, 1, 1),
+                                                       datetime.date(2024, 3, 31))
+        self.assertEqual([str(month) for month in months], ['2024-01', '2024-02', '2024-03'])
+        self.assertEqual(totals.tolist(), [1.0, 2.0, 4.0])
+        self.assertEqual(lines.tolist(), [1, 1, 1])
+
+
+class TopNTest(unittest.TestCase):
+
+    def test_largest_and_smallest(self):
+        values = np.array([5, 1, 9, 3, 7])
+        everything = np.ones(5, bool)
+        self.assertEqual(top_n(values, everything, 2).tolist(), [2, 4])
+        self.assertEqual(top_n(values, everything, 2, largest=False).tolist(), [1, 3])
+        self.assertEqual(top_n(values, everything, 10).tolist(), [2, 4, 0, 3, 1])
+
+    def test_only_eligible(self):
+        values = np.array([5, 1, 9, 3, 7])
+        eligible = np.array([True, False, False, True, True])
+        self.assertEqual(top_n(values, eligible, 2, largest=False).tolist(), [3, 0])
+        self.assertEqual(top_n(values, np.zeros(5, bool), 3).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
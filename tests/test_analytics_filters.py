@@ -0,0 +1,76 @@
+"""Analytics filters and the SQL each chart is computed with under them (analytics_filters.py).
+
+    python -m unittest discover tests
+"""
+import datetime
+import unittest
+
+from analytics_filters import Filters, query
+
+JANUARY = (datetime.date(2024, 1, 1), datetime.date(2024, 1, 31))
+
+
+class FiltersTest(unittest.TestCase):
+
+    def test_default_filters_nothing(self):
+        self.assertFalse(Filters())
+        self.assertEqual(Filters().set(), set())
+        self.assertEqual(Filters().describe(), "All data")
+
+    def test_equal_filters_share_a_cache_key(self):
+        self.assertEqual(Filters(*JANUARY, category='Fruit'), Filters(*JANUARY, category='Fruit'))
+        self.assertEqual(len({Filters(user='bob'), Filters(user='bob'), Filters(user='alice')}), 2)
+        self.assertNotEqual(Filters(user='bob'), Filters(payment_status='bob'))
+
+    def test_set_and_describe(self):
+        filters = Filters(*JANUARY, category='Fruit', payment_status='paid')
+        self.assertEqual(filters.set(), {'start', 'end', 'category', 'payment_status'})
+        self.assertEqual(filters.describe(), "2024-01-01 to 2024-01-31, Fruit, paid")
+
+    def test_span_defaults_to_the_current_year(self):
+        year = datetime.date.today().year
+        self.assertEqual(Filters().span(), (datetime.date(year, 1, 1), datetime.date(year, 12, 31)))
+        self.assertEqual(Filters(start=JANUARY[0]).span(), (JANUARY[0], None))
+
+    def test_start_after_end(self):
+        with self.assertRaises(ValueError):
+            Filters(JANUARY[1], JANUARY[0])
+
+
+class QueryTest(unittest.TestCase):
+
+    def test_unfiltered_totals_read_the_daily_rollup(self):
+        sql, params = query('total_sales', Filters())
+        self.assertEqual(sql.strip(), "SELECT SUM(s.revenue) FROM sales_daily s")
+        self.assertEqual(params, [])
+
+    def test_smallest_table_with_every_filtered_column(self):
+        sql, params = query('category_revenue', Filters(*JANUARY, category='Fruit'))
+        self.assertIn("FROM sales_daily_category s WHERE s.sale_date BETWEEN %s AND %s AND s.category = %s", sql)
+        self.assertEqual(params, [*JANUARY, 'Fruit'])
+        # Only the orders know the customer
+        sql, params = query('total_sales', Filters(user='bob'))
+        self.assertIn("FROM orders o JOIN order_items oi", sql)
+        self.assertIn("WHERE o.user = %s", sql)
+        self.assertEqual(params, ['bob'])
+
+    def test_only_the_filters_that_apply(self):
+        sql, params = query('products_per_category', Filters(*JANUARY, category='Fruit', user='bob'))
+        self.assertIn("FROM products p WHERE p.category = %s", sql)
+        self.assertEqual(params, ['Fruit'])
+
+    def test_monthly_trends_cover_the_current_year_by_default(self):
+        sql, params = query('monthly_trends', Filters(payment_status='paid'))
+        self.assertIn("s.sale_date BETWEEN %s AND %s AND s.payment_status = %s", sql)
+        self.assertEqual(params, [*Filters().span(), 'paid'])
+
+    def test_least_selling_filters_sales_and_products_separately(self):
+        sql, params = query('least_selling', Filters(start=JANUARY[0], category='Fruit'))
+        self.assertIn("LEFT JOIN (SELECT s.product_id AS product_id", sql)
+        self.assertIn("WHERE s.sale_date >= %s GROUP BY s.product_id", sql)
+        self.assertIn("WHERE p.category = %s ORDER BY total_sold ASC", sql)
+        self.assertEqual(params, [JANUARY[0], 'Fruit'])
+
+
+if __name__ == '__main__':
+    unittest.main()
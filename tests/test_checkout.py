@@ -0,0 +1,24 @@
+"""The parts of checkout (checkout.py) that need no database.
+
+    python -m unittest discover tests
+"""
+import unittest
+
+from checkout import merge_lines
+
+
+class MergeLinesTest(unittest.TestCase):
+
+    def test_sums_quantities_per_product(self):
+        lines = [('1', 2, '10.00'), ('2', 1, '5.00'), ('1', '3', '10.00')]
+        self.assertEqual(merge_lines(lines), {'1': 5, '2': 1})
+
+    def test_keeps_first_seen_order(self):
+        self.assertEqual(list(merge_lines([('3', 1, 1), ('1', 1, 1), ('3', 1, 1)])), ['3', '1'])
+
+    def test_empty(self):
+        self.assertEqual(merge_lines([]), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""The Add Item form rules shared by the form and the product import (products.py).
+
+    python -m unittest discover tests
+"""
+import unittest
+
+from products import ValidationError, _integer, validate_product
+
+
+class ValidateProductTest(unittest.TestCase):
+
+    def test_returns_the_row_to_insert(self):
+        self.assertEqual(validate_product(' 12 ', 'Apple', 'Red', '10.456', '5', 'Fruit', '2', '10'),
+                         ('12', 'Apple', 'Red', 10.46, 5, 'Fruit', 2, 10))
+
+    def test_accepts_whole_floats_from_spreadsheets(self):
+        row = validate_product(12, 'Apple', 'Red', 10, 5.0, 'Fruit', 2.0, 10.0, categories={'Fruit'})
+        self.assertEqual(row[4:], (5, 'Fruit', 2, 10))
+
+    def test_rejects(self):
+        valid = ['12', 'Apple', 'Red', '10', '5', 'Fruit', '2', '10']
+        for index, value, message in ((0, '12a', "Product ID must contain only numbers"),
+                                      (0, '1' * 21, "Product ID should be at most 20 digits"),
+                                      (1, 'Apple2', "Product Name must contain only characters"),
+                                      (2, None, "Description must contain only characters"),
+                                      (3, 'ten', "Price must be a number"),
+                                      (4, 5.5, "Quantity must be a number"),
+                                      (5, ' ', "Please select a category"),
+                                      (6, '', "Restock Level must be a number"),
+                                      (7, 'x', "Restock Quantity must be a number")):
+            values = list(valid)
+            values[index] = value
+            with self.subTest(field=index, value=value):
+                with self.assertRaisesRegex(ValidationError, message):
+                    validate_product(*values)
+
+    def test_unknown_category(self):
+        with self.assertRaisesRegex(ValidationError, "Unknown category 'Toys'"):
+            validate_product('12', 'Apple', 'Red', '10', '5', 'Toys', '2', '10', categories=['Fruit'])
+
+
+class IntegerTest(unittest.TestCase):
+
+    def test_integer(self):
+        self.assertEqual(_integer('7'), 7)
+        self.assertEqual(_integer(7.0), 7)
+        for value in (7.5, '7.0', None):
+            with self.subTest(value=value):
+                with self.assertRaises((TypeError, ValueError)):
+                    _integer(value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+"""Query normalization of the query profiler (profiling.py).
+
+    python -m unittest discover tests
+"""
+import unittest
+
+from profiling import normalize
+
+
+class NormalizeTest(unittest.TestCase):
+
+    def test_values_become_placeholders(self):
+        self.assertEqual(normalize("SELECT * FROM products WHERE category = 'Fruit' AND price > 10.5 LIMIT 10;"),
+                         "SELECT * FROM products WHERE category = ? AND price > ? LIMIT ?")
+
+    def test_whitespace_is_collapsed(self):
+        self.assertEqual(normalize("\n    SELECT  product_id\n    FROM products WHERE product_id = %s\n"),
+                         "SELECT product_id FROM products WHERE product_id = ?")
+
+    def test_lists_of_any_length_group_together(self):
+        two = normalize("SELECT * FROM products WHERE product_id IN (%s, %s)")
+        five = normalize("SELECT * FROM products WHERE product_id IN (%s,%s, %s, %s, %s)")
+        self.assertEqual(two, "SELECT * FROM products WHERE product_id IN (?, ...)")
+        self.assertEqual(two, five)
+
+    def test_union_rows_group_together(self):
+        derived = " UNION ALL ".join(["SELECT %s AS product_id, %s AS quantity"] * 3)
+        self.assertEqual(normalize(f"UPDATE reserved_stock s JOIN ({derived}) r ON s.product_id = r.product_id"),
+                         "UPDATE reserved_stock s JOIN (SELECT ? AS product_id ... UNION ALL ...) r "
+                         "ON s.product_id = r.product_id")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Builds the service layer and the main window against a stub database, so wiring errors in their constructors
+show up without MySQL. The window needs a display and is skipped without one.
+
+    python -m unittest discover tests
+"""
+import tkinter
+import unittest
+
+from reservations import Reservations, Sweeper
+from services import InventoryService
+
+
+class StubDB:
+    """Answers every query with no rows."""
+
+    def fetchall(self, query, params=None):
+        return []
+
+    def fetchone(self, query, params=None):
+        return None
+
+    def scalar(self, query, params=None):
+        return None
+
+    def execute(self, query, params=None):
+        return 0
+
+    def stream(self, query, params=None, size=1000):
+        return iter(())
+
+
+class SmokeTest(unittest.TestCase):
+
+    def test_service(self):
+        service = InventoryService(StubDB())
+        self.assertIsInstance(service.reservations, Reservations)
+        self.assertEqual(service.search("anything"), [])
+
+        reservations = Reservations(StubDB())
+        self.assertIs(InventoryService(StubDB(), catalogue=object(), reservations=reservations).reservations,
+                      reservations)
+
+    def test_menu(self):
+        try:
+            root = tkinter.Tk()
+        except tkinter.TclError:
+            self.skipTest("no display")
+        from menu import Menu
+        try:
+            menu = Menu(StubDB(), ("admin", "", "ADMIN", ""), root)
+            self.assertIsInstance(menu.sweeper, Sweeper)
+            self.assertIs(menu.sweeper.reservations, menu.service.reservations)
+            menu.sweeper.stop()
+        finally:
+            root.destroy()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Growing and memory-mapping the .npy columns of an analytics snapshot (snapshot.py).
+
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from snapshot import append_npy, map_npy
+
+
+class NpyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'column.npy')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_grows_in_place(self):
+        append_npy(self.path, np.arange(3, dtype=np.int64), 0)
+        append_npy(self.path, np.arange(3, 5, dtype=np.int64), 3)
+        self.assertEqual(np.load(self.path).tolist(), [0, 1, 2, 3, 4])
+
+    def test_append_overwrites_rows_past_start(self):
+        # As left by an export interrupted after writing rows the manifest does not count
+        append_npy(self.path, np.arange(5, dtype=np.int64), 0)
+        append_npy(self.path, np.array([9], np.int64), 2)
+        self.assertEqual(np.load(self.path).tolist(), [0, 1, 9])
+
+    def test_append_rejects_a_mismatched_file(self):
+        append_npy(self.path, np.arange(2, dtype=np.int64), 0)
+        with self.assertRaises(ValueError):
+            append_npy(self.path, np.array([1.5]), 2)
+        with self.assertRaises(ValueError):
+            append_npy(self.path, np.array([7], np.int64), 3)
+
+    def test_map_reads_the_rows_of_the_manifest(self):
+        append_npy(self.path, np.array([1.5, 2.5, 3.5]), 0)
+        mapped = map_npy(self.path, 2)
+        self.assertEqual(mapped.tolist(), [1.5, 2.5])
+        del mapped
+        empty = map_npy(self.path, 0)
+        self.assertEqual((len(empty), empty.dtype), (0, np.float64))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import tkinter
+from collections import OrderedDict
+from tkinter import ttk
+
+
+class PagedQuery:
+    """Keyset-paginated access to a table or join, ordered by a unique key column.
+
+    Every row returned starts with the key; the remaining values are what gets displayed.
+    """
+
+    def __init__(self, db, select, from_, key, where=None, params=()):
+        self.db = db
+        self.select = select
+        self.from_ = from_
+        self.key = key
+        self.where = where
+        self.params = tuple(params)
+
+    def _where(self, extra=None):
+        clauses = [c for c in (self.where, extra) if c]
+        return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    def count(self):
+        return self.db.scalar(f"SELECT COUNT(*) FROM {self.from_}{self._where()}", self.params or None)
+
+    def page_after(self, last_key, limit):
+        """The limit rows following last_key (or the first rows if last_key is None), served by the key index."""
+        if last_key is None:
+            query = f"SELECT {self.key}, {self.select} FROM {self.from_}{self._where()} ORDER BY {self.key} LIMIT %s"
+            return self.db.fetchall(query, self.params + (limit,))
+        query = (f"SELECT {self.key}, {self.select} FROM {self.from_}{self._where(f'{self.key} > %s')} "
+                 f"ORDER BY {self.key} LIMIT %s")
+        return self.db.fetchall(query, self.params + (last_key, limit))
+
+    def page_at(self, offset, limit):
+        """Fallback for jumping straight to a position whose preceding key is not known yet."""
+        query = f"SELECT {self.key}, {self.select} FROM {self.from_}{self._where()} ORDER BY {self.key} LIMIT %s OFFSET %s"
+        return self.db.fetchall(query, self.params + (limit, offset))
+
+
+class VirtualTable:
+    """A Treeview that only materializes the visible window of a PagedQuery plus a prefetch buffer.
+
+    Pages are fetched in the background as the user scrolls and kept in a small LRU, so memory and
+    render time depend on the window size rather than on the size of the table.
+    """
+
+    def __init__(self, master, columns, source, executor, height=600, page_size=100, prefetch=1,
+                 transform=None, rowheight=25):
+        self.source = source
+        self.executor = executor
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.transform = transform
+        self.visible = max(1, height // rowheight)
+        self.max_pages = 2 * prefetch + 2 + self.visible // page_size
+
+        self.frame = tkinter.Frame(master, background="#2a2d2e")
+        self.tree = ttk.Treeview(self.frame, columns=columns, selectmode="browse", height=self.visible)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+
+        self.total = None
+        self.top = 0
+        self.pages = OrderedDict()
+        self.boundaries = {}
+        self.pending = set()
+        self.generation = 0
+        self.refresh()
+
+    def refresh(self):
+        """Drops every cached page and reloads the current window, e.g. after the table changed."""
+        self.generation += 1
+        self.pages.clear()
+        self.boundaries.clear()
+        self.pending.clear()
+        generation = self.generation
+
+        def counted(total):
+            if generation == self.generation:
+                self.total = total
+                self.show(self.top)
+
+        self.executor.submit(self.tree, self.source.count, callback=counted)
+        self.show(self.top)
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if not self.total:
+            return
+        if args[0] == 'moveto':
+            self.show(int(float(args[1]) * self.total))
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.show(self.top + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.show(self.top - 3)
+        else:
+            self.show(self.top + 3)
+        return "break"
+
+    def show(self, top):
+        """Scrolls so that row `top` is first and renders the window once its pages are loaded."""
+        if self.total is not None:
+            top = min(top, max(0, self.total - self.visible))
+        self.top = max(0, top)
+
+        first = self.top // self.page_size
+        last = (self.top + self.visible - 1) // self.page_size
+        wanted = range(max(0, first - self.prefetch), last + self.prefetch + 1)
+        if self.total is not None:
+            wanted = [n for n in wanted if n * self.page_size < self.total]
+        for page in wanted:
+            if page not in self.pages:
+                self.fetch(page)
+
+        needed = [page for page in range(first, last + 1)
+                  if self.total is None or page * self.page_size < self.total]
+        if all(page in self.pages for page in needed):
+            self.render()
+
+    def fetch(self, page):
+        if page in self.pending:
+            return
+        self.pending.add(page)
+        generation = self.generation
+        if page == 0:
+            job = (self.source.page_after, None, self.page_size)
+        elif page - 1 in self.boundaries:
+            job = (self.source.page_after, self.boundaries[page - 1], self.page_size)
+        else:
+            job = (self.source.page_at, page * self.page_size, self.page_size)
+
+        def loaded(rows):
+            if generation != self.generation:
+                return
+            self.pending.discard(page)
+            self.pages[page] = rows
+            if rows:
+                self.boundaries[page] = rows[-1][0]
+            self.evict()
+            self.show(self.top)
+
+        self.executor.submit(self.tree, *job, callback=loaded)
+
+    def evict(self):
+        """Keeps only the pages around the current window."""
+        first = self.top // self.page_size - self.prefetch
+        last = (self.top + self.visible - 1) // self.page_size + self.prefetch
+        for page in list(self.pages):
+            if len(self.pages) <= self.max_pages:
+                break
+            if not first <= page <= last:
+                del self.pages[page]
+
+    def render(self):
+        rows = []
+        position = self.top
+        while len(rows) < self.visible:
+            page = self.pages.get(position // self.page_size)
+            if not page:
+                break
+            offset = position % self.page_size
+            chunk = page[offset:offset + self.visible - len(rows)]
+            if not chunk:
+                break
+            rows.extend(chunk)
+            position += len(chunk)
+
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            values = row[1:]
+            if self.transform:
+                values = self.transform(values)
+            self.tree.insert('', 'end', values=values)
+
+        if self.total:
+            self.scrollbar.set(self.top / self.total, min(1.0, (self.top + len(rows)) / self.total))
+        else:
+            self.scrollbar.set(0, 1)